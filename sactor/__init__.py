@@ -1 +1,10 @@
-from .sactor import Sactor
+def __getattr__(name):
+    # Imported on first use: `Sactor` pulls in the LLM clients, libclang and
+    # every translator, which CLI paths like `sactor run-tests` never need
+    if name == "Sactor":
+        from .sactor import Sactor
+        return Sactor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["Sactor"]
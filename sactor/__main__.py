@@ -2,13 +2,21 @@ import argparse
 import os
 import sys
 
-from sactor import Sactor
 from sactor import logging as sactor_logging
 from sactor import utils
+from sactor.test_runner.run_tests_command import parse_run_tests
 
 logger = sactor_logging.get_logger(__name__)
-from sactor.test_generator import ExecutableTestGenerator, TestGeneratorResult
-from sactor.test_runner import ExecutableTestRunner, TestRunnerResult
+
+# Subcommand implementations are imported inside their handlers, so each
+# subcommand only loads what it needs (see tests/test_cli_import_time.py)
+
+
+def __getattr__(name):
+    if name == "Sactor":
+        from sactor import Sactor
+        return Sactor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def add_logging_arguments(parser: argparse.ArgumentParser) -> None:
@@ -153,61 +161,6 @@ def parse_translate(parser):
     )
 
 
-def parse_run_tests(parser):
-    parser.add_argument(
-        'test_samples_path',
-        type=str,
-        help='The path to the test samples output json file'
-    )
-
-    parser.add_argument(
-        'target',
-        help='The target program or library to test'
-    )
-
-    parser.add_argument(
-        'test_sample_number',
-        type=int,
-        help='The number (relative to 0) of the test sample to run'
-    )
-
-    parser.add_argument(
-        '--type',
-        choices=['bin', 'lib'],
-        required=True,
-        help='Whether the target is a binary program or a library'
-    )
-
-    parser.add_argument(
-        '--config',
-        '-c',
-        type=str,
-        dest='config_file',
-        help='The configuration file to use'
-    )
-
-    parser.add_argument(
-        "--feed-as-args",
-        action='store_true',
-        default=None,
-        help='Only avaliable for binary targets. If set, the test samples will be fed as arguments to the target program. Default set this unless --feed-as-stdin is set.'
-    )
-
-    parser.add_argument(
-        "--feed-as-stdin",
-        action='store_true',
-        default=None,
-        help='Only avaliable for binary targets. If set, the test samples will be fed to the target program via stdin.'
-    )
-
-    parser.add_argument(
-        '--save',
-        '-s',
-        type=str,
-        help='The path to save the output json of the test run and the expected output, if the test fails. If not set, the output will not be saved.'
-    )
-
-
 def parse_generate_tests(parser):
     parser.add_argument(
         'input_file',
@@ -280,6 +233,12 @@ def parse_generate_tests(parser):
         help='The path to the executable to test, only required for binary targets. If not set, sactor will try to directly compile the input file'
     )
 
+    parser.add_argument(
+        '--batched-task',
+        action='store_true',
+        help='Write a single `run-tests --all` command that runs every sample in one process, instead of one command per sample'
+    )
+
     parser.add_argument(
         "--feed-as-args",
         action='store_true',
@@ -296,6 +255,9 @@ def parse_generate_tests(parser):
 
 
 def translate(parser, args):
+    # Resolved through the module so `Sactor` stays lazy and replaceable
+    Sactor = getattr(sys.modules[__name__], "Sactor")
+
     if getattr(args, "test_command_override", None):
         args.test_command_path = args.test_command_override
 
@@ -331,6 +293,8 @@ def translate(parser, args):
 
 
 def run_tests(parser, args):
+    from sactor.test_runner import ExecutableTestRunner, TestRunnerResult
+
     config = utils.try_load_config(args.config_file)
     _configure_logging_from_args(config, args)
 
@@ -348,6 +312,9 @@ def run_tests(parser, args):
             parser.error(
                 'Only one of --feed-as-args and --feed-as-stdin can be set yet')
 
+    if args.run_all == (args.test_sample_number is not None):
+        parser.error('Exactly one of test_sample_number and --all must be given')
+
     if args.feed_as_args:
         feed_as_args = True
     else:
@@ -362,6 +329,18 @@ def run_tests(parser, args):
             config_path=args.config_file,
             feed_as_arguments=feed_as_args
         )
+        if args.run_all:
+            for i, result in test_runner.run_all(args.save):
+                if result[0] == TestRunnerResult.PASSED:
+                    logger.info('✅ Test %d passed successfully!', i, extra={"plain": True})
+                    continue
+                logger.error('❌ Test %d failed!', i, extra={"plain": True})
+                logger.error('Diff (-actual +expected):', extra={"plain": True})
+                if result[1]:
+                    logger.error('%s', result[1], extra={"plain": True})
+                sys.exit(1)
+            sys.exit(0)
+
         result = test_runner.run_test(args.test_sample_number, args.save)
         if result[0] == TestRunnerResult.PASSED:
             logger.info('✅ Test %d passed successfully!', args.test_sample_number, extra={"plain": True})
@@ -381,6 +360,8 @@ def run_tests(parser, args):
 
 
 def generate_tests(parser, args):
+    from sactor.test_generator import ExecutableTestGenerator, TestGeneratorResult
+
     config = utils.try_load_config(args.config_file)
     _configure_logging_from_args(config, args)
 
@@ -426,7 +407,8 @@ def generate_tests(parser, args):
             logger.info('✅ Tests generated successfully!', extra={"plain": True})
             test_generator.create_test_task(
                 args.out_test_task_path,
-                args.out_test_sample_path
+                args.out_test_sample_path,
+                batched=args.batched_task,
             )
             sys.exit(0)
         else:
@@ -439,6 +421,44 @@ def generate_tests(parser, args):
         raise ValueError(f'Invalid type: {args.type}')
 
 
+def parse_vendor_crates(parser):
+    parser.add_argument(
+        'vendor_dir',
+        type=str,
+        nargs='?',
+        default=None,
+        help='Where to place the vendored crate sources (default: [cargo] vendor_dir of the configuration)'
+    )
+
+    parser.add_argument(
+        '--config',
+        '-c',
+        type=str,
+        dest='config_file',
+        help='The configuration file to use'
+    )
+
+
+def vendor_crates(parser, args):
+    config = utils.try_load_config(args.config_file)
+    _configure_logging_from_args(config, args)
+
+    vendor_dir = args.vendor_dir or config.get('cargo', {}).get('vendor_dir')
+    if not vendor_dir:
+        parser.error('vendor_dir is required unless [cargo] vendor_dir is configured')
+    try:
+        utils.vendor_crates(vendor_dir)
+    except RuntimeError as exc:
+        logger.error('❌ %s', exc, extra={"plain": True})
+        sys.exit(1)
+    logger.info(
+        '✅ Crates vendored into %s; set [cargo] vendor_dir or %s to build offline',
+        os.path.abspath(vendor_dir),
+        utils.CARGO_VENDOR_DIR_ENV,
+        extra={"plain": True},
+    )
+
+
 def main():
     logging_parent = argparse.ArgumentParser(add_help=False)
     add_logging_arguments(logging_parent)
@@ -473,9 +493,16 @@ def main():
         parents=[logging_parent]
     )
 
+    vendor_crates_parser = subparsers.add_parser(
+        'vendor-crates',
+        help='Download the crates generated Rust projects depend on for offline builds',
+        parents=[logging_parent]
+    )
+
     parse_translate(translate_parser)
     parse_run_tests(test_runner_parser)
     parse_generate_tests(generate_tests_parser)
+    parse_vendor_crates(vendor_crates_parser)
 
     args = parser.parse_args()
 
@@ -486,6 +513,8 @@ def main():
             run_tests(parser, args)
         case 'generate-tests':
             generate_tests(parser, args)
+        case 'vendor-crates':
+            vendor_crates(parser, args)
         case _:
             parser.print_help()
 
@@ -1,12 +1,13 @@
+import bisect
 from collections import deque
+from dataclasses import dataclass, field
 from functools import lru_cache
 
 from clang import cindex
 import os
 import re
-import tempfile
 
-from sactor import logging as sactor_logging, utils
+from sactor import logging as sactor_logging, toolchain, utils
 from sactor.utils import read_file, read_file_lines
 
 from .enum_info import EnumInfo, EnumValueInfo
@@ -26,6 +27,83 @@ standard_io = [
 logger = sactor_logging.get_logger(__name__)
 
 
+class _IncludePrefixTrie:
+    """Character trie over the compiler include paths, for `str.startswith` matching of file names."""
+
+    _END = ""
+
+    def __init__(self) -> None:
+        self._root: dict = {}
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def build(cls, prefixes: tuple[str, ...]) -> "_IncludePrefixTrie":
+        trie = cls()
+        for prefix in prefixes:
+            node = trie._root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[cls._END] = True
+        return trie
+
+    def matches(self, path: str) -> bool:
+        """Return whether some prefix in the trie is a prefix of `path`."""
+        node = self._root
+        if self._END in node:
+            return True
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+
+class _IntervalIndex:
+    """Byte ranges `[start, end]` with values, grouped per file and sorted by start."""
+
+    def __init__(self) -> None:
+        self._intervals: dict[str, list[tuple[int, int, str]]] = {}
+        self._starts: dict[str, list[int]] = {}
+
+    def add(self, file_name: str, start: int, end: int, value: str) -> None:
+        self._intervals.setdefault(file_name, []).append((start, end, value))
+
+    def freeze(self) -> None:
+        """Sort the intervals added so far; call before querying."""
+        for file_name, intervals in self._intervals.items():
+            intervals.sort()
+            self._starts[file_name] = [start for start, _end, _value in intervals]
+
+    def contained_in(self, file_name: str, start: int, end: int) -> list[str]:
+        """Return the values of the intervals of `file_name` lying within `[start, end]`."""
+        starts = self._starts.get(file_name)
+        if not starts:
+            return []
+        lo = bisect.bisect_left(starts, start)
+        hi = bisect.bisect_right(starts, end)
+        return [
+            value for _start, interval_end, value in self._intervals[file_name][lo:hi]
+            if interval_end <= end
+        ]
+
+
+@dataclass
+class _CursorScan:
+    """What `CParser._scan_cursor` collects from one subtree, in preorder."""
+    struct_names: set[str] = field(default_factory=set)
+    # VAR_DECLs of the static / extern globals referenced
+    global_vars: list[cindex.Cursor] = field(default_factory=list)
+    # ENUM_DECLs and ENUM_CONSTANT_DECLs used
+    enum_uses: list[cindex.Cursor] = field(default_factory=list)
+    stdio: list[str] = field(default_factory=list)
+    function_refs: list[FunctionDependencyRef] = field(default_factory=list)
+    struct_refs: list[StructRef] = field(default_factory=list)
+    enum_refs: list[EnumRef] = field(default_factory=list)
+    global_refs: list[GlobalVarRef] = field(default_factory=list)
+
+
 class CParser:
     def __init__(self, filename, extra_args=None, omit_error=False, raw_filename=None):
         self.filename = filename
@@ -56,22 +134,32 @@ class CParser:
         self._enums: dict[str, EnumInfo] = {}
         self._structs_unions: dict[str, StructInfo] = {}
         self._functions: dict[str, FunctionInfo] = {}
-        self._raw_func_cursor_cache: dict[str, cindex.Cursor | None] = {}
+        self._raw_func_cursor_cache: dict[str, cindex.Cursor] = {}
+        self._raw_funcs_in_raw_file: set[str] = set()
+        self._raw_file_matches: dict[str, bool] = {}
         self._macro_index_built: bool = False
         self._macro_def_cursors: list[cindex.Cursor] = []
-        self._macro_expand_cursors: list[cindex.Cursor] = []
+        self._macro_expansions = _IntervalIndex()
         self._macro_def_map: dict[str, cindex.Cursor] = {}
         self._macro_defs_for_function: dict[str, list[str]] = {}
         self._raw_file_cache: dict[str, str] = {}
         self._skipped_ranges_cache: dict[str, list[tuple[int, int]]] = {}
         self._manual_skip_cache: dict[str, list[tuple[int, int]]] = {}
         
+        self._include_prefixes = _IncludePrefixTrie.build(tuple(self.compiler_include_paths))
+        # file name -> whether it is a system header
+        self._system_files: dict[str, bool] = {}
+        self._typedef_nodes: list[cindex.Cursor] = []
+        self._function_refs: dict[str, list[FunctionDependencyRef]] = {}
+        self._global_var_enums: dict[tuple[str, int], tuple[list[EnumValueInfo], list[EnumInfo]]] = {}
+
         self._intrinsic_alias = _discover_intrinsic_aliases()
+        struct_nodes, function_nodes = self._collect_declarations()
         self._type_alias: dict[str, str] = self._extract_type_alias()
-        self._extract_structs_unions()
+        self._extract_structs_unions(struct_nodes)
         self._update_structs_unions()
 
-        self._extract_functions()
+        self._extract_functions(function_nodes)
         self._update_functions()
         # only structs used by functions are preserved. Otherwise c2rust does not have corresponding translation
         self._structs_unions = self._get_all_used_structs()
@@ -167,74 +255,65 @@ class CParser:
         Locate the function definition cursor in the raw (un-preprocessed) TU.
         Prefer the cursor that belongs to `raw_filename` to avoid header inlines.
         """
-        if func_name in self._raw_func_cursor_cache:
-            return self._raw_func_cursor_cache[func_name]
-
-        target = None
-        try:
-            for cursor in self.raw_translation_unit.cursor.walk_preorder():
-                if cursor.kind != CursorKind.FUNCTION_DECL:
-                    continue
-                if cursor.spelling != func_name:
-                    continue
-                if not cursor.is_definition():
-                    continue
-                if cursor.location and cursor.location.file and cursor.location.file.name:
-                    try:
-                        if os.path.samefile(cursor.location.file.name, self.raw_filename):
-                            target = cursor
-                            break
-                    except Exception:
-                        # If samefile fails (e.g., missing file), fall through to best-effort match
-                        pass
-                if target is None:
-                    target = cursor
-        except Exception:
-            target = None
+        self._build_macro_index()
+        return self._raw_func_cursor_cache.get(func_name)
 
-        self._raw_func_cursor_cache[func_name] = target
-        return target
+    def _is_raw_file(self, path: str) -> bool:
+        in_raw_file = self._raw_file_matches.get(path)
+        if in_raw_file is None:
+            try:
+                in_raw_file = os.path.samefile(path, self.raw_filename)
+            except Exception:
+                # If samefile fails (e.g., missing file), fall through to best-effort match
+                in_raw_file = False
+            self._raw_file_matches[path] = in_raw_file
+        return in_raw_file
 
     def _build_macro_index(self) -> None:
         """
-        Build macro definition / expansion cursor lists from the raw TU.
+        Index the raw TU in one pass: macro definitions, macro expansions (per file,
+        sorted by offset) and function definitions.
+        Preprocessing entities and C function definitions are all direct children of
+        the TU cursor, so only the top level is visited.
         """
         if self._macro_index_built:
             return
         try:
             expansion_kind = getattr(cindex.CursorKind, "MACRO_EXPANSION", None)
-            for cursor in self.raw_translation_unit.cursor.walk_preorder():
+            for cursor in self.raw_translation_unit.cursor.get_children():
                 if cursor.kind == cindex.CursorKind.MACRO_DEFINITION:
                     self._macro_def_cursors.append(cursor)
                     self._macro_def_map[cursor.spelling] = cursor
                 elif cursor.kind == cindex.CursorKind.MACRO_INSTANTIATION or (
                     expansion_kind and cursor.kind == expansion_kind
                 ):
-                    self._macro_expand_cursors.append(cursor)
+                    extent = cursor.extent
+                    if extent.start.file:
+                        self._macro_expansions.add(
+                            extent.start.file.name, extent.start.offset, extent.end.offset, cursor.spelling)
+                elif cursor.kind == CursorKind.FUNCTION_DECL and cursor.is_definition():
+                    self._index_raw_function(cursor)
         except Exception as exc:
             logger.warning("Failed to build macro index: %s", exc)
+        self._macro_expansions.freeze()
         self._macro_index_built = True
 
-    @staticmethod
-    def _extent_contains(outer, inner) -> bool:
+    def _index_raw_function(self, cursor: cindex.Cursor) -> None:
         """
-        Check if `inner` extent is fully contained in `outer` (same file, offset range).
+        Record a raw function definition: the first one in `raw_filename` wins, else the first one seen.
         """
-        try:
-            if outer is None or inner is None:
-                return False
-            if not outer.start or not inner.start or not outer.end or not inner.end:
-                return False
-            if not outer.start.file or not inner.start.file:
-                return False
-            if outer.start.file.name != inner.start.file.name:
-                return False
-            return (
-                inner.start.offset >= outer.start.offset
-                and inner.end.offset <= outer.end.offset
-            )
-        except Exception:
-            return False
+        name = cursor.spelling
+        in_raw_file = bool(
+            cursor.location and cursor.location.file and cursor.location.file.name
+            and self._is_raw_file(cursor.location.file.name)
+        )
+        if name in self._raw_func_cursor_cache and (
+            name in self._raw_funcs_in_raw_file or not in_raw_file
+        ):
+            return
+        self._raw_func_cursor_cache[name] = cursor
+        if in_raw_file:
+            self._raw_funcs_in_raw_file.add(name)
 
     def _render_extent_text(self, extent) -> str | None:
         """
@@ -351,7 +430,10 @@ class CParser:
             segments: list[tuple[int, int]] = []
             cursor = func_start_b
             for s, e in skipped:
-                if e <= func_start_b or s >= func_end_b:
+                if s >= func_end_b:
+                    # sorted by start: no later range overlaps
+                    break
+                if e <= func_start_b:
                     continue
                 if s > cursor:
                     segments.append((cursor, min(s, func_end_b)))
@@ -500,85 +582,93 @@ class CParser:
         """
         Returns a list of all typedef declaration nodes in the C file.
         """
-        typedef_nodes = []
-        self._process_typedef_nodes(
-            self.translation_unit.cursor, typedef_nodes=typedef_nodes)
-        return typedef_nodes
+        return list(self._typedef_nodes)
     
     @staticmethod
     def _build_compiler_intrinsic_define_map(config: str) -> dict:
-        ptn = re.compile(r"^#define +(\w+) +([\w ]+)")
-        lines = config.splitlines()
-        res = {}
-        for line in lines:
-            match = ptn.match(line)
-            if match:
-                res[match.group(1)] = match.group(2)
-        return res
+        return toolchain.parse_predefined_macros(config)
 
     # map from instrinsic alias to canonical type
 
+    def _collect_declarations(self) -> tuple[list[cindex.Cursor], list[cindex.Cursor]]:
+        """
+        Walks the whole TU once, iteratively, recording the typedef declarations and
+        returning the struct / union and function definitions outside system headers,
+        in source order. Top-level declarations in system headers are skipped with their
+        whole subtree.
+        """
+        struct_nodes = []
+        function_nodes = []
+        stack = [
+            child for child in reversed(list(self.translation_unit.cursor.get_children()))
+            if not (child.location.file and self._is_system_location(child.location))
+        ]
+        while stack:
+            node = stack.pop()
+            kind = node.kind
+            if kind == cindex.CursorKind.TYPEDEF_DECL:
+                if node.location and not self._is_in_system_header(node):
+                    self._typedef_nodes.append(node)
+            elif kind == cindex.CursorKind.STRUCT_DECL or kind == cindex.CursorKind.UNION_DECL:
+                # Exclude structs declared in system headers
+                if node.is_definition() and node.location and not self._is_in_system_header(node):
+                    struct_nodes.append(node)
+            elif kind == cindex.CursorKind.FUNCTION_DECL:
+                if node.is_definition() and not self._is_in_system_header(node):
+                    function_nodes.append(node)
+            stack.extend(reversed(list(node.get_children())))
+        return struct_nodes, function_nodes
+
     def _extract_type_alias(self):
         """
         Extracts type aliases (typedefs) from the C file.
         Returns a dictionary mapping alias names to their original types.
         """
         type_alias = {}
-        self._process_typedef_nodes(
-            self.translation_unit.cursor, type_alias=type_alias)
+        for node in self._typedef_nodes:
+            alias_name = node.spelling
+            underlying_type = node.underlying_typedef_type.get_canonical()
+            target_spelling = underlying_type.spelling
+
+            enum_child = None
+            struct_child = None
+            for child in node.get_children():
+                if child.kind == cindex.CursorKind.ENUM_DECL:
+                    enum_child = child
+                    break
+                elif child.kind == cindex.CursorKind.STRUCT_DECL or child.kind == cindex.CursorKind.UNION_DECL:
+                    struct_child = child
+                    break
+
+            # Handle anonymous enum/struct/union typedef like: typedef struct { ... } alias_name;
+            if enum_child and target_spelling.strip() == alias_name.strip():
+                target_spelling = f"enum {alias_name}"
+            elif struct_child and target_spelling.strip() == alias_name.strip():
+                target_spelling = f"struct {alias_name}"
+
+            if not self.is_func_type(underlying_type) and target_spelling.strip() != alias_name.strip():
+                type_alias[alias_name] = target_spelling
         type_alias.update(self._intrinsic_alias)
         return type_alias
 
-    def _extract_structs_unions(self):
-        """
-        Parses the C file and extracts struct and union information, including dependencies.
-        """
-        self._collect_structs_and_unions(self.translation_unit.cursor)
-
-    def _process_typedef_nodes(self, node, type_alias=None, typedef_nodes=None):
+    def _extract_structs_unions(self, struct_nodes: list[cindex.Cursor]):
         """
-        Unified function to process typedef nodes.
-        Can collect type aliases and/or typedef nodes based on provided parameters.
+        Records the struct and union definitions found by `_collect_declarations`.
         """
-        if node.kind == cindex.CursorKind.TYPEDEF_DECL:
-            if node.location and not self._is_in_system_header(node):
-                if typedef_nodes is not None:
-                    typedef_nodes.append(node)
-
-                if type_alias is not None:
-                    alias_name = node.spelling
-                    underlying_type = node.underlying_typedef_type.get_canonical()
-                    target_spelling = underlying_type.spelling
-
-                    enum_child = None
-                    struct_child = None
-                    for child in node.get_children():
-                        if child.kind == cindex.CursorKind.ENUM_DECL:
-                            enum_child = child
-                            break
-                        elif child.kind == cindex.CursorKind.STRUCT_DECL or child.kind == cindex.CursorKind.UNION_DECL:
-                            struct_child = child
-                            break
-
-                    # Handle anonymous enum/struct/union typedef like: typedef struct { ... } alias_name;
-                    if enum_child and target_spelling.strip() == alias_name.strip():
-                        target_spelling = f"enum {alias_name}"
-                    elif struct_child and target_spelling.strip() == alias_name.strip():
-                        target_spelling = f"struct {alias_name}"
-
-                    if not self.is_func_type(underlying_type) and target_spelling.strip() != alias_name.strip():
-                        type_alias[alias_name] = target_spelling
-
-        for child in node.get_children():
-            self._process_typedef_nodes(child, type_alias, typedef_nodes)
+        for node in struct_nodes:
+            name = node.spelling
+            # ignore unnamed structs TODO: is this good?
+            if name.find("unnamed at") == -1:
+                dependencies = []
+                struct_info = StructInfo(node, name, dependencies)
+                self._structs_unions[name] = struct_info
 
     def _update_function_dependencies(self, function: FunctionInfo):
         """
         Updates the depedencies of each function.
         """
-        node = function.node
-        # Collect references (with USR when available)
-        refs = self._collect_function_dependency_refs(node)
+        # References (with USR when available) collected by the extraction sweep
+        refs = self._function_refs.get(function.name, [])
 
         # Convert same-TU dependencies to refs with targets
         local_funcs = self._functions
@@ -608,7 +698,8 @@ class CParser:
         Updates the dependencies of each struct or union.
         """
         node = struct_union.node
-        used_struct_names = self._collect_structs_unions_dependencies(node)
+        scan = self._scan_cursor(node)
+        used_struct_names = scan.struct_names
         used_structs = set()
         type_aliases = {}
         for used_struct_name in used_struct_names:
@@ -625,7 +716,7 @@ class CParser:
         struct_union.dependencies = list(used_structs)
         struct_union.type_aliases = type_aliases
 
-        used_enums = self._collect_enum_dependencies(node)
+        used_enums = self._record_enum_uses(scan.enum_uses)
         enum_values = set()
         enum_defs = set()
         for used_enum in used_enums:
@@ -656,25 +747,6 @@ class CParser:
         for function in self._functions.values():
             self._update_function_dependencies(function)
 
-    def _extract_functions(self):
-        """
-        Parses the C file and extracts function information.
-        """
-        self._extract_function_info(self.translation_unit.cursor)
-
-    def _collect_structs_and_unions(self, node):
-        if (node.kind == cindex.CursorKind.STRUCT_DECL or node.kind == cindex.CursorKind.UNION_DECL) and node.is_definition():
-            # Exclude structs declared in system headers
-            if node.location and not self._is_in_system_header(node):
-                name = node.spelling
-                # ignore unnamed structs TODO: is this good?
-                if name.find("unnamed at") == -1:
-                    dependencies = []
-                    struct_info = StructInfo(node, name, dependencies)
-                    self._structs_unions[name] = struct_info
-        for child in node.get_children():
-            self._collect_structs_and_unions(child)
-
     def _get_all_used_structs(self) -> dict[str, StructInfo]:
         used = {}
         queue = deque()
@@ -695,303 +767,253 @@ class CParser:
         # enum's struct dependencies
         return used        
 
-    def _extract_function_info(self, node):
-        """
-        Recursively extracts function information from the AST.
-        """
-        if node.kind == cindex.CursorKind.FUNCTION_DECL:
-            if node.is_definition():
-                if not self._is_in_system_header(node):
-                    name = node.spelling
-                    return_type = node.result_type.spelling
-                    arguments = [(arg.spelling, arg.type.spelling)
-                                 for arg in node.get_arguments()]
-                    location = f"{node.location.file}:{node.location.line}"
-
-                    # Collect functions
-                    called_functions = []  # Keep blank for now, update later
-
-                    # Collect structs
-                    used_struct_names = self._collect_structs_unions_dependencies(
-                        node)
-                    used_structs = set()
-                    used_type_aliases = {}
-                    for used_struct_name in used_struct_names:
-                        if used_struct_name in self._structs_unions:
-                            used_structs.add(
-                                self._structs_unions[used_struct_name])
-                        elif used_struct_name in self._type_alias:
-                            original_struct_name = self._type_alias[used_struct_name]
-                            if original_struct_name in self._structs_unions:
-                                used_structs.add(
-                                    self._structs_unions[self._type_alias[used_struct_name]])
-                            used_type_aliases[used_struct_name] = self._type_alias[used_struct_name]
-
-                    # Collect global variables
-                    used_global_vars = self._collect_global_variable_dependencies(
-                        node)
-                    # Collect enums
-                    used_enums = self._collect_enum_dependencies(node)
-                    used_enum_values = set()
-                    used_enum_definitions = set()
-                    for used_enum in used_enums:
-                        if type(used_enum) == EnumValueInfo:
-                            used_enum_values.add(used_enum)
-                        else:
-                            used_enum_definitions.add(used_enum)
-                    function_info = FunctionInfo(
-                        node,
-                        name,
-                        return_type,
-                        arguments,
-                        called_functions,
-                        list(used_structs),
-                        list(used_global_vars),
-                        list(used_enum_values),
-                        list(used_enum_definitions),
-                        used_type_aliases,
-                        called_function_names=[]
-                    )
-                    try:
-                        function_info.usr = node.get_usr()
-                    except Exception:
-                        function_info.usr = ""
-                    # Populate new reference lists (struct/enum/global) for this function
-                    function_info.struct_dependency_refs = self._collect_struct_refs(node)
-                    function_info.enum_dependency_refs = self._collect_enum_refs(node)
-                    function_info.global_dependency_refs = self._collect_global_refs(node)
-                    self._functions[name] = function_info
-                    self._collect_global_variable_dependencies(
-                        node, True, name)
-        for child in node.get_children():
-            self._extract_function_info(child)
-
-    def _collect_function_dependency_refs(self, node) -> list[FunctionDependencyRef]:
+    def _extract_functions(self, function_nodes: list[cindex.Cursor]):
         """
-        Recursively collect function dependency references with USR when available.
-        Raises ValueError for unresolved non-system references.
+        Extracts the information of the function definitions found by `_collect_declarations`,
+        sweeping each function body once.
         """
-        refs: list[FunctionDependencyRef] = []
-        if not node:
-            return refs
+        for node in function_nodes:
+            name = node.spelling
+            return_type = node.result_type.spelling
+            arguments = [(arg.spelling, arg.type.spelling)
+                         for arg in node.get_arguments()]
 
-        def is_function_reference(cursor: cindex.Cursor) -> bool:
-            if cursor.kind == CursorKind.DECL_REF_EXPR:
-                return bool(cursor.referenced and cursor.referenced.kind == CursorKind.FUNCTION_DECL)
-            return False
+            scan = self._scan_cursor(node)
 
-        for child in node.get_children():
-            if child.kind == CursorKind.CALL_EXPR or is_function_reference(child):
-                called = child.referenced
-                if called:
-                    # Skip calls through function pointers/variables; only treat real function decls as deps.
-                    if called.kind != CursorKind.FUNCTION_DECL:
-                        refs.extend(self._collect_function_dependency_refs(child))
-                        continue
-                    if called.location and not self._is_in_system_header(called):
-                        usr = None
-                        try:
-                            usr = called.get_usr()
-                        except Exception:
-                            usr = None
-                        loc = None
-                        try:
-                            if child.location and child.location.file:
-                                loc = f"{child.location.file.name}:{child.location.line}"
-                        except Exception:
-                            loc = None
-                        refs.append(FunctionDependencyRef(
-                            name=called.spelling,
-                            usr=usr,
-                            tu_path=None,
-                            target=None,
-                            location=loc,
-                        ))
-                else:
-                    # Unresolved reference not in system header -> raise
-                    if not self._is_in_system_header(child):
-                        callee = child.spelling or child.displayname or "<unknown>"
-                        loc = None
-                        try:
-                            if child.location and child.location.file:
-                                loc = f"{child.location.file.name}:{child.location.line}"
-                        except Exception:
-                            loc = None
-                        raise ValueError(
-                            f"Unresolved reference: {callee} (USR=None) at {loc or self.filename}. "
-                            f"Hint: ensure defining .c is in compile_commands.json and flags are correct."
-                        )
-            refs.extend(self._collect_function_dependency_refs(child))
-        return refs
+            # Collect functions
+            called_functions = []  # Keep blank for now, update later
+            self._function_refs[name] = scan.function_refs
 
-    def _collect_struct_refs(self, node) -> list[StructRef]:
-        refs: list[StructRef] = []
-        if not node:
-            return refs
-        for child in node.get_children():
+            # Collect structs
+            used_structs = set()
+            used_type_aliases = {}
+            for used_struct_name in scan.struct_names:
+                if used_struct_name in self._structs_unions:
+                    used_structs.add(
+                        self._structs_unions[used_struct_name])
+                elif used_struct_name in self._type_alias:
+                    original_struct_name = self._type_alias[used_struct_name]
+                    if original_struct_name in self._structs_unions:
+                        used_structs.add(
+                            self._structs_unions[self._type_alias[used_struct_name]])
+                    used_type_aliases[used_struct_name] = self._type_alias[used_struct_name]
+
+            # Collect global variables
+            used_global_vars = set()
+            for var_cursor in scan.global_vars:
+                global_var = self._record_global_var(var_cursor)
+                used_global_vars.add(global_var)
+            # Collect enums
+            used_enums = self._record_enum_uses(scan.enum_uses)
+            used_enum_values = set()
+            used_enum_definitions = set()
+            for used_enum in used_enums:
+                if type(used_enum) == EnumValueInfo:
+                    used_enum_values.add(used_enum)
+                else:
+                    used_enum_definitions.add(used_enum)
+            function_info = FunctionInfo(
+                node,
+                name,
+                return_type,
+                arguments,
+                called_functions,
+                list(used_structs),
+                list(used_global_vars),
+                list(used_enum_values),
+                list(used_enum_definitions),
+                used_type_aliases,
+                called_function_names=[]
+            )
+            try:
+                function_info.usr = node.get_usr()
+            except Exception:
+                function_info.usr = ""
+            # Populate new reference lists (struct/enum/global) for this function
+            function_info.struct_dependency_refs = scan.struct_refs
+            function_info.enum_dependency_refs = scan.enum_refs
+            function_info.global_dependency_refs = scan.global_refs
+            for stdio in scan.stdio:
+                function_info.add_stdio(stdio)
+            self._functions[name] = function_info
+
+    def _scan_cursor(self, node) -> _CursorScan:
+        """
+        Collects everything the extraction needs from the descendants of `node` (not
+        `node` itself) in a single iterative preorder sweep, so deeply nested code
+        does not hit the Python recursion limit.
+        Raises ValueError for unresolved non-system function references.
+        """
+        scan = _CursorScan()
+        stack = list(reversed(list(node.get_children())))
+        while stack:
+            child = stack.pop()
+            stack.extend(reversed(list(child.get_children())))
             kind = child.kind
-            if kind in (cindex.CursorKind.TYPE_REF, cindex.CursorKind.STRUCT_DECL, cindex.CursorKind.UNION_DECL):
-                ref_cursor = child.referenced if kind == cindex.CursorKind.TYPE_REF else child
-                if ref_cursor and not self._is_in_system_header(ref_cursor):
-                    name = ref_cursor.spelling
-                    usr = None
-                    try:
-                        usr = ref_cursor.get_usr()
-                    except Exception:
-                        usr = None
-                    tu_path = None
-                    try:
-                        decl = ref_cursor.get_definition() or ref_cursor
-                        if decl and decl.location and decl.location.file and os.path.samefile(decl.location.file.name, self.filename):
-                            tu_path = self.filename
-                    except Exception:
-                        tu_path = None
-                    refs.append(StructRef(name=name, usr=usr, tu_path=tu_path))
-            refs.extend(self._collect_struct_refs(child))
-        return refs
-
-    def _collect_enum_refs(self, node) -> list[EnumRef]:
-        refs: list[EnumRef] = []
-        if not node:
-            return refs
-        for child in node.get_children():
-            if child.kind in (cindex.CursorKind.TYPE_REF, cindex.CursorKind.ENUM_DECL, cindex.CursorKind.DECL_REF_EXPR):
-                ref_cursor = None
-                if child.kind == cindex.CursorKind.TYPE_REF:
-                    candidate = child.referenced
-                    if candidate and candidate.kind == cindex.CursorKind.ENUM_DECL:
-                        ref_cursor = candidate
-                elif child.kind == cindex.CursorKind.ENUM_DECL:
-                    ref_cursor = child
-                elif child.kind == cindex.CursorKind.DECL_REF_EXPR and child.referenced and child.referenced.kind == cindex.CursorKind.ENUM_CONSTANT_DECL:
-                    ref_cursor = child.referenced.semantic_parent
-                if ref_cursor and not self._is_in_system_header(ref_cursor):
-                    name = ref_cursor.spelling
-                    usr = None
-                    try:
-                        usr = ref_cursor.get_usr()
-                    except Exception:
-                        usr = None
-                    tu_path = None
-                    try:
-                        decl = ref_cursor.get_definition() or ref_cursor
-                        if decl and decl.location and decl.location.file and os.path.samefile(decl.location.file.name, self.filename):
-                            tu_path = self.filename
-                    except Exception:
-                        tu_path = None
-                    refs.append(EnumRef(name=name, usr=usr, tu_path=tu_path))
-            refs.extend(self._collect_enum_refs(child))
-        return refs
-
-    def _collect_global_refs(self, node) -> list[GlobalVarRef]:
-        refs: list[GlobalVarRef] = []
-        if not node:
-            return refs
-        for child in node.get_children():
-            if child.kind == cindex.CursorKind.DECL_REF_EXPR and not self._is_in_system_header(child):
-                ref_cursor = child.referenced
-                if ref_cursor and ref_cursor.kind == cindex.CursorKind.VAR_DECL:
-                    if ref_cursor.spelling in standard_io:
-                        pass
-                    else:
-                        name = ref_cursor.spelling
-                        usr = None
-                        try:
-                            usr = ref_cursor.get_usr()
-                        except Exception:
-                            usr = None
-                        tu_path = None
-                        try:
-                            decl = ref_cursor.get_definition() or ref_cursor
-                            if decl and decl.location and decl.location.file and os.path.samefile(decl.location.file.name, self.filename):
-                                tu_path = self.filename
-                        except Exception:
-                            tu_path = None
-                        refs.append(GlobalVarRef(name=name, usr=usr, tu_path=tu_path))
-            refs.extend(self._collect_global_refs(child))
-        return refs
-
-    def _collect_structs_unions_dependencies(self, node):
-        """
-        Recursively collects the names of structs / unions used within the given node.
-        """
-        used_structs = set()
-        for child in node.get_children():
-            if child.kind == cindex.CursorKind.TYPE_REF or child.kind == cindex.CursorKind.STRUCT_DECL or child.kind == cindex.CursorKind.UNION_DECL:
+
+            if kind == CursorKind.DECL_REF_EXPR:
+                referenced = child.referenced
+                if referenced is not None and referenced.kind == CursorKind.FUNCTION_DECL:
+                    self._scan_function_ref(scan, child, referenced)
+                elif referenced is not None and referenced.kind == CursorKind.ENUM_CONSTANT_DECL:
+                    enum_decl = referenced.semantic_parent
+                    if enum_decl and not self._is_in_system_header(enum_decl):
+                        usr, tu_path = self._symbol_identity(enum_decl)
+                        scan.enum_refs.append(
+                            EnumRef(name=enum_decl.spelling, usr=usr, tu_path=tu_path))
+                if self._is_in_system_header(child):
+                    if child.spelling in standard_io:
+                        # for standard I/O
+                        scan.stdio.append(child.spelling)
+                    continue
+                if referenced is None:
+                    continue
+                if referenced.kind == CursorKind.VAR_DECL:
+                    if referenced.storage_class == cindex.StorageClass.STATIC or referenced.linkage == cindex.LinkageKind.EXTERNAL:
+                        scan.global_vars.append(referenced)
+                    if referenced.spelling not in standard_io:
+                        usr, tu_path = self._symbol_identity(referenced)
+                        scan.global_refs.append(
+                            GlobalVarRef(name=referenced.spelling, usr=usr, tu_path=tu_path))
+                elif referenced.kind == CursorKind.ENUM_CONSTANT_DECL:
+                    scan.enum_uses.append(referenced)
+
+            elif kind == CursorKind.CALL_EXPR:
+                self._scan_function_ref(scan, child, child.referenced)
+
+            elif kind in (CursorKind.TYPE_REF, CursorKind.STRUCT_DECL, CursorKind.UNION_DECL):
+                in_system_header = self._is_in_system_header(child)
                 # Exclude structs declared in system headers
                 # TODO: Maybe problematic if we ignore dependencies in system headers (e.g. network socket structs)
-                if child.location and not self._is_in_system_header(child):
+                if child.location and not in_system_header:
                     if child.spelling.startswith("struct ") or child.spelling.startswith("union "):
                         # handle the `struct NAME` and `union NAME` cases
-                        used_structs.add(child.spelling.split(" ")[1])
+                        scan.struct_names.add(child.spelling.split(" ")[1])
                     else:
-                        used_structs.add(child.spelling)
-            used_structs.update(
-                self._collect_structs_unions_dependencies(child))
-        return used_structs
+                        scan.struct_names.add(child.spelling)
 
-    def _collect_global_variable_dependencies(self, node, stdio=False, function_name=None):
+                if kind == CursorKind.TYPE_REF:
+                    ref_cursor = child.referenced
+                    ref_in_system_header = bool(ref_cursor) and self._is_in_system_header(ref_cursor)
+                else:
+                    ref_cursor = child
+                    ref_in_system_header = in_system_header
+                if ref_cursor and not ref_in_system_header:
+                    usr, tu_path = self._symbol_identity(ref_cursor)
+                    scan.struct_refs.append(
+                        StructRef(name=ref_cursor.spelling, usr=usr, tu_path=tu_path))
+                if kind == CursorKind.TYPE_REF and ref_cursor and ref_cursor.kind == CursorKind.ENUM_DECL:
+                    scan.enum_uses.append(ref_cursor)
+                    if not ref_in_system_header:
+                        usr, tu_path = self._symbol_identity(ref_cursor)
+                        scan.enum_refs.append(
+                            EnumRef(name=ref_cursor.spelling, usr=usr, tu_path=tu_path))
+
+            elif kind == CursorKind.ENUM_DECL:
+                scan.enum_uses.append(child)
+                if not self._is_in_system_header(child):
+                    usr, tu_path = self._symbol_identity(child)
+                    scan.enum_refs.append(
+                        EnumRef(name=child.spelling, usr=usr, tu_path=tu_path))
+        return scan
+
+    def _scan_function_ref(self, scan: _CursorScan, child: cindex.Cursor, called: cindex.Cursor | None):
+        """
+        Records the call / function reference `child` (to `called`) in `scan`.
+        """
+        if called:
+            # Skip calls through function pointers/variables; only treat real function decls as deps.
+            if called.kind != CursorKind.FUNCTION_DECL:
+                return
+            if called.location and not self._is_in_system_header(called):
+                usr = None
+                try:
+                    usr = called.get_usr()
+                except Exception:
+                    usr = None
+                scan.function_refs.append(FunctionDependencyRef(
+                    name=called.spelling,
+                    usr=usr,
+                    tu_path=None,
+                    target=None,
+                    location=self._cursor_location(child),
+                ))
+        else:
+            # Unresolved reference not in system header -> raise
+            if not self._is_in_system_header(child):
+                callee = child.spelling or child.displayname or "<unknown>"
+                loc = self._cursor_location(child)
+                raise ValueError(
+                    f"Unresolved reference: {callee} (USR=None) at {loc or self.filename}. "
+                    f"Hint: ensure defining .c is in compile_commands.json and flags are correct."
+                )
+
+    @staticmethod
+    def _cursor_location(cursor: cindex.Cursor) -> str | None:
+        try:
+            if cursor.location and cursor.location.file:
+                return f"{cursor.location.file.name}:{cursor.location.line}"
+        except Exception:
+            pass
+        return None
+
+    def _symbol_identity(self, ref_cursor: cindex.Cursor) -> tuple[str | None, str | None]:
         """
-        Recursively collects the names of global variables used within the given node.
+        Returns the USR of `ref_cursor` and this TU's path if it is defined here.
         """
-        used_global_vars = set()
-        for child in node.get_children():
-            if child.kind == cindex.CursorKind.DECL_REF_EXPR and not self._is_in_system_header(child):
-                referenced_cursor = child.referenced
-                if referenced_cursor.kind == cindex.CursorKind.VAR_DECL:
-                    if referenced_cursor.storage_class == cindex.StorageClass.STATIC or referenced_cursor.linkage == cindex.LinkageKind.EXTERNAL:
-                        global_var = GlobalVarInfo(referenced_cursor)
-                        used_enums = self._collect_enum_dependencies(referenced_cursor)
-                        enum_values = set()
-                        enum_defs = set()
-                        for used_enum in used_enums:
-                            if isinstance(used_enum, EnumValueInfo):
-                                enum_values.add(used_enum)
-                                enum_defs.add(used_enum.definition)
-                            else:
-                                enum_defs.add(used_enum)
-                        global_var.set_enum_dependencies(
-                            sorted(enum_values, key=lambda e: e.name),
-                            sorted(enum_defs, key=lambda e: e.name),
-                        )
-                        used_global_vars.add(global_var)
-                        self._global_vars[global_var.name] = global_var
-            elif child.kind == cindex.CursorKind.DECL_REF_EXPR and child.spelling in standard_io and stdio:
-                # for standard I/O
-                assert function_name is not None
-                self._functions[function_name].add_stdio(child.spelling)
-            used_global_vars.update(self._collect_global_variable_dependencies(
-                child,
-                stdio,
-                function_name
-            ))
-        return used_global_vars
-
-    def _collect_enum_dependencies(self, node):
-        """
-        Recursively collects all the enum items used within the given node.
+        usr = None
+        try:
+            usr = ref_cursor.get_usr()
+        except Exception:
+            usr = None
+        tu_path = None
+        try:
+            decl = ref_cursor.get_definition() or ref_cursor
+            if decl and decl.location and decl.location.file and os.path.samefile(decl.location.file.name, self.filename):
+                tu_path = self.filename
+        except Exception:
+            tu_path = None
+        return usr, tu_path
+
+    def _record_global_var(self, var_cursor: cindex.Cursor) -> GlobalVarInfo:
+        """
+        Registers the global variable declared by `var_cursor`, with the enums its declaration uses.
+        """
+        global_var = GlobalVarInfo(var_cursor)
+        key = (global_var.location, var_cursor.extent.end.offset)
+        if key not in self._global_var_enums:
+            # A global's declaration is swept once, however often it is referenced
+            used_enums = self._record_enum_uses(self._scan_cursor(var_cursor).enum_uses)
+            enum_values = set()
+            enum_defs = set()
+            for used_enum in used_enums:
+                if isinstance(used_enum, EnumValueInfo):
+                    enum_values.add(used_enum)
+                    enum_defs.add(used_enum.definition)
+                else:
+                    enum_defs.add(used_enum)
+            self._global_var_enums[key] = (
+                sorted(enum_values, key=lambda e: e.name),
+                sorted(enum_defs, key=lambda e: e.name),
+            )
+        global_var.set_enum_dependencies(*self._global_var_enums[key])
+        self._global_vars[global_var.name] = global_var
+        return global_var
+
+    def _record_enum_uses(self, enum_uses: list[cindex.Cursor]) -> set[EnumInfo | EnumValueInfo]:
+        """
+        Registers the enums and enum constants in `enum_uses` and returns their infos.
         """
         used_enums = set()
-        for child in node.get_children():
-            if child.kind == cindex.CursorKind.DECL_REF_EXPR and not self._is_in_system_header(child):
-                referenced_cursor = child.referenced
-                if referenced_cursor.kind == cindex.CursorKind.ENUM_CONSTANT_DECL:
-                    enum_value_info = EnumValueInfo(referenced_cursor)
-                    self._enums[enum_value_info.definition.name] = enum_value_info.definition
-                    used_enums.add(enum_value_info)
-            elif child.kind == cindex.CursorKind.TYPE_REF or child.kind == cindex.CursorKind.ENUM_DECL:
-                if child.kind == cindex.CursorKind.TYPE_REF:
-                    referenced_type = child.referenced
-                    if referenced_type.kind == cindex.CursorKind.ENUM_DECL:
-                        enum_info = EnumInfo(referenced_type)
-                        self._enums[enum_info.name] = enum_info
-                        used_enums.add(enum_info)
-                else:  # ENUM_DECL
-                    enum_info = EnumInfo(child)
-                    self._enums[enum_info.name] = enum_info
-                    used_enums.add(enum_info)
-
-            used_enums.update(self._collect_enum_dependencies(child))
+        for cursor in enum_uses:
+            if cursor.kind == cindex.CursorKind.ENUM_CONSTANT_DECL:
+                enum_value_info = EnumValueInfo(cursor)
+                self._enums[enum_value_info.definition.name] = enum_value_info.definition
+                used_enums.add(enum_value_info)
+            else:
+                enum_info = EnumInfo(cursor)
+                self._enums[enum_info.name] = enum_info
+                used_enums.add(enum_info)
         return used_enums
 
     def retrieve_all_struct_dependencies(self, struct_union: StructInfo):
@@ -1093,16 +1115,15 @@ class CParser:
             self._macro_defs_for_function[function_name] = []
             return []
 
-        self._build_macro_index()
         func_extent = raw_cursor.extent
         direct_names: set[str] = set()
-        for macro_cursor in self._macro_expand_cursors:
-            if not self._extent_contains(func_extent, macro_cursor.extent):
-                continue
-            name = macro_cursor.spelling
-            if name.startswith("__"):
-                continue
-            direct_names.add(name)
+        if func_extent.start.file:
+            for name in self._macro_expansions.contained_in(
+                func_extent.start.file.name, func_extent.start.offset, func_extent.end.offset
+            ):
+                if name.startswith("__"):
+                    continue
+                direct_names.add(name)
 
         # BFS to collect macro dependency closure
         closure: list[tuple[str, cindex.Cursor | None]] = []
@@ -1150,22 +1171,27 @@ class CParser:
             # Fallback to node's own location heuristic
             location = getattr(node, "location", None)
             if location and getattr(location, "file", None):
-                node_file_name = location.file.name
-                for include_path in self.compiler_include_paths:
-                    if node_file_name.startswith(include_path):
-                        return True
-                return bool(cindex.conf.lib.clang_Location_isInSystemHeader(location))
+                return self._is_system_location(location)
             return True
+        location = getattr(subject, "location", node.location)
         try:
-            node_file_name = subject.location.file.name
+            location.file.name
         except AttributeError:
             return False
-        # search for the file in the include paths
-        for include_path in self.compiler_include_paths:
-            if node_file_name.startswith(include_path):
-                return True
+        return self._is_system_location(location)
 
-        return bool(cindex.conf.lib.clang_Location_isInSystemHeader(getattr(subject, "location", node.location)))
+    def _is_system_location(self, location: cindex.SourceLocation) -> bool:
+        """
+        Determines if the file of `location` is a system header. Classified once per file.
+        """
+        file_name = location.file.name
+        is_system = self._system_files.get(file_name)
+        if is_system is None:
+            # search for the file in the include paths
+            is_system = self._include_prefixes.matches(file_name) or bool(
+                cindex.conf.lib.clang_Location_isInSystemHeader(location))
+            self._system_files[file_name] = is_system
+        return is_system
 
     def print_ast(self, node=None, indent=0):
         """
@@ -1254,21 +1280,13 @@ class CParser:
 
 @lru_cache(maxsize=1)
 def _discover_intrinsic_aliases() -> dict[str, str]:
-    """Probe the active compiler once to discover intrinsic typedef aliases."""
+    """Discover intrinsic typedef aliases from the (cached) clang toolchain probe."""
 
     alias_intrinsic = {
         "size_t": "__SIZE_TYPE__",
     }
 
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        path = os.path.join(tmp_dir, "empty.c")
-        with open(path, "w", encoding="utf-8") as handle:
-            handle.write("")
-        compiler = "clang"
-        result = utils.run_command([compiler, "-E", "-P", "-v", "-dD", path], check=True)
-        config = result.stdout
-
-    intrinsic_canonical = CParser._build_compiler_intrinsic_define_map(config)
+    intrinsic_canonical = toolchain.compiler_probe("clang").predefined_macros
     alias_canonical: dict[str, str] = {}
     for alias, intrinsic in alias_intrinsic.items():
         alias_canonical[alias] = intrinsic_canonical[intrinsic]
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import os
 import re
 import shutil
@@ -11,6 +13,7 @@ from sactor import logging as sactor_logging, utils
 from sactor.utils import get_temp_dir, read_file, read_file_lines
 
 from .c_parser import CParser
+from .preprocess_cache import PreprocessCache
 
 
 logger = sactor_logging.get_logger(__name__)
@@ -76,33 +79,57 @@ def remove_function_static_decorator(function_name: str, source_code: str) -> st
     return source_code
 
 
+def _parse_translation_unit(path: str, flags: list[str] | None = None) -> TranslationUnit:
+    """Parse `path` the way `CParser` does, without extracting anything from it."""
+    index = cindex.Index.create()
+    args = ['-x', 'c', '-std=c99'] + (flags or [])
+    args.extend([f"-I{include_path}" for include_path in utils.get_compiler_include_paths()])
+    return index.parse(
+        path, args=args, options=cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD)
+
+
+# Digests of (source, compile commands) pairs that already passed the compile check
+_compile_checked: set[str] = set()
+
+
+def _check_compiles(file_path: str, commands: list[list[str]]) -> None:
+    """Raise if `file_path` does not compile; identical content is only compiled once per process."""
+    digest = hashlib.sha256(
+        json.dumps([utils.file_sha256(file_path), commands]).encode("utf-8")).hexdigest()
+    if digest in _compile_checked:
+        return
+    # assume it is a library, compatible with the executable
+    utils.compile_c_code(file_path, commands=commands, is_library=True)
+    _compile_checked.add(digest)
+
+
 def expand_all_macros(input_file, commands: list[list[str]] | None=None):
     """
     Return:
     - no_test_output_filepath: source file for the translator
     """
-    if not commands:
-        commands = []
+    expanded_file, _ = _expand_all_macros(input_file, commands or [], utils.get_temp_dir())
+    return expanded_file
+
+
+def _expand_all_macros(input_file, commands: list[list[str]], work_dir: str) -> tuple[str, list[str]]:
+    """Expand `input_file` into `work_dir`; return the output path and the project headers pasted in."""
     filename = os.path.basename(input_file)
 
     if commands:
         compile_flags = utils.get_compile_flags_from_commands(commands)
     else:
         compile_flags = []
-    tmpdir = utils.get_temp_dir()
-    os.makedirs(tmpdir, exist_ok=True)
+    os.makedirs(work_dir, exist_ok=True)
+    expanded_headers: list[str] = []
 
-    def expand_custom_headers(tmp_file_path: str, flags: list):
+    def expand_custom_headers(tmp_file_path: str, flags: list) -> bool:
         """
         This will only expand the custom header non-recursively.
+        Returns whether any header was expanded.
         """
-        index = cindex.Index.create()
         compiler_include_paths = utils.get_compiler_include_paths()
-        args = ['-x', 'c', '-std=c99'] + (flags or [])
-        args.extend([f"-I{path}" for path in compiler_include_paths])
-        translation_unit = index.parse(
-                tmp_file_path, args=args, options=cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD)
-
+        translation_unit = _parse_translation_unit(tmp_file_path, flags)
         #map: line number -> include file path (if non-system)
         non_system_includes = {}
         for include in translation_unit.get_includes():
@@ -133,6 +160,7 @@ def expand_all_macros(input_file, commands: list[list[str]] | None=None):
                     header_file = non_system_includes[i]
                     try:
                         header_content = read_file(header_file)
+                        expanded_headers.append(header_file)
                         # Paste raw contents, but don't recursively expand
                         new_lines.append(f"/* Begin expanded {header_file} */\n")
                         new_lines.append(header_content)
@@ -147,14 +175,16 @@ def expand_all_macros(input_file, commands: list[list[str]] | None=None):
                     new_lines.append(line)
             with open(tmp_file_path, 'w') as f:
                 f.writelines(new_lines)
+        return bool(non_system_includes)
 
-    tmp_file_path = os.path.join(tmpdir, f"expanded_{filename}")
+    tmp_file_path = os.path.join(work_dir, f"expanded_{filename}")
     shutil.copy(input_file, tmp_file_path)
 
     # For #include, keep system headers, expand custom headers.
     while True:
         file_content_before = utils.read_file(tmp_file_path)
-        expand_custom_headers(tmp_file_path, compile_flags)
+        if not expand_custom_headers(tmp_file_path, compile_flags):
+            break
         file_content_after = utils.read_file(tmp_file_path)
         if file_content_before.strip() == file_content_after.strip():
             break
@@ -190,24 +220,56 @@ def expand_all_macros(input_file, commands: list[list[str]] | None=None):
         f.writelines(content)
 
     # check if it can compile, if not, will raise an error
-    # assume it is a library, compatible with the executable
-    utils.compile_c_code(tmp_file_path, commands=commands, is_library=True)
+    _check_compiles(tmp_file_path, commands)
+
+    return tmp_file_path, expanded_headers
+
 
-    return tmp_file_path
+def preprocess_source_code(
+    input_file,
+    commands: list[list[str]],
+    cache: Optional[PreprocessCache] = None,
+) -> str:
+    """Expand macros and project headers, unfold typedefs and drop `inline` specifiers.
 
+    All stages share one temporary directory, and typedef unfolding and the
+    `inline` removal share a single parse. With a `cache`, an unchanged input
+    (and unchanged project headers) skips the whole pipeline.
+    """
+    work_dir = utils.get_temp_dir()
+    output_file = os.path.join(work_dir, 'unfolded_typedefs.c')
+    if cache is not None:
+        cached = cache.get(input_file, commands)
+        if cached is not None:
+            logger.info("Reusing preprocessed source of %s", input_file)
+            with open(output_file, 'w') as f:
+                f.write(cached)
+            return output_file
 
-def preprocess_source_code(input_file, commands: list[list[str]]) -> str:
     # Expand all macros in the input file
-    expanded_file = expand_all_macros(input_file, commands)
-    # Unfold all typedefs in the expanded file
+    expanded_file, headers = _expand_all_macros(input_file, commands, work_dir)
+    # Unfold all typedefs in the expanded file and remove inline specifiers
     compile_flags = utils.get_compile_flags_from_commands(commands)
     include_flags = list(filter(lambda s: s.startswith("-I"), compile_flags))
-    unfolded_file = unfold_typedefs(expanded_file, include_flags)
-    cleaned_file = remove_inline_specifiers(unfolded_file, compile_flags)
+    cleaned_file = _unfold_typedefs(
+        expanded_file, include_flags, work_dir, inline_flags=compile_flags)
+
+    if cache is not None:
+        cache.put(input_file, commands, headers, read_file(cleaned_file))
     return cleaned_file
 
 
 def unfold_typedefs(input_file, compile_flags: list[str] = []):
+    return _unfold_typedefs(input_file, compile_flags, utils.get_temp_dir())
+
+
+def _unfold_typedefs(
+    input_file,
+    compile_flags: list[str],
+    work_dir: str,
+    inline_flags: Optional[list[str]] = None,
+) -> str:
+    """Write the unfolded source to `work_dir`; also remove `inline` specifiers if `inline_flags` is given."""
     c_parser = CParser(input_file, omit_error=True, extra_args=compile_flags)
 
     intrinsic_aliases = getattr(c_parser, "_intrinsic_alias", {}) or {}
@@ -235,11 +297,11 @@ def unfold_typedefs(input_file, compile_flags: list[str] = []):
             b2s,
         )
 
-    content = _expand_type_alias_tokens(content, type_aliases_no_intrinsic)
+    content = _expand_type_alias_tokens(
+        content, type_aliases_no_intrinsic, work_dir, inline_flags=inline_flags)
     content = re.sub(r"\n{3,}", "\n\n", content)
 
-    tmp_dir = utils.get_temp_dir()
-    output_file = os.path.join(tmp_dir, 'unfolded_typedefs.c')
+    output_file = os.path.join(work_dir, 'unfolded_typedefs.c')
     with open(output_file, 'w') as f:
         f.write(content)
 
@@ -369,8 +431,19 @@ def _render_enum_typedef(
     return enum_text
 
 
-def _expand_type_alias_tokens(content: str, type_aliases: dict[str, str]) -> str:
-    if not type_aliases:
+def _expand_type_alias_tokens(
+    content: str,
+    type_aliases: dict[str, str],
+    work_dir: Optional[str] = None,
+    inline_flags: Optional[list[str]] = None,
+) -> str:
+    """Replace uses of `type_aliases` in `content`.
+
+    If `inline_flags` is given, `inline` specifiers are removed as well,
+    from the same parse (with those flags).
+    """
+    remove_inline = inline_flags is not None
+    if not type_aliases and not remove_inline:
         return content
 
     prefix_lines = [f"typedef {target} {alias};" for alias, target in type_aliases.items()]
@@ -378,7 +451,7 @@ def _expand_type_alias_tokens(content: str, type_aliases: dict[str, str]) -> str
     if prefix:
         prefix += "\n\n"
 
-    tmp_dir = utils.get_temp_dir()
+    tmp_dir = work_dir or utils.get_temp_dir()
     tmp_file_path = os.path.join(tmp_dir, 'temp_unfolded.c')
     with open(tmp_file_path, 'w') as tmp_file:
         tmp_file.write(prefix + content)
@@ -390,10 +463,16 @@ def _expand_type_alias_tokens(content: str, type_aliases: dict[str, str]) -> str
     tmp_file_abs = os.path.abspath(tmp_file_path)
 
     try:
-        temp_parser = CParser(tmp_file_path, omit_error=True)
-        tokens = list(temp_parser.translation_unit.get_tokens(extent=temp_parser.translation_unit.cursor.extent))
+        translation_unit = _parse_translation_unit(tmp_file_path, inline_flags)
+        tokens = list(translation_unit.get_tokens(extent=translation_unit.cursor.extent))
 
         replacements: list[_TypedefEdit] = []
+        if remove_inline:
+            replacements.extend(
+                _TypedefEdit(start, end, "")
+                for start, end in _inline_specifier_spans(
+                    translation_unit, tmp_file_abs, content, b2s, min_offset=prefix_len_bytes)
+            )
         visited_offsets: set[int] = set()
 
         disallowed_cursor_kinds = {
@@ -487,7 +566,10 @@ def _expand_type_alias_tokens(content: str, type_aliases: dict[str, str]) -> str
             content = content[:edit.start] + edit.text + content[edit.end:]
 
     finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if work_dir:
+            os.remove(tmp_file_path)
+        else:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
 
     if prefix_len_chars:
         content = content[prefix_len_chars:]
@@ -517,13 +599,36 @@ def remove_inline_specifiers(input_file: str, compile_flags: list[str] | None =
     compile_flags = compile_flags or []
     main_file_path = os.path.abspath(input_file)
 
-    c_parser = CParser(input_file, omit_error=True, extra_args=compile_flags)
+    translation_unit = _parse_translation_unit(input_file, compile_flags)
     content, _, b2s, _ = utils.load_text_with_mappings(input_file)
 
+    spans_to_remove = _inline_specifier_spans(translation_unit, main_file_path, content, b2s)
+    if not spans_to_remove:
+        return input_file
+
+    spans_to_remove.sort(key=lambda item: item[0], reverse=True)
+
+    for start, end in spans_to_remove:
+        content = content[:start] + content[end:]
+
+    with open(input_file, 'w') as f:
+        f.write(content)
+
+    return input_file
+
+
+def _inline_specifier_spans(
+    translation_unit: TranslationUnit,
+    main_file_path: str,
+    content: str,
+    b2s: dict[int, int],
+    min_offset: int = 0,
+) -> list[tuple[int, int]]:
+    """Return the `content` spans of the `inline` specifiers (and following blanks) of functions in the main file."""
     spans_to_remove: list[tuple[int, int]] = []
     seen_spans: set[tuple[int, int]] = set()
 
-    for cursor in c_parser.translation_unit.cursor.walk_preorder():
+    for cursor in translation_unit.cursor.walk_preorder():
         if cursor.kind != cindex.CursorKind.FUNCTION_DECL:
             continue
         if cursor.location is None or cursor.location.file is None:
@@ -552,6 +657,8 @@ def remove_inline_specifiers(input_file: str, compile_flags: list[str] | None =
 
             if token.kind == cindex.TokenKind.KEYWORD and token.spelling == 'inline':
                 start_b = token.extent.start.offset
+                if start_b < min_offset:
+                    continue
                 end_b = token.extent.end.offset
                 start = utils.byte_to_str_index(b2s, start_b)
                 end = utils.byte_to_str_index(b2s, end_b)
@@ -564,15 +671,4 @@ def remove_inline_specifiers(input_file: str, compile_flags: list[str] | None =
                     spans_to_remove.append(span)
                     seen_spans.add(span)
 
-    if not spans_to_remove:
-        return input_file
-
-    spans_to_remove.sort(key=lambda item: item[0], reverse=True)
-
-    for start, end in spans_to_remove:
-        content = content[:start] + content[end:]
-
-    with open(input_file, 'w') as f:
-        f.write(content)
-
-    return input_file
+    return spans_to_remove
@@ -0,0 +1,108 @@
+import dataclasses
+import os
+from importlib import metadata
+from typing import TYPE_CHECKING, Optional
+
+from clang import cindex
+
+from sactor import logging as sactor_logging
+from sactor import utils
+
+if TYPE_CHECKING:
+    from .project_index import TranslationUnitSummary
+
+logger = sactor_logging.get_logger(__name__)
+
+_FORMAT_VERSION = 1
+
+
+def libclang_version() -> str:
+    """Identify the libclang build, so results of another version are not reused."""
+    for dist in ("libclang", "clang"):
+        try:
+            version = metadata.version(dist)
+            break
+        except metadata.PackageNotFoundError:
+            continue
+    else:
+        version = "unknown"
+    return f"{version}:{cindex.conf.get_filename()}"
+
+
+class ParseCache:
+    """On-disk cache of per-TU `TranslationUnitSummary` results.
+
+    An entry is addressed by the TU path, its content hash, the compile flags
+    and the libclang version, and remembers the content hashes of every file
+    the TU included. It is reused only while all of those files are
+    unchanged, so editing a header invalidates exactly the TUs including it.
+    Entries are single JSON files written atomically, so concurrent runs may
+    share a cache directory.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._store = utils.JsonEntryStore(path, _FORMAT_VERSION)
+        self._clang_version = libclang_version()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["ParseCache"]:
+        cache_config = config.get('parse_cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        path = cache_config.get('path') or utils.get_cache_dir("parse")
+        return cls(os.path.expanduser(path))
+
+    def _key(self, tu_path: str, compile_flags: list[str]) -> Optional[str]:
+        try:
+            content_hash = utils.file_sha256(tu_path)
+        except OSError:
+            return None
+        return self._store.key(
+            os.path.realpath(tu_path), content_hash, list(compile_flags), self._clang_version)
+
+    def get(self, tu_path: str, compile_flags: list[str]) -> Optional["TranslationUnitSummary"]:
+        from .project_index import TranslationUnitSummary
+
+        key = self._key(tu_path, compile_flags)
+        entry = self._store.load(key) if key else None
+        if entry is None or not self._inputs_unchanged(entry.get("inputs", {})):
+            self.misses += 1
+            return None
+        self.hits += 1
+        fields = entry["summary"]
+        return TranslationUnitSummary(
+            path=tu_path,
+            functions=[tuple(item) for item in fields["functions"]],
+            calls=[tuple(item) for item in fields["calls"]],
+            structs=[tuple(item) for item in fields["structs"]],
+            enums=[tuple(item) for item in fields["enums"]],
+            global_vars=[tuple(item) for item in fields["global_vars"]],
+            includes=list(fields["includes"]),
+        )
+
+    @staticmethod
+    def _inputs_unchanged(inputs: dict[str, str]) -> bool:
+        for path, digest in inputs.items():
+            try:
+                if utils.file_sha256(path) != digest:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def put(self, summary: "TranslationUnitSummary", compile_flags: list[str]) -> None:
+        key = self._key(summary.path, compile_flags)
+        if key is None:
+            return
+        inputs = {}
+        for path in summary.includes:
+            try:
+                inputs[path] = utils.file_sha256(path)
+            except OSError:
+                # Cannot validate the entry later; do not cache it
+                return
+        entry = {"inputs": inputs, "summary": dataclasses.asdict(summary)}
+        self._store.store(key, entry)
@@ -0,0 +1,86 @@
+import os
+from typing import Optional
+
+from sactor import logging as sactor_logging
+from sactor import utils
+
+from .parse_cache import libclang_version
+
+logger = sactor_logging.get_logger(__name__)
+
+_FORMAT_VERSION = 1
+
+
+class PreprocessCache:
+    """On-disk cache of `preprocess_source_code` results.
+
+    An entry is addressed by the input file (path and content hash), its
+    compile commands, the compiler include paths and the libclang version,
+    and remembers the content hashes of the project headers that were
+    pasted into it. It is reused only while those headers are unchanged.
+    Entries are single JSON files written atomically, so concurrent runs
+    may share a cache directory. A stored result already passed the
+    compile check, so a hit skips that compile too.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._store = utils.JsonEntryStore(path, _FORMAT_VERSION)
+        self._clang_version = libclang_version()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["PreprocessCache"]:
+        cache_config = config.get('preprocess_cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        path = cache_config.get('path') or utils.get_cache_dir("preprocess")
+        return cls(os.path.expanduser(path))
+
+    def _key(self, input_file: str, commands: list[list[str]]) -> Optional[str]:
+        try:
+            content_hash = utils.file_sha256(input_file)
+        except OSError:
+            return None
+        return self._store.key(
+            os.path.realpath(input_file),
+            content_hash,
+            commands,
+            utils.get_compiler_include_paths(),
+            self._clang_version,
+        )
+
+    def get(self, input_file: str, commands: list[list[str]]) -> Optional[str]:
+        """Return the preprocessed source of `input_file`, or None on a miss."""
+        key = self._key(input_file, commands)
+        entry = self._store.load(key) if key else None
+        if entry is None or not self._inputs_unchanged(entry.get("inputs", {})):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["output"]
+
+    @staticmethod
+    def _inputs_unchanged(inputs: dict[str, str]) -> bool:
+        for path, digest in inputs.items():
+            try:
+                if utils.file_sha256(path) != digest:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def put(self, input_file: str, commands: list[list[str]], headers: list[str], output: str) -> None:
+        key = self._key(input_file, commands)
+        if key is None:
+            return
+        inputs = {}
+        for path in headers:
+            try:
+                inputs[path] = utils.file_sha256(path)
+            except OSError:
+                # Cannot validate the entry later; do not cache it
+                return
+        entry = {"inputs": inputs, "output": output}
+        self._store.store(key, entry)
@@ -1,61 +1,292 @@
 import heapq
 import os
-from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from typing import Optional
 
 from sactor import logging as sactor_logging, utils
 from sactor.c_parser import CParser
+from sactor.c_parser.parse_cache import ParseCache
 
 logger = sactor_logging.get_logger(__name__)
 
 
-def order_translation_units_by_dependencies(
-    translation_units: list[str],
-    compile_commands_file: str,
-) -> list[str]:
-    if not compile_commands_file:
-        return translation_units
+@dataclass
+class TranslationUnitSummary:
+    """What the project-level passes need to know about one parsed TU.
 
-    function_usr_to_tu: dict[str, str] = {}
-    tu_called_usrs: dict[str, set[str]] = {}
-    index_lookup = {path: idx for idx, path in enumerate(translation_units)}
+    Plain data only, so an index can be pickled into worker processes.
+    """
 
-    for tu_path in translation_units:
-        commands = utils.load_compile_commands_from_file(
-            compile_commands_file,
-            tu_path,
-        )
-        compile_flags = utils.get_compile_flags_from_commands(commands)
-
-        parser = CParser(tu_path, extra_args=compile_flags, omit_error=True)
-        called_here: set[str] = set()
-
-        for function in parser.get_functions():
-            usr = getattr(function, "usr", "") or ""
-            existing_owner = function_usr_to_tu.get(usr)
-            if usr and existing_owner and existing_owner != tu_path:
-                logger.warning(
-                    "Function USR %s defined in multiple translation units (%s, %s); "
-                    "dependency ordering may be ambiguous.",
-                    usr or function.name,
-                    existing_owner,
-                    tu_path,
-                )
-            else:
-                if usr:
-                    function_usr_to_tu.setdefault(usr, tu_path)
+    path: str
+    # (name, usr) of every function defined in the TU, in parser order
+    functions: list[tuple[str, str]] = field(default_factory=list)
+    # Call edges: (caller name, callee usr, callee name)
+    calls: list[tuple[str, str, str]] = field(default_factory=list)
+    # (usr, defining file) of the structs/enums/globals visible to the TU
+    structs: list[tuple[str, str]] = field(default_factory=list)
+    enums: list[tuple[str, str]] = field(default_factory=list)
+    global_vars: list[tuple[str, str]] = field(default_factory=list)
+    # Every file the TU includes (directly or not), TU itself first
+    includes: list[str] = field(default_factory=list)
+
+    @property
+    def called_usrs(self) -> set[str]:
+        return {usr for _caller, usr, _name in self.calls}
+
+    @property
+    def defines_main(self) -> bool:
+        return any(name == "main" for name, _usr in self.functions)
+
+
+def _node_usr_and_file(info, tu_path: str) -> tuple[str, str]:
+    try:
+        usr = info.node.get_usr()  # type: ignore[attr-defined]
+    except Exception:
+        usr = None
+    if not usr:
+        return "", tu_path
+    return usr, getattr(info.node.location.file, "name", tu_path)
+
+
+def summarize_translation_unit(tu_path: str, compile_flags: list[str]) -> TranslationUnitSummary:
+    """Parse `tu_path` once and extract its symbols and call edges."""
+    parser = CParser(tu_path, extra_args=compile_flags, omit_error=True)
+    summary = TranslationUnitSummary(path=tu_path, includes=[tu_path])
+    for inclusion in parser.translation_unit.get_includes():
+        name = getattr(inclusion.include, "name", None)
+        if name and name not in summary.includes:
+            summary.includes.append(name)
+    for function in parser.get_functions() or []:
+        usr = getattr(function, "usr", "") or ""
+        summary.functions.append((function.name, usr))
+        for ref in getattr(function, "function_dependencies", []) or []:
+            ref_usr = getattr(ref, "usr", None)
+            if ref_usr:
+                summary.calls.append((function.name, ref_usr, getattr(ref, "name", ref_usr)))
+    for infos, out in (
+        (parser.get_structs(), summary.structs),
+        (parser.get_enums(), summary.enums),
+        (parser.get_global_vars(), summary.global_vars),
+    ):
+        for info in infos or []:
+            usr, def_file = _node_usr_and_file(info, tu_path)
+            if usr:
+                out.append((usr, def_file))
+    return summary
+
+
+class ProjectIndex:
+    """Symbols, USRs and call edges of every TU of a compilation database.
+
+    Each TU is parsed with libclang once; ordering, ownership maps, the link
+    closure, the non-function definition maps and the project combiner all
+    query the same index. `for_compile_commands` memoizes indexes per process
+    until the compilation database or one of its sources changes.
+    """
+
+    # Last index built by `for_compile_commands`, with the file stats it depends on
+    _memo: Optional[tuple[tuple, "ProjectIndex"]] = None
+
+    def __init__(
+        self,
+        compile_commands_file: str,
+        units: dict[str, TranslationUnitSummary],
+        failures: Optional[dict[str, Exception]] = None,
+        translation_units: Optional[list[str]] = None,
+    ) -> None:
+        self.compile_commands_file = compile_commands_file
+        # Keyed by TU path, in compilation database order
+        self.units = units
+        # TUs that failed to parse, with their error; left out of `units`
+        self.failures = failures or {}
+        self._translation_units = translation_units if translation_units is not None else list(units)
+
+    @property
+    def translation_units(self) -> list[str]:
+        return list(self._translation_units)
+
+    def unit(self, tu_path: str) -> TranslationUnitSummary:
+        """Return the summary of `tu_path`; re-raise its parse error if it failed to parse."""
+        if tu_path in self.failures:
+            raise self.failures[tu_path]
+        return self.units[tu_path]
+
+    @classmethod
+    def build(
+        cls,
+        compile_commands_file: str,
+        translation_units: Optional[list[str]] = None,
+        cache: Optional[ParseCache] = None,
+        max_workers: int = 1,
+    ) -> "ProjectIndex":
+        """Index `translation_units` (default: all of the compilation database).
+
+        With `max_workers` > 1 the TUs missing from `cache` are parsed in a
+        process pool. Results are merged in `translation_units` order, so the
+        first-writer-wins ownership rules see the same order as a serial build.
+        """
+        if translation_units is None:
+            translation_units = utils.list_c_files_from_compile_commands(compile_commands_file)
+        flags: dict[str, list[str]] = {}
+        summaries: dict[str, TranslationUnitSummary] = {}
+        for tu_path in translation_units:
+            commands = utils.load_compile_commands_from_file(compile_commands_file, tu_path)
+            flags[tu_path] = utils.get_compile_flags_from_commands(commands)
+            summary = cache.get(tu_path, flags[tu_path]) if cache else None
+            if summary is not None:
+                summaries[tu_path] = summary
+
+        missing = [tu for tu in translation_units if tu not in summaries]
+        parsed: list[str] = []
+        failures: dict[str, Exception] = {}
+
+        def record(tu_path: str, summarize) -> None:
+            # A TU that fails to parse is left out of the index; queries that need it re-raise
+            try:
+                summaries[tu_path] = summarize()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("Skipping %s during project indexing due to error: %s", tu_path, exc)
+                failures[tu_path] = exc
+                return
+            parsed.append(tu_path)
+
+        workers = min(max(1, int(max_workers)), len(missing))
+        if workers > 1:
+            logger.info("Parsing %d translation units with %d processes", len(missing), workers)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(summarize_translation_unit, tu_path, flags[tu_path])
+                           for tu_path in missing]
+                for tu_path, future in zip(missing, futures):
+                    record(tu_path, future.result)
+        else:
+            for tu_path in missing:
+                record(tu_path, lambda: summarize_translation_unit(tu_path, flags[tu_path]))
+        if cache:
+            for tu_path in parsed:
+                cache.put(summaries[tu_path], flags[tu_path])
+
+        units = {tu_path: summaries[tu_path] for tu_path in translation_units if tu_path in summaries}
+        if cache:
+            logger.info("Parse cache: %d of %d translation units reused", cache.hits, len(units))
+        logger.debug("Indexed %d translation units from %s", len(units), compile_commands_file)
+        return cls(compile_commands_file, units, failures, list(translation_units))
+
+    @classmethod
+    def for_compile_commands(
+        cls,
+        compile_commands_file: str,
+        cache: Optional[ParseCache] = None,
+        max_workers: int = 1,
+    ) -> "ProjectIndex":
+        """Return the index of `compile_commands_file`, reusing the last one built
+        in this process while none of its input files changed."""
+        if cls._memo is not None:
+            stats, index = cls._memo
+            if (os.path.realpath(index.compile_commands_file) == os.path.realpath(compile_commands_file)
+                    and stats == index._input_stats()):
+                return index
+        index = cls.build(compile_commands_file, cache=cache, max_workers=max_workers)
+        cls._memo = (index._input_stats(), index)
+        return index
+
+    def _input_stats(self) -> tuple:
+        paths = [self.compile_commands_file]
+        for unit in self.units.values():
+            paths.extend(unit.includes or [unit.path])
+        paths.extend(self.failures)
+        return tuple(self._stat_key(path) for path in paths)
+
+    @staticmethod
+    def _stat_key(path: str) -> tuple:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return (path, None)
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def _units_for(self, translation_units: Optional[list[str]]) -> list[TranslationUnitSummary]:
+        if translation_units is None:
+            translation_units = self.translation_units
+        return [self.unit(tu) for tu in translation_units]
+
+    def function_owners(
+        self,
+        translation_units: Optional[list[str]] = None,
+        conflict_note: str = "owner selection may be ambiguous",
+    ) -> dict[str, str]:
+        """Function USR -> defining TU; first writer wins, conflicts are logged."""
+        owners: dict[str, str] = {}
+        for unit in self._units_for(translation_units):
+            for name, usr in unit.functions:
+                if not usr:
+                    continue
+                existing_owner = owners.get(usr)
+                if existing_owner and existing_owner != unit.path:
+                    logger.warning(
+                        "Function USR %s defined in multiple translation units (%s, %s); %s.",
+                        usr or name,
+                        existing_owner,
+                        unit.path,
+                        conflict_note,
+                    )
+                else:
+                    owners.setdefault(usr, unit.path)
+        return owners
+
+    def symbol_owners(
+        self,
+        kind: str,
+        translation_units: Optional[list[str]] = None,
+    ) -> dict[str, str]:
+        """Struct/enum/global USR -> first TU (in order) that sees it."""
+        label = {"structs": "Struct", "enums": "Enum", "global_vars": "Global"}[kind]
+        owners: dict[str, str] = {}
+        for unit in self._units_for(translation_units):
+            for usr, _def_file in getattr(unit, kind):
+                existing_owner = owners.get(usr)
+                if existing_owner and existing_owner != unit.path:
+                    logger.warning(
+                        "%s USR %s observed in multiple translation units (%s, %s); owner selection may be ambiguous.",
+                        label,
+                        usr,
+                        existing_owner,
+                        unit.path,
+                    )
+                else:
+                    owners.setdefault(usr, unit.path)
+        return owners
 
-            # collect called usrs from unified refs
-            for ref in getattr(function, "function_dependencies", []) or []:
-                if getattr(ref, "usr", None):
-                    called_here.add(ref.usr)
+    def definition_files(self, kind: str) -> dict[str, str]:
+        """Struct/enum/global USR -> file holding the definition (first writer wins)."""
+        files: dict[str, str] = {}
+        for unit in self.units.values():
+            for usr, def_file in getattr(unit, kind):
+                files.setdefault(usr, def_file)
+        return files
 
-        tu_called_usrs[tu_path] = called_here
+    def main_translation_units(self) -> list[str]:
+        return [unit.path for unit in self.units.values() if unit.defines_main]
+
+
+def build_translation_unit_dependencies(
+    translation_units: list[str],
+    compile_commands_file: str,
+    index: Optional[ProjectIndex] = None,
+) -> dict[str, set[str]]:
+    """Map each translation unit to the other units whose functions it calls."""
+    if not compile_commands_file:
+        return {tu: set() for tu in translation_units}
+
+    if index is None:
+        index = ProjectIndex.for_compile_commands(compile_commands_file)
+    function_usr_to_tu = index.function_owners(
+        translation_units, "dependency ordering may be ambiguous")
 
     tu_dependencies: dict[str, set[str]] = {tu: set() for tu in translation_units}
-    for tu_path, called_usrs in tu_called_usrs.items():
+    for tu_path in translation_units:
         deps = set()
-        for usr in called_usrs:
+        for usr in index.unit(tu_path).called_usrs:
             owner = function_usr_to_tu.get(usr)
             if not owner:
                 # Non-system unresolved reference: raise with hint
@@ -66,6 +297,22 @@ def order_translation_units_by_dependencies(
             if owner != tu_path:
                 deps.add(owner)
         tu_dependencies[tu_path] = deps
+    return tu_dependencies
+
+
+def order_translation_units_by_dependencies(
+    translation_units: list[str],
+    compile_commands_file: str,
+    tu_dependencies: dict[str, set[str]] | None = None,
+    index: Optional[ProjectIndex] = None,
+) -> list[str]:
+    if not compile_commands_file:
+        return translation_units
+
+    if tu_dependencies is None:
+        tu_dependencies = build_translation_unit_dependencies(
+            translation_units, compile_commands_file, index=index)
+    index_lookup = {path: idx for idx, path in enumerate(translation_units)}
 
     adjacency: dict[str, set[str]] = {tu: set() for tu in translation_units}
     indegree: dict[str, int] = {tu: 0 for tu in translation_units}
@@ -108,6 +355,7 @@ def order_translation_units_by_dependencies(
 def build_project_usr_owner_maps(
     translation_units: list[str],
     compile_commands_file: str,
+    index: Optional[ProjectIndex] = None,
 ) -> tuple[dict[str, str], dict[str, str], dict[str, str], dict[str, str]]:
     """Return project-wide USR owner maps for symbols visible in the compile DB.
 
@@ -118,94 +366,20 @@ def build_project_usr_owner_maps(
     - First writer wins in `translation_units` order (stable).
     - We warn on conflicting ownership (same USR seen from different TUs).
     """
-    function_usr_to_tu: dict[str, str] = {}
-    struct_usr_to_tu: dict[str, str] = {}
-    enum_usr_to_tu: dict[str, str] = {}
-    global_usr_to_tu: dict[str, str] = {}
-    for tu_path in translation_units:
-        commands = utils.load_compile_commands_from_file(
-            compile_commands_file,
-            tu_path,
-        )
-        compile_flags = utils.get_compile_flags_from_commands(commands)
-        parser = CParser(tu_path, extra_args=compile_flags, omit_error=True)
-        for function in parser.get_functions() or []:
-            usr = getattr(function, "usr", "") or ""
-            if not usr:
-                continue
-            existing_owner = function_usr_to_tu.get(usr)
-            if existing_owner and existing_owner != tu_path:
-                logger.warning(
-                    "Function USR %s defined in multiple translation units (%s, %s); owner selection may be ambiguous.",
-                    usr,
-                    existing_owner,
-                    tu_path,
-                )
-            else:
-                function_usr_to_tu.setdefault(usr, tu_path)
-
-        for struct in parser.get_structs() or []:
-            usr = None
-            try:
-                usr = struct.node.get_usr()  # type: ignore[attr-defined]
-            except Exception:
-                usr = None
-            if not usr:
-                continue
-            existing_owner = struct_usr_to_tu.get(usr)
-            if existing_owner and existing_owner != tu_path:
-                logger.warning(
-                    "Struct USR %s observed in multiple translation units (%s, %s); owner selection may be ambiguous.",
-                    usr,
-                    existing_owner,
-                    tu_path,
-                )
-            else:
-                struct_usr_to_tu.setdefault(usr, tu_path)
-
-        for enum in parser.get_enums() or []:
-            usr = None
-            try:
-                usr = enum.node.get_usr()  # type: ignore[attr-defined]
-            except Exception:
-                usr = None
-            if not usr:
-                continue
-            existing_owner = enum_usr_to_tu.get(usr)
-            if existing_owner and existing_owner != tu_path:
-                logger.warning(
-                    "Enum USR %s observed in multiple translation units (%s, %s); owner selection may be ambiguous.",
-                    usr,
-                    existing_owner,
-                    tu_path,
-                )
-            else:
-                enum_usr_to_tu.setdefault(usr, tu_path)
-
-        for g in parser.get_global_vars() or []:
-            usr = None
-            try:
-                usr = g.node.get_usr()  # type: ignore[attr-defined]
-            except Exception:
-                usr = None
-            if not usr:
-                continue
-            existing_owner = global_usr_to_tu.get(usr)
-            if existing_owner and existing_owner != tu_path:
-                logger.warning(
-                    "Global USR %s observed in multiple translation units (%s, %s); owner selection may be ambiguous.",
-                    usr,
-                    existing_owner,
-                    tu_path,
-                )
-            else:
-                global_usr_to_tu.setdefault(usr, tu_path)
-    return function_usr_to_tu, struct_usr_to_tu, enum_usr_to_tu, global_usr_to_tu
+    if index is None:
+        index = ProjectIndex.for_compile_commands(compile_commands_file)
+    return (
+        index.function_owners(translation_units),
+        index.symbol_owners("structs", translation_units),
+        index.symbol_owners("enums", translation_units),
+        index.symbol_owners("global_vars", translation_units),
+    )
 
 
 def build_link_closure(
     entry_tu_file: Optional[str],
     compile_commands_file: str,
+    index: Optional[ProjectIndex] = None,
 ) -> list[str]:
     """Build a minimal set of C translation units required to link the chosen entry.
 
@@ -216,49 +390,16 @@ def build_link_closure(
     if not compile_commands_file:
         return []
 
-    tus = utils.list_c_files_from_compile_commands(compile_commands_file)
+    if index is None:
+        index = ProjectIndex.for_compile_commands(compile_commands_file)
+    tus = index.translation_units
     if not tus:
         raise ValueError("No C translation units found in compile_commands.json")
 
     index_lookup = {path: idx for idx, path in enumerate(tus)}
-    function_usr_to_tu: dict[str, str] = {}
-    tu_called_usrs: dict[str, set[str]] = {}
-    main_tus: list[str] = []
-
-    for tu_path in tus:
-        commands = utils.load_compile_commands_from_file(
-            compile_commands_file,
-            tu_path,
-        )
-        compile_flags = utils.get_compile_flags_from_commands(commands)
-        parser = CParser(tu_path, extra_args=compile_flags, omit_error=True)
-
-        called_here: set[str] = set()
-        for function in parser.get_functions() or []:
-            # detect main
-            try:
-                if function.name == "main":
-                    main_tus.append(tu_path)
-            except Exception:
-                pass
-
-            usr = getattr(function, "usr", "") or ""
-            owner = function_usr_to_tu.get(usr)
-            if usr and owner and owner != tu_path:
-                logger.warning(
-                    "Function USR %s defined in multiple translation units (%s, %s); ordering may be ambiguous.",
-                    usr or function.name,
-                    owner,
-                    tu_path,
-                )
-            else:
-                if usr:
-                    function_usr_to_tu.setdefault(usr, tu_path)
-
-            for ref in getattr(function, "function_dependencies", []) or []:
-                if getattr(ref, "usr", None):
-                    called_here.add(ref.usr)
-        tu_called_usrs[tu_path] = called_here
+    function_usr_to_tu = index.function_owners(conflict_note="ordering may be ambiguous")
+    tu_called_usrs = {tu: index.unit(tu).called_usrs for tu in tus}
+    main_tus = index.main_translation_units()
 
     # Pick entry TU
     chosen_entry = entry_tu_file
@@ -319,17 +460,18 @@ def build_link_closure(
     return closure
 
 
-@lru_cache(maxsize=4)
-def build_nonfunc_def_maps(compile_commands_file: str) -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
+def build_nonfunc_def_maps(
+    compile_commands_file: str,
+    index: Optional[ProjectIndex] = None,
+) -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
     """Build project-wide definition maps for non-function symbols using libclang.
 
     Returns three dicts: (struct_def_map, enum_def_map, global_def_map)
     keyed by USR -> defining file absolute path.
 
-    This function enumerates all .c files from the compilation database and
-    parses each with its own compile flags to discover definitions visible
-    to those TUs. Duplicates are tolerated (first writer wins); we warn on
-    conflicting ownerships.
+    Every .c file of the compilation database is parsed (once, through the
+    shared `ProjectIndex`) with its own compile flags to discover definitions
+    visible to those TUs. Duplicates are tolerated (first writer wins).
     """
     struct_def_map: dict[str, str] = {}
     enum_def_map: dict[str, str] = {}
@@ -338,63 +480,15 @@ def build_nonfunc_def_maps(compile_commands_file: str) -> tuple[dict[str, str],
     if not compile_commands_file:
         return struct_def_map, enum_def_map, global_def_map
 
-    try:
-        tus = utils.list_c_files_from_compile_commands(compile_commands_file)
-    except Exception as exc:  # pylint: disable=broad-except
-        logger.warning("Failed to enumerate translation units for backfill: %s", exc)
-        return struct_def_map, enum_def_map, global_def_map
-
-    for tu_path in tus:
+    if index is None:
         try:
-            commands = utils.load_compile_commands_from_file(
-                compile_commands_file,
-                tu_path,
-            )
-            flags = utils.get_compile_flags_from_commands(commands)
-            parser = CParser(tu_path, extra_args=flags, omit_error=True)
-
-            # Structs/Unions
-            for struct in parser.get_structs() or []:
-                try:
-                    usr = struct.node.get_usr()  # type: ignore[attr-defined]
-                except Exception:
-                    usr = None
-                if not usr:
-                    continue
-                owner = struct_def_map.get(usr)
-                if owner and owner != tu_path:
-                    logger.warning("Struct USR %s observed from multiple files (%s, %s)", usr, owner, tu_path)
-                else:
-                    struct_def_map.setdefault(usr, getattr(struct.node.location.file, "name", tu_path))
-
-            # Enums
-            for enum in parser.get_enums() or []:
-                try:
-                    usr = enum.node.get_usr()  # type: ignore[attr-defined]
-                except Exception:
-                    usr = None
-                if not usr:
-                    continue
-                owner = enum_def_map.get(usr)
-                if owner and owner != tu_path:
-                    logger.warning("Enum USR %s observed from multiple files (%s, %s)", usr, owner, tu_path)
-                else:
-                    enum_def_map.setdefault(usr, getattr(enum.node.location.file, "name", tu_path))
-
-            # Global variables
-            for g in parser.get_global_vars() or []:
-                try:
-                    usr = g.node.get_usr()  # type: ignore[attr-defined]
-                except Exception:
-                    usr = None
-                if not usr:
-                    continue
-                owner = global_def_map.get(usr)
-                if owner and owner != tu_path:
-                    logger.warning("Global USR %s observed from multiple files (%s, %s)", usr, owner, tu_path)
-                else:
-                    global_def_map.setdefault(usr, getattr(g.node.location.file, "name", tu_path))
+            index = ProjectIndex.for_compile_commands(compile_commands_file)
         except Exception as exc:  # pylint: disable=broad-except
-            logger.warning("Skipping %s during backfill indexing due to error: %s", tu_path, exc)
-
-    return struct_def_map, enum_def_map, global_def_map
+            logger.warning("Failed to index translation units for backfill: %s", exc)
+            return struct_def_map, enum_def_map, global_def_map
+
+    return (
+        index.definition_files("structs"),
+        index.definition_files("enums"),
+        index.definition_files("global_vars"),
+    )
@@ -7,7 +7,7 @@ from typing import Optional
 
 from sactor import logging as sactor_logging
 from sactor import utils, rust_ast_parser
-from sactor.c_parser import CParser
+from sactor.c_parser.project_index import ProjectIndex
 
 logger = sactor_logging.get_logger(__name__)
 
@@ -44,6 +44,7 @@ class ProjectCombiner:
         entry_tu_file: Optional[str],
         tu_artifacts: list[TuArtifact],
         variant: str = "unidiomatic",
+        project_index: Optional[ProjectIndex] = None,
     ) -> None:
         self.config = config
         self.test_cmd_path = test_cmd_path
@@ -54,6 +55,7 @@ class ProjectCombiner:
         if variant not in {"unidiomatic", "idiomatic"}:
             raise ValueError(f"Unknown ProjectCombiner variant: {variant}")
         self.variant = variant
+        self._project_index = project_index
 
     # --------------- helpers ---------------
     @staticmethod
@@ -107,21 +109,15 @@ class ProjectCombiner:
     def _list_translation_units(self) -> list[str]:
         return utils.list_c_files_from_compile_commands(self.compile_commands_file)
 
-    def _compile_flags_for(self, tu_path: str) -> list[str]:
-        cmds = utils.load_compile_commands_from_file(self.compile_commands_file, tu_path)
-        return utils.get_compile_flags_from_commands(cmds)
+    def _index(self) -> ProjectIndex:
+        if self._project_index is None:
+            self._project_index = ProjectIndex.for_compile_commands(self.compile_commands_file)
+        return self._project_index
 
     def _find_entry_tu(self) -> Optional[str]:
         if self.entry_tu_file:
             return self.entry_tu_file
-        candidates: list[str] = []
-        for tu in self._list_translation_units():
-            flags = self._compile_flags_for(tu)
-            parser = CParser(tu, extra_args=flags, omit_error=True)
-            for f in parser.get_functions() or []:
-                if getattr(f, "name", "") == "main":
-                    candidates.append(os.path.realpath(tu))
-                    break
+        candidates = [os.path.realpath(tu) for tu in self._index().main_translation_units()]
         if not candidates:
             return None
         if len(candidates) > 1:
@@ -202,37 +198,29 @@ class ProjectCombiner:
         - cross_deps: tu_path -> set of function names it calls that belong to other TUs
         - func_owner: function name (approx) -> owner tu path (best-effort; uses USR mapping)
         """
-        tus = self._list_translation_units()
+        index = self._index()
         # Map USR -> owner TU
         usr_to_owner: dict[str, str] = {}
         name_by_usr: dict[str, str] = {}
-        for tu in tus:
-            flags = self._compile_flags_for(tu)
-            parser = CParser(tu, extra_args=flags, omit_error=True)
-            for f in parser.get_functions() or []:
-                usr = getattr(f, "usr", "") or ""
+        for unit in index.units.values():
+            for name, usr in unit.functions:
                 if usr and usr not in usr_to_owner:
-                    usr_to_owner[usr] = os.path.realpath(tu)
-                    name_by_usr[usr] = getattr(f, "name", usr)
+                    usr_to_owner[usr] = os.path.realpath(unit.path)
+                    name_by_usr[usr] = name or usr
 
-        cross_deps: dict[str, set[str]] = {os.path.realpath(tu): set() for tu in tus}
+        cross_deps: dict[str, set[str]] = {os.path.realpath(tu): set() for tu in index.units}
         func_owner_by_name: dict[str, str] = {}
-        for tu in tus:
-            flags = self._compile_flags_for(tu)
-            parser = CParser(tu, extra_args=flags, omit_error=True)
-            for f in parser.get_functions() or []:
-                for ref in getattr(f, "function_dependencies", []) or []:
-                    usr = getattr(ref, "usr", None)
-                    if not usr:
-                        continue
-                    owner = usr_to_owner.get(usr)
-                    if not owner:
-                        continue
-                    if os.path.realpath(owner) != os.path.realpath(tu):
-                        ref_name = getattr(ref, "name", name_by_usr.get(usr, usr))
-                        cross_deps[os.path.realpath(tu)].add(ref_name)
-                        # record owner by name best-effort
-                        func_owner_by_name.setdefault(ref_name, owner)
+        for unit in index.units.values():
+            tu = os.path.realpath(unit.path)
+            for _caller, usr, ref_name in unit.calls:
+                owner = usr_to_owner.get(usr)
+                if not owner:
+                    continue
+                if owner != tu:
+                    ref_name = ref_name or name_by_usr.get(usr, usr)
+                    cross_deps[tu].add(ref_name)
+                    # record owner by name best-effort
+                    func_owner_by_name.setdefault(ref_name, owner)
         return cross_deps, func_owner_by_name
 
     def _write_manifest(self, crate_dir: str, with_bin: bool, crate_name: str) -> None:
@@ -243,7 +231,7 @@ class ProjectCombiner:
             "edition = \"2021\"",
             "",
             "[dependencies]",
-            "libc = \"0.2.159\"",
+            f"libc = \"{utils.LIBC_CRATE_VERSION}\"",
         ]
         if not with_bin:
             manifest += [
@@ -265,6 +253,7 @@ class ProjectCombiner:
         ]
         with open(os.path.join(crate_dir, "Cargo.toml"), "w", encoding="utf-8") as fh:
             fh.write("\n".join(manifest) + "\n")
+        utils.write_cargo_offline_config(crate_dir)
 
     def _load_test_cmd(self) -> list[list[str]]:
         raw = utils.read_file(self.test_cmd_path).strip()
@@ -280,14 +269,33 @@ class ProjectCombiner:
 
     def _run_project_tests(self, bin_path: str) -> tuple[bool, Optional[str]]:
         test_cmds = self._load_test_cmd()
-        env = os.environ.copy()
         cwd = os.path.dirname(os.path.abspath(self.test_cmd_path))
-        for cmd in test_cmds:
-            expanded = [(bin_path if tok == "%t" else tok) for tok in cmd]
+        test_workers = self.config.get('verifier', {}).get('test_workers', 1)
+        run_kwargs: dict = dict(cwd=cwd)
+        # A serial run never cancels a test and keeps the tests unbounded
+        if test_workers > 1:
+            # Only streamed output (as for the verifier's tests) lets a test
+            # be killed once an earlier one has failed
+            general_config = self.config.get('general', {})
+            run_kwargs.update(
+                limit_bytes=general_config.get('command_output_byte_limit', 40000),
+                timeout=general_config.get('timeout_seconds', 60),
+            )
+
+        def run_one(i, cancel) -> Optional[str]:
+            expanded = [(bin_path if tok == "%t" else tok) for tok in test_cmds[i]]
             logger.debug("Project test: %s", expanded)
-            res = utils.run_command(expanded, cwd=cwd)
+            try:
+                res = utils.run_command(expanded, cancel=cancel, **run_kwargs)
+            except TimeoutError as exc:
+                return f"Project test timed out: {exc}"
             if res.returncode != 0:
-                return False, (res.stderr or res.stdout)
+                return res.stderr or res.stdout
+            return None
+
+        failure = utils.run_fail_fast(len(test_cmds), run_one, test_workers)
+        if failure is not None:
+            return False, failure[1]
         return True, None
 
     # --------------- main entry ---------------
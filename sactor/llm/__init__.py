@@ -1,7 +1,10 @@
 from .llm import LLM
+from .llm_cache import LLMCache, LLMCacheMiss
 
 __all__ = [
     'LLM',
+    'LLMCache',
+    'LLMCacheMiss',
 ]
 
 
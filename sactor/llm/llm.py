@@ -1,5 +1,7 @@
+import asyncio
 import json
 import os
+import threading
 import time
 
 import tiktoken
@@ -9,6 +11,8 @@ from litellm import Router
 from sactor import logging as sactor_logging
 from sactor import utils
 
+from .llm_cache import LLMCache, LLMCacheMiss
+
 logger = sactor_logging.get_logger(__name__)
 
 class LLM:
@@ -29,6 +33,13 @@ class LLM:
         self.costed_input_tokens = []
         self.costed_output_tokens = []
         self.costed_time = []
+        self.cache = LLMCache.from_config(config)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._stat_lock = threading.Lock()
+        self.max_concurrency = int(
+            config['general'].get('max_concurrent_llm_queries', 4)
+        )
 
         # Initialize litellm router with config
         self.default_model = config['general']['model']
@@ -51,31 +62,53 @@ class LLM:
             **litellm_config.get('router_settings', {})
         )
 
+    def _build_messages(self, prompt, system_msg) -> list[dict]:
+        messages = []
+        if system_msg is not None:
+            messages.append({"role": "system", "content": system_msg})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    @staticmethod
+    def _response_content(response) -> str:
+        content = response.choices[0].message.content
+        if content is None:
+            raise Exception(f"Failed to generate response: {response}")
+        return content
+
     def _query_impl(self, prompt, model=None) -> str:
         if model is None:
             model = self.default_model
 
-        messages = []
-        if self.system_msg is not None:
-            messages.append({"role": "system", "content": self.system_msg})
-        messages.append({"role": "user", "content": prompt})
+        messages = self._build_messages(prompt, self.system_msg)
 
         try:
             response = self.router.completion(
                 model=model,
                 messages=messages
             )
-            content = response.choices[0].message.content
+            return self._response_content(response)
+
+        except Exception as e:
+            raise Exception(f"LiteLLM router query failed for {model}: {str(e)}")
 
-            if content is None:
-                raise Exception(f"Failed to generate response: {response}")
+    async def _aquery_impl(self, prompt, model=None, system_msg=None) -> str:
+        if model is None:
+            model = self.default_model
 
-            return content
+        messages = self._build_messages(prompt, system_msg)
+
+        try:
+            response = await self.router.acompletion(
+                model=model,
+                messages=messages
+            )
+            return self._response_content(response)
 
         except Exception as e:
             raise Exception(f"LiteLLM router query failed for {model}: {str(e)}")
 
-    def query(self, prompt, model=None, override_system_message=None) -> str:
+    def _truncate_prompt(self, prompt) -> tuple[str, int]:
         input_tokens = self.enc.encode(prompt)
         if len(input_tokens) > self.max_input_tokens:
             logger.warning(
@@ -84,35 +117,157 @@ class LLM:
                 self.max_input_tokens,
             )
             prompt = self.enc.decode(input_tokens[: self.max_input_tokens - 2]) + " ..."
+        return prompt, len(input_tokens)
+
+    def _cache_lookup(self, prompt, model, system_msg,
+                      cache_variant=0) -> tuple[str | None, str | None]:
+        """Return (cache_key, cached_response); both are None without a cache."""
+        if self.cache is None:
+            return None, None
+        cache_model = model if model is not None else self.default_model
+        cache_key = LLMCache.make_key(
+            cache_model, system_msg, prompt, cache_variant)
+        cached = self.cache.get(cache_key)
+        with self._stat_lock:
+            if cached is not None:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if cached is not None:
+            logger.debug("LLM cache hit for %s", cache_key[:16])
+            return cache_key, cached
+        if self.cache.replay_only:
+            raise LLMCacheMiss(
+                f"LLM cache miss in replay-only mode (key {cache_key})")
+        return cache_key, None
+
+    def _record_query(self, prompt, model, input_token_count, response,
+                      costed_time, cache_key) -> None:
+        output_tokens = self.enc.encode(response)
+        # Append the three series together so their indices stay aligned
+        # when queries complete concurrently.
+        with self._stat_lock:
+            self.costed_time.append(costed_time)
+            self.costed_input_tokens.append(input_token_count)
+            self.costed_output_tokens.append(len(output_tokens))
+        if cache_key is not None:
+            cache_model = model if model is not None else self.default_model
+            self.cache.put(cache_key, cache_model, response)
+
+    def query(self, prompt, model=None, override_system_message=None) -> str:
+        prompt, input_token_count = self._truncate_prompt(prompt)
         sactor_logging.log_llm_prompt(prompt)
         old_system_msg = None
         if override_system_message is not None:
             old_system_msg = self.system_msg
             self.system_msg = override_system_message
 
-        start_time = time.time()
-        response = self._query_impl(prompt, model)
-        end_time = time.time()
-        last_costed_time = end_time - start_time
-        self.costed_time.append(last_costed_time)
+        try:
+            cache_key, response = self._cache_lookup(
+                prompt, model, self.system_msg)
+            if response is None:
+                start_time = time.time()
+                response = self._query_impl(prompt, model)
+                end_time = time.time()
+                self._record_query(prompt, model, input_token_count, response,
+                                   end_time - start_time, cache_key)
+        finally:
+            if override_system_message is not None and old_system_msg is not None:
+                # Restore old message
+                self.system_msg = old_system_msg
 
-        output_tokens = self.enc.encode(response)
+        sactor_logging.log_llm_response(response)
+        return response
 
-        self.costed_input_tokens.append(len(input_tokens))
-        self.costed_output_tokens.append(len(output_tokens))
+    async def aquery(self, prompt, model=None, override_system_message=None,
+                     cache_variant=0) -> str:
+        """Asynchronous counterpart of `query`.
 
-        sactor_logging.log_llm_response(response)
+        The system message override is passed through instead of swapped on
+        the instance, so concurrent calls do not observe each other's message.
+        `cache_variant` keeps independent samples of one prompt apart in the
+        response cache.
+        """
+        prompt, input_token_count = self._truncate_prompt(prompt)
+        sactor_logging.log_llm_prompt(prompt)
+        system_msg = self.system_msg
+        if override_system_message is not None:
+            system_msg = override_system_message
 
-        if override_system_message is not None and old_system_msg is not None:
-            # Restore old message
-            self.system_msg = old_system_msg
+        cache_key, response = self._cache_lookup(
+            prompt, model, system_msg, cache_variant)
+        if response is None:
+            start_time = time.time()
+            response = await self._aquery_impl(prompt, model, system_msg)
+            end_time = time.time()
+            self._record_query(prompt, model, input_token_count, response,
+                               end_time - start_time, cache_key)
 
+        sactor_logging.log_llm_response(response)
         return response
 
+    async def aquery_many(self, prompts, model=None, override_system_message=None,
+                          max_concurrency=None, distinct_samples=False) -> list[str]:
+        """Run `aquery` for every prompt with at most `max_concurrency` in flight.
+
+        Results are returned in the order of `prompts`; the first failure is
+        re-raised after the remaining queries are cancelled. With
+        `distinct_samples`, each position gets its own cache variant so that
+        repeated prompts are sampled independently.
+        """
+        if max_concurrency is None:
+            max_concurrency = self.max_concurrency
+        semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+        async def _bounded(index, prompt):
+            async with semaphore:
+                return await self.aquery(
+                    prompt,
+                    model=model,
+                    override_system_message=override_system_message,
+                    cache_variant=index if distinct_samples else 0,
+                )
+
+        tasks = [asyncio.ensure_future(_bounded(index, prompt))
+                 for index, prompt in enumerate(prompts)]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def query_many(self, prompts, model=None, override_system_message=None,
+                   max_concurrency=None, distinct_samples=False) -> list[str]:
+        """Blocking wrapper around `aquery_many` for synchronous callers."""
+        return asyncio.run(self.aquery_many(
+            list(prompts),
+            model=model,
+            override_system_message=override_system_message,
+            max_concurrency=max_concurrency,
+            distinct_samples=distinct_samples,
+        ))
+
+    def query_candidates(self, prompt, count, model=None,
+                         override_system_message=None) -> list[str]:
+        """Sample `count` independent responses for the same prompt."""
+        if count <= 1:
+            return [self.query(prompt, model=model,
+                               override_system_message=override_system_message)]
+        return self.query_many(
+            [prompt] * count,
+            model=model,
+            override_system_message=override_system_message,
+            distinct_samples=True,
+        )
+
     def reset_statistics(self) -> None:
         self.costed_input_tokens = []
         self.costed_output_tokens = []
         self.costed_time = []
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def statistic(self, path: str) -> None:
         if os.path.isdir(path):
@@ -129,6 +284,8 @@ class LLM:
             "costed_input_tokens": self.costed_input_tokens,
             "costed_output_tokens": self.costed_output_tokens,
             "costed_time": self.costed_time,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
         }
         utils.try_backup_file(path)
         with open(path, "w") as f:
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from sactor import logging as sactor_logging
+from sactor import utils
+
+logger = sactor_logging.get_logger(__name__)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+)
+'''
+
+
+class LLMCacheMiss(Exception):
+    """Raised in replay-only mode when a prompt has no cached response."""
+
+
+class LLMCache:
+    """Content-addressed on-disk store of LLM responses.
+
+    Entries are keyed by a hash of (model, system message, prompt) and live in
+    a single SQLite database so concurrent runs can share it. Eviction is LRU
+    on `last_access`, bounded by entry count, total response size and age;
+    a limit of 0 disables that bound.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_entries: int = 0,
+        max_size_mb: float = 0,
+        max_age_days: float = 0,
+        replay_only: bool = False,
+    ) -> None:
+        self.path = path
+        self.max_entries = int(max_entries)
+        self.max_size_bytes = int(float(max_size_mb) * 1024 * 1024)
+        self.max_age_seconds = float(max_age_days) * 86400
+        self.replay_only = replay_only
+        self._lock = threading.Lock()
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["LLMCache"]:
+        cache_config = config.get('llm_cache', {})
+        replay_only = bool(cache_config.get('replay_only', False))
+        if not cache_config.get('enabled', False) and not replay_only:
+            return None
+        path = cache_config.get('path') or os.path.join(
+            utils.get_cache_dir(), "llm_cache.sqlite3")
+        logger.debug("Using LLM response cache at %s", path)
+        return cls(
+            os.path.expanduser(path),
+            max_entries=cache_config.get('max_entries', 0),
+            max_size_mb=cache_config.get('max_size_mb', 0),
+            max_age_days=cache_config.get('max_age_days', 0),
+            replay_only=replay_only,
+        )
+
+    @staticmethod
+    def make_key(model: str, system_msg: Optional[str], prompt: str,
+                 variant: int = 0) -> str:
+        parts = [model, system_msg, prompt]
+        if variant:
+            # Distinct samples of the same prompt (speculative candidates)
+            parts.append(variant)
+        payload = json.dumps(parts, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if self.max_age_seconds and now - created_at > self.max_age_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (now, key),
+            )
+            return response
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # Called with the lock held, inside a transaction
+        if self.max_age_seconds:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.max_age_seconds,),
+            )
+        if self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+        if self.max_size_bytes:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM ("
+                "  SELECT key, SUM(size) OVER ("
+                "   ORDER BY last_access DESC, created_at DESC"
+                "   ROWS UNBOUNDED PRECEDING) AS running"
+                "  FROM responses)"
+                " WHERE running > ?)",
+                (self.max_size_bytes,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -6,14 +6,19 @@ from sactor import logging as sactor_logging
 from sactor import thirdparty, utils
 from sactor.c_parser import CParser
 from sactor.c_parser.c_parser_utils import preprocess_source_code
-from sactor.c_parser.project_index import build_link_closure, build_nonfunc_def_maps
+from sactor.c_parser.parse_cache import ParseCache
+from sactor.c_parser.preprocess_cache import PreprocessCache
+from sactor.c_parser.project_index import (ProjectIndex, build_link_closure,
+                                           build_nonfunc_def_maps)
 from sactor.combiner import CombineResult, ProgramCombiner
 from sactor.divider import Divider
 from sactor.llm import llm_factory
 from sactor.thirdparty import C2Rust, Crown
-from sactor.translator import (IdiomaticTranslator, TranslateResult,
-                               Translator, UnidiomaticTranslator)
+from sactor.translator import (IdiomaticTranslator, PipelinedScheduler, TranslateResult,
+                               TranslationScheduler, Translator,
+                               UnidiomaticTranslator)
 from sactor.translator.batch_runner import run_translate_batch
+from sactor.translator.translation_manifest import TranslationManifest
 from sactor.translator.translator_types import TranslateBatchResult
 from sactor.verifier import Verifier
 
@@ -151,9 +156,11 @@ class Sactor:
         project_struct_usr_to_result_dir: dict[str, str] | None = None,
         project_enum_usr_to_result_dir: dict[str, str] | None = None,
         project_global_usr_to_result_dir: dict[str, str] | None = None,
+        project_index: ProjectIndex | None = None,
     ):
         self.config_file = config_file
         self.config = utils.try_load_config(self.config_file)
+        utils.configure_cargo(self.config)
         self.result_dir = os.path.join(
             os.getcwd(), "sactor_result") if result_dir is None else result_dir
 
@@ -179,7 +186,11 @@ class Sactor:
         else:
             self.processed_compile_commands = []
 
-        self.input_file_preprocessed = preprocess_source_code(input_file, self.processed_compile_commands)
+        self.input_file_preprocessed = preprocess_source_code(
+            input_file,
+            self.processed_compile_commands,
+            cache=PreprocessCache.from_config(self.config),
+        )
         self.test_cmd_path = test_cmd_path
         self.build_dir = os.path.join(
             utils.get_temp_dir(), "build") if build_dir is None else build_dir
@@ -247,10 +258,18 @@ class Sactor:
             raw_filename=self.input_file,
         )
 
+        if self.compile_commands_file and project_index is None:
+            project_index = ProjectIndex.for_compile_commands(
+                self.compile_commands_file,
+                cache=ParseCache.from_config(self.config),
+                max_workers=self.config.get('parse_cache', {}).get('max_workers', 1),
+            )
+
         # Project-wide backfill for non-function refs when a compilation database is provided
         if self.compile_commands_file:
             try:
-                struct_map, enum_map, global_map = build_nonfunc_def_maps(self.compile_commands_file)
+                struct_map, enum_map, global_map = build_nonfunc_def_maps(
+                    self.compile_commands_file, index=project_index)
                 self.c_parser.backfill_nonfunc_refs(struct_map, enum_map, global_map)
             except Exception as exc:  # pylint: disable=broad-except
                 logger.error("Non-function reference backfill failed: %s", exc)
@@ -260,7 +279,8 @@ class Sactor:
         # Build project-wide link closure once per runner (used by verifier when relinking)
         if self.compile_commands_file:
             try:
-                self.project_link_closure = build_link_closure(self.entry_tu_file, self.compile_commands_file)
+                self.project_link_closure = build_link_closure(
+                    self.entry_tu_file, self.compile_commands_file, index=project_index)
                 logger.info("Project link closure size: %d", len(self.project_link_closure))
             except Exception as exc:  # pylint: disable=broad-except
                 logger.error("Failed to build project link closure: %s", exc)
@@ -301,74 +321,97 @@ class Sactor:
             link_args=self.link_args,
         )
 
+        # Hashes of the C inputs of every translated item, used to redo only
+        # the items whose code (or dependencies) changed since the last run
+        self.manifest = None
+        if self.config['general'].get('incremental_translation', True):
+            self.manifest = TranslationManifest(self.c_parser, self.config, self.result_dir)
+
         # Initialize LLM
         self.llm = llm_factory(self.config)
 
         self.c2rust_translation = None
 
+        # Whether each stage that finished in `run` succeeded, keyed by stage
+        self.stage_outcomes: dict[str, bool] = {}
+
     def run(self):
         def _stage_stat_path(stage: str) -> str:
             return utils._derive_llm_stat_path(self.llm_stat, stage=stage)
 
+        if self.manifest is not None:
+            if not self.idiomatic_only:
+                self.manifest.invalidate("unidiomatic")
+            if not self.unidiomatic_only:
+                self.manifest.invalidate("idiomatic")
+
+        if (not self.idiomatic_only and not self.unidiomatic_only
+                and self.config['general'].get('pipeline_translation_phases', False)):
+            self._run_pipelined(_stage_stat_path("pipelined"))
+            return
+
         if not self.idiomatic_only:
             self.llm.reset_statistics()
             unidiomatic_stat_path = _stage_stat_path("unidiomatic")
             result, unidiomatic_translator = self._run_unidomatic_translation()
-            # Collect failure info
-            unidiomatic_translator.save_failure_info(unidiomatic_translator.failure_info_path)
-
-            stage_error = None
-            if result != TranslateResult.SUCCESS:
-                unidiomatic_translator.print_result_summary("Unidiomatic")
-                stage_error = f"Failed to translate unidiomatic code: {result}"
-            else:
-                combine_result, _ = self.combiner.combine(
-                    os.path.join(self.result_dir, "translated_code_unidiomatic"),
-                    is_idiomatic=False,
-                )
-                if combine_result != CombineResult.SUCCESS:
-                    stage_error = (
-                        "Failed to combine translated code for unidiomatic translation: "
-                        f"{combine_result}"
-                    )
-
+            stage_error = self._finish_stage("unidiomatic", result, unidiomatic_translator)
             self.llm.statistic(unidiomatic_stat_path)
-
-            if stage_error:
-                if self.continue_run_when_incomplete:
-                    logger.error(stage_error)
-                else:
-                    raise ValueError(stage_error)
+            self._report_stage_error(stage_error)
 
         if not self.unidiomatic_only:
             self.llm.reset_statistics()
             idiomatic_stat_path = _stage_stat_path("idiomatic")
             result, idiomatic_translator = self._run_idiomatic_translation()
-            # Collect failure info
-            idiomatic_translator.save_failure_info(idiomatic_translator.failure_info_path)
-
-            stage_error = None
-            if result != TranslateResult.SUCCESS:
-                idiomatic_translator.print_result_summary("Idiomatic")
-                stage_error = f"Failed to translate idiomatic code: {result}"
-            else:
-                combine_result, _ = self.combiner.combine(
-                    os.path.join(self.result_dir, "translated_code_idiomatic"),
-                    is_idiomatic=True,
-                )
-                if combine_result != CombineResult.SUCCESS:
-                    stage_error = (
-                        "Failed to combine translated code for idiomatic translation: "
-                        f"{combine_result}"
-                    )
-
+            stage_error = self._finish_stage("idiomatic", result, idiomatic_translator)
             self.llm.statistic(idiomatic_stat_path)
+            self._report_stage_error(stage_error)
+
+    def _run_pipelined(self, stat_path: str) -> None:
+        # Both phases share one LLM, so their statistics are written together
+        self.llm.reset_statistics()
+        (unidiomatic_result, unidiomatic_translator,
+         idiomatic_result, idiomatic_translator) = self._run_pipelined_translation()
+        stage_errors = [self._finish_stage(
+            "unidiomatic", unidiomatic_result, unidiomatic_translator)]
+        if stage_errors[0] is None or self.continue_run_when_incomplete:
+            stage_errors.append(self._finish_stage(
+                "idiomatic", idiomatic_result, idiomatic_translator))
+        self.llm.statistic(stat_path)
+        for stage_error in stage_errors:
+            self._report_stage_error(stage_error)
+
+    def _finish_stage(self, stage: str, result: TranslateResult, translator: Translator) -> str | None:
+        """Save failure info and combine the stage output; return the stage error, if any."""
+        stage_error = self._combine_stage(stage, result, translator)
+        self.stage_outcomes[stage] = stage_error is None
+        return stage_error
+
+    def _combine_stage(self, stage: str, result: TranslateResult, translator: Translator) -> str | None:
+        # Collect failure info
+        translator.save_failure_info(translator.failure_info_path)
+        if self.manifest is not None:
+            self.manifest.record(stage)
+
+        if result != TranslateResult.SUCCESS:
+            translator.print_result_summary(stage.capitalize())
+            return f"Failed to translate {stage} code: {result}"
+        combine_result, _ = self.combiner.combine(
+            os.path.join(self.result_dir, f"translated_code_{stage}"),
+            is_idiomatic=stage == "idiomatic",
+        )
+        if combine_result != CombineResult.SUCCESS:
+            return (
+                f"Failed to combine translated code for {stage} translation: "
+                f"{combine_result}"
+            )
+        return None
 
-            if stage_error:
-                if self.continue_run_when_incomplete:
-                    logger.error(stage_error)
-                else:
-                    raise ValueError(stage_error)
+    def _report_stage_error(self, stage_error: str | None) -> None:
+        if stage_error:
+            if self.continue_run_when_incomplete:
+                logger.error(stage_error)
+            else:
+                raise ValueError(stage_error)
 
     def _new_unidiomatic_translator(self):
         if self.c2rust_translation is None:
@@ -400,39 +443,36 @@ class Sactor:
     def _run_unidomatic_translation(self) -> tuple[TranslateResult, Translator]:
         translator = self._new_unidiomatic_translator()
         translator.prepare_failure_info_backup()
-        final_result = TranslateResult.SUCCESS
-        for struct_pairs in self.struct_order:
-            for struct in struct_pairs:
-                ready, blockers = translator.check_dependencies(struct, lambda s: s.dependencies)
-                if not ready:
-                    if blockers:
-                        translator.mark_dependency_block("struct", struct.name, blockers)
-                    continue
-                result = translator.translate_struct(struct)
-                if result != TranslateResult.SUCCESS:
-                    final_result = result
+        final_result = self._new_scheduler(translator).run()
+        return final_result, translator
 
-        for function_pairs in self.function_order:
-            for function in function_pairs:
-                struct_ready, struct_blockers = translator.check_dependencies(
-                    function, lambda s: s.struct_dependencies)
-                logger.debug("Checking function %s: struct_ready=%s, struct_blockers=%s",
-                             function.name, struct_ready, struct_blockers)
-                func_ready, func_blockers = translator.check_dependencies(
-                    function, lambda s: s.function_dependencies)
-                if not struct_ready or not func_ready:
-                    blockers = []
-                    if struct_blockers:
-                        blockers.extend(struct_blockers)
-                    if func_blockers:
-                        blockers.extend(func_blockers)
-                    translator.mark_dependency_block("function", function.name, blockers)
-                    continue
-                result = translator.translate_function(function)
-                if result != TranslateResult.SUCCESS:
-                    final_result = result
+    def _new_scheduler(self, translator: Translator) -> TranslationScheduler:
+        return TranslationScheduler(
+            translator,
+            self.struct_order,
+            self.function_order,
+            max_workers=self.config['general'].get('max_translation_workers', 1),
+        )
 
-        return final_result, translator
+    def _run_pipelined_translation(self) -> tuple[TranslateResult, Translator, TranslateResult, Translator]:
+        translator = self._new_unidiomatic_translator()
+        translator.prepare_failure_info_backup()
+
+        def _idiomatic_factory() -> Translator:
+            idiomatic_translator = self._new_idiomatic_translator()
+            idiomatic_translator.prepare_failure_info_backup()
+            return idiomatic_translator
+
+        scheduler = PipelinedScheduler(
+            translator,
+            _idiomatic_factory,
+            self.struct_order,
+            self.function_order,
+            max_workers=self.config['general'].get('max_translation_workers', 1),
+            stop_on_unidiomatic_failure=not self.continue_run_when_incomplete,
+        )
+        unidiomatic_result, idiomatic_result = scheduler.run()
+        return unidiomatic_result, translator, idiomatic_result, scheduler.idiomatic_translator
 
     def _new_idiomatic_translator(self):
         if self.c2rust_translation is None:
@@ -469,35 +509,5 @@ class Sactor:
     def _run_idiomatic_translation(self) -> tuple[TranslateResult, Translator]:
         translator = self._new_idiomatic_translator()
         translator.prepare_failure_info_backup()
-        final_result = TranslateResult.SUCCESS
-        for struct_pairs in self.struct_order:
-            for struct in struct_pairs:
-                ready, blockers = translator.check_dependencies(struct, lambda s: s.dependencies)
-                if not ready:
-                    if blockers:
-                        translator.mark_dependency_block("struct", struct.name, blockers)
-                    continue
-                result = translator.translate_struct(struct)
-                if result != TranslateResult.SUCCESS:
-                    final_result = result
-
-        for function_pairs in self.function_order:
-            for function in function_pairs:
-                struct_ready, struct_blockers = translator.check_dependencies(
-                    function, lambda s: s.struct_dependencies)
-                func_ready, func_blockers = translator.check_dependencies(
-                    function, lambda s: s.function_dependencies)
-                if not struct_ready or not func_ready:
-                    blockers = []
-                    if struct_blockers:
-                        blockers.extend(struct_blockers)
-                    if func_blockers:
-                        blockers.extend(func_blockers)
-                    translator.mark_dependency_block("function", function.name, blockers)
-                    continue
-                result = translator.translate_function(function)
-
-                if result != TranslateResult.SUCCESS:
-                    final_result = result
-
+        final_result = self._new_scheduler(translator).run()
         return final_result, translator
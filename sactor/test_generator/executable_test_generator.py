@@ -2,6 +2,7 @@ import json
 import os
 import shutil
 import subprocess
+import time
 from typing import override
 
 from sactor import logging as sactor_logging
@@ -43,6 +44,9 @@ class ExecutableTestGenerator(TestGenerator):
 
         executable = os.path.abspath(executable) # get the absolute path
         self.executable = executable
+        # Wall time of the last run of each sample without valgrind, saved with
+        # the sample so the test runner can derive its deadline from it
+        self.sample_runtimes: dict[str, float] = {}
 
         for sample in self.init_test_samples:
             self._execute_test_sample(sample)
@@ -77,6 +81,7 @@ class ExecutableTestGenerator(TestGenerator):
             raise ValueError(f"Timeout: {e}. Please check the input format.")
 
         # Rerun without valgrind
+        started = time.monotonic()
         if self.feed_as_arguments:
             feed_input_str = f'{self.executable} {test_sample}'
             cmd = feed_input_str.split()
@@ -94,6 +99,7 @@ class ExecutableTestGenerator(TestGenerator):
                 input_data=f"{test_sample}\n",
             )
         assert result.returncode == 0 # should not fail
+        self.sample_runtimes[test_sample] = time.monotonic() - started
         # clean up tmp dir
         shutil.rmtree(tmp_dir)
         return utils.normalize_string(result.stdout + result.stderr)
@@ -252,6 +258,7 @@ REMEMBER: i should start from 1.
                 {
                     "input": sample,
                     "output": output,
+                    "runtime": round(self.sample_runtimes[sample], 6),
                 }
             )
             remaining_test_samples.add(sample.strip())
@@ -270,9 +277,12 @@ REMEMBER: i should start from 1.
         return self._generate_test_impl(count)
 
     @override
-    def create_test_task(self, task_path, test_sample_path):
+    def create_test_task(self, task_path, test_sample_path, batched=False):
         '''
-        Create the test task from the generated test samples
+        Create the test task from the generated test samples.
+
+        With `batched`, the task is a single `sactor run-tests --all` command
+        that runs every sample in one process instead of one command per sample.
         '''
         self._check_runner_exist()
 
@@ -293,19 +303,23 @@ REMEMBER: i should start from 1.
         self.export_test_samples(test_sample_path)
 
         # Write the test task
+        feed_flag = '--feed-as-args' if self.feed_as_arguments else '--feed-as-stdin'
         tasks = []
-        for i in range(len(self.test_samples)):
-            command = f'sactor run-tests --type bin {os.path.abspath(test_sample_path)} %t {i}'
-            if self.feed_as_arguments:
-                command += f' --feed-as-args'
-            else:
-                command += f' --feed-as-stdin'
+        if batched:
             tasks.append(
                 {
-                    "command": command,
-                    "test_id": i,
+                    "command": f'sactor run-tests --type bin {os.path.abspath(test_sample_path)} %t --all {feed_flag}',
+                    "test_id": 0,
                 }
             )
+        else:
+            for i in range(len(self.test_samples)):
+                tasks.append(
+                    {
+                        "command": f'sactor run-tests --type bin {os.path.abspath(test_sample_path)} %t {i} {feed_flag}',
+                        "test_id": i,
+                    }
+                )
 
         with open(task_path, 'w') as f:
             json.dump(tasks, f, indent=4)
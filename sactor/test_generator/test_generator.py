@@ -1,9 +1,8 @@
 import json
 import os
-import shutil
 from abc import ABC, abstractmethod
 
-from sactor import utils
+from sactor import toolchain, utils
 from sactor.utils import read_file
 from sactor.c_parser import CParser
 from sactor.llm import llm_factory
@@ -37,7 +36,7 @@ class TestGenerator(ABC):
         self.c_parser = CParser(file_path)
 
         # check valgrind existence
-        if shutil.which('valgrind') is None:
+        if toolchain.which('valgrind') is None:
             raise ValueError(
                 "valgrind is not installed. Please install valgrind first for test generation.")
         self.valgrind_cmd = [
@@ -59,12 +58,12 @@ class TestGenerator(ABC):
         pass
 
     @abstractmethod
-    def create_test_task(self, task_path, test_sample_path):
+    def create_test_task(self, task_path, test_sample_path, batched=False):
         pass
 
     def _check_runner_exist(self):
         # check if `sactor` is installed
-        if shutil.which('sactor') is None:
+        if toolchain.which('sactor') is None:
             raise ValueError(
                 "sactor is not installed. Please install sactor first.")
 
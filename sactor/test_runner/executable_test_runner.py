@@ -2,7 +2,7 @@ import difflib
 import os
 import json
 import subprocess
-from typing import override, Optional
+from typing import Iterator, override, Optional
 
 from sactor import logging as sactor_logging
 from sactor import utils
@@ -63,36 +63,29 @@ class ExecutableTestRunner(TestRunner):
         with open(save_path, 'w') as f:
             json.dump(current_data, f, indent=4)
 
-    @override
-    def run_test(self, test_sample_number: int, save_path=None) -> tuple[TestRunnerResult, Optional[str]]:
+    def execute(self, test_sample_number: int, wrapper: Optional[list[str]] = None, **run_kwargs) -> utils.ProcessResult:
+        """Run the target on one test sample and return the raw process result.
+
+        `wrapper` is prepended to the target command (e.g. valgrind);
+        `run_kwargs` are passed on to `utils.run_command`.
+        """
         len_test_samples_output = len(self.test_samples_output)
         if test_sample_number >= len_test_samples_output or test_sample_number < 0:
             raise ValueError(
                 f'test_sample_number should be in the range [0, {len_test_samples_output})')
-        test_sample = self.test_samples_output[test_sample_number]
-        test_sample_input = test_sample['input']
-        test_sample_output = test_sample['output']
-
-        try:
-            if self.feed_as_arguments:
-                feed_input_str = f'{self.target} {test_sample_input}'
-                cmd = feed_input_str.split()
-                result = utils.run_command(
-                    cmd,
-                    timeout=self.timeout_seconds,
-                )
-            else:
-                cmd = self.target
-                result = utils.run_command(
-                    cmd,
-                    timeout=self.timeout_seconds,
-                    input_data=f"{test_sample_input}\n",
-                )
-        except subprocess.TimeoutExpired as e:
-            logger.error('Test %d timed out: %s', test_sample_number, e)
-            raise ValueError(f'Test {test_sample_number} timed out: {e}')
-
+        test_sample_input = self.test_samples_output[test_sample_number]['input']
+        run_kwargs.setdefault('timeout', self.timeout_for(test_sample_number))
+        if self.feed_as_arguments:
+            feed_input_str = f'{self.target} {test_sample_input}'
+            cmd = feed_input_str.split()
+        else:
+            cmd = [self.target]
+            run_kwargs['input_data'] = f"{test_sample_input}\n"
+        return utils.run_command([*(wrapper or []), *cmd], **run_kwargs)
 
+    def check(self, test_sample_number: int, result: utils.ProcessResult, save_path=None) -> tuple[TestRunnerResult, Optional[str]]:
+        """Compare the output in `result` with the expected output of the sample."""
+        test_sample_output = self.test_samples_output[test_sample_number]['output']
         target_output = utils.normalize_string(
             result.stdout + result.stderr)
 
@@ -107,3 +100,21 @@ class ExecutableTestRunner(TestRunner):
                 target_output,
             )
         return compare_result
+
+    @override
+    def run_test(self, test_sample_number: int, save_path=None) -> tuple[TestRunnerResult, Optional[str]]:
+        try:
+            result = self.execute(test_sample_number)
+        except subprocess.TimeoutExpired as e:
+            logger.error('Test %d timed out: %s', test_sample_number, e)
+            raise ValueError(f'Test {test_sample_number} timed out: {e}')
+
+        return self.check(test_sample_number, result, save_path)
+
+    def run_all(self, save_path=None) -> Iterator[tuple[int, tuple[TestRunnerResult, Optional[str]]]]:
+        """Run the test samples in order, yielding each result; stop after the first failure."""
+        for i in range(len(self.test_samples_output)):
+            result = self.run_test(i, save_path)
+            yield i, result
+            if result[0] != TestRunnerResult.PASSED:
+                return
@@ -0,0 +1,113 @@
+import argparse
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+def parse_run_tests(parser):
+    parser.add_argument(
+        'test_samples_path',
+        type=str,
+        help='The path to the test samples output json file'
+    )
+
+    parser.add_argument(
+        'target',
+        help='The target program or library to test'
+    )
+
+    parser.add_argument(
+        'test_sample_number',
+        type=int,
+        nargs='?',
+        default=None,
+        help='The number (relative to 0) of the test sample to run. Omit together with --all'
+    )
+
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        dest='run_all',
+        help='Run every test sample in order in this process, reporting each result and stopping at the first failure'
+    )
+
+    parser.add_argument(
+        '--type',
+        choices=['bin', 'lib'],
+        required=True,
+        help='Whether the target is a binary program or a library'
+    )
+
+    parser.add_argument(
+        '--config',
+        '-c',
+        type=str,
+        dest='config_file',
+        help='The configuration file to use'
+    )
+
+    parser.add_argument(
+        "--feed-as-args",
+        action='store_true',
+        default=None,
+        help='Only avaliable for binary targets. If set, the test samples will be fed as arguments to the target program. Default set this unless --feed-as-stdin is set.'
+    )
+
+    parser.add_argument(
+        "--feed-as-stdin",
+        action='store_true',
+        default=None,
+        help='Only avaliable for binary targets. If set, the test samples will be fed to the target program via stdin.'
+    )
+
+    parser.add_argument(
+        '--save',
+        '-s',
+        type=str,
+        help='The path to save the output json of the test run and the expected output, if the test fails. If not set, the output will not be saved.'
+    )
+
+
+@dataclass
+class RunTestsCommand:
+    """A `sactor run-tests` test command that can be run without a subprocess."""
+    test_samples_path: str
+    target: str
+    # None for `--all`
+    test_sample_number: Optional[int]
+    feed_as_arguments: bool
+
+
+class _NonExitingParser(argparse.ArgumentParser):
+    def error(self, message):
+        raise ValueError(message)
+
+
+def parse_run_tests_command(cmd: list[str], cwd: str) -> Optional[RunTestsCommand]:
+    """Recognise a binary-target `sactor run-tests` command.
+
+    Relative sample paths are resolved against `cwd`, the directory the
+    command would run in. Returns None for any other command, and for
+    run-tests invocations whose effect goes beyond comparing outputs
+    (`--save`, library targets, invalid arguments), so that callers run
+    those as a subprocess.
+    """
+    if len(cmd) < 2 or os.path.basename(cmd[0]) != 'sactor' or cmd[1] != 'run-tests':
+        return None
+    parser = _NonExitingParser(add_help=False)
+    parser.add_argument('--log-dir', dest='log_dir')
+    parse_run_tests(parser)
+    try:
+        args = parser.parse_args(cmd[2:])
+    except ValueError:
+        return None
+    if args.type != 'bin' or args.save or (args.feed_as_args and args.feed_as_stdin):
+        return None
+    if args.run_all == (args.test_sample_number is not None):
+        return None
+    return RunTestsCommand(
+        test_samples_path=os.path.join(cwd, args.test_samples_path),
+        target=args.target,
+        test_sample_number=args.test_sample_number,
+        feed_as_arguments=not args.feed_as_stdin,
+    )
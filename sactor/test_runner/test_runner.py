@@ -14,9 +14,18 @@ class TestRunner(ABC):
         self.test_samples_output: list[dict] = json.loads(content)
 
         self.config = utils.try_load_config(config_path)
-        self.timeout_seconds = self.config['test_runner']['timeout_seconds']
+        runner_config = self.config['test_runner']
+        self.timeout_seconds = runner_config['timeout_seconds']
+        self.timeout_multiple = runner_config.get('timeout_multiple', 0)
+        self.min_timeout_seconds = runner_config.get('min_timeout_seconds', 0)
         self.target = target
 
+    def timeout_for(self, test_sample_number: int) -> float:
+        """Deadline of a sample: a multiple of the C runtime recorded with it, else `timeout_seconds`."""
+        runtime = self.test_samples_output[test_sample_number].get('runtime')
+        return utils.adaptive_timeout(
+            runtime, self.timeout_multiple, self.min_timeout_seconds, self.timeout_seconds)
+
     @abstractmethod
     def run_test(self, test_sample_number: int) -> tuple[TestRunnerResult, Optional[str]]:
         pass
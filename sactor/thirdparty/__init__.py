@@ -1,4 +1,4 @@
-import shutil
+from sactor import toolchain
 
 from .c2rust import C2Rust
 from .crown import Crown, CrownType
@@ -13,7 +13,7 @@ def check_all_requirements() -> list[str]:
     result.extend(RustFmt.check_requirements())
 
     # check valgrind
-    if not shutil.which('valgrind'):
+    if not toolchain.which('valgrind'):
         result.append('valgrind')
 
     return result
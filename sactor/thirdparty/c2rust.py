@@ -3,7 +3,7 @@ import shutil
 from typing import override, List
 
 from sactor import logging as sactor_logging
-from sactor import utils
+from sactor import toolchain, utils
 
 from .thirdparty import ThirdParty
 
@@ -17,16 +17,16 @@ class C2Rust(ThirdParty):
     @override
     def check_requirements() -> list[str]:
         result = []
-        if not shutil.which("c2rust"):
+        if not toolchain.which("c2rust"):
             result.append("c2rust")
-        if not shutil.which("gcc") and not shutil.which("clang"):
+        if not toolchain.which("gcc") and not toolchain.which("clang"):
             result.append("C compiler(gcc or clang)")
 
         return result
 
     def get_c2rust_translation(self, compile_flags: list[str] =[]):
         # check c2rust executable
-        if not shutil.which("c2rust"):
+        if not toolchain.which("c2rust"):
             raise OSError("c2rust executable not found")
 
         tmpdir = os.path.join(utils.get_temp_dir(), "c2rust")
@@ -1,11 +1,10 @@
 import json
 import os
-import shutil
 from enum import Enum, auto
 from typing import override
 
 from sactor import logging as sactor_logging
-from sactor import utils
+from sactor import toolchain, utils
 
 from .thirdparty import ThirdParty
 
@@ -21,9 +20,9 @@ class CrownType(Enum):
 class Crown(ThirdParty):
     def __init__(self, build_path=None):
         # check executables
-        if not shutil.which("crown"):
+        if not toolchain.which("crown"):
             raise OSError("crown executable not found")
-        if not shutil.which("rustup"):
+        if not toolchain.which("rustup"):
             raise OSError("rustup executable not found")
 
         if build_path:
@@ -48,9 +47,9 @@ class Crown(ThirdParty):
     @override
     def check_requirements() -> list[str]:
         result = []
-        if not shutil.which("crown"):
+        if not toolchain.which("crown"):
             result.append("crown")
-        if not shutil.which("rustup"):
+        if not toolchain.which("rustup"):
             result.append("rustup")
         return result
 
@@ -1,7 +1,6 @@
-import shutil
 from typing import override
 
-from sactor import utils
+from sactor import toolchain, utils
 
 from .thirdparty import ThirdParty
 
@@ -13,7 +12,7 @@ class RustFmt(ThirdParty):
     @staticmethod
     @override
     def check_requirements() -> list[str]:
-        if not shutil.which("rustfmt"):
+        if not toolchain.which("rustfmt"):
             return ["rustfmt"]
         return []
 
@@ -0,0 +1,150 @@
+"""Probes of the local toolchain, run once and cached.
+
+Which tools are installed, the C compiler to use, its include search paths
+and predefined macros are needed by every `CParser`, preprocessing pass and
+c2rust call, but only change when the toolchain does. Tool lookups are
+memoized per process; compiler probes are also stored under the cache
+directory, keyed by the compiler binary (real path, mtime and size) and the
+environment variables that affect its search paths, so later runs reuse
+them without spawning the compiler.
+"""
+
+import os
+import re
+import shutil
+import threading
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from sactor import logging as sactor_logging
+from sactor import utils
+
+logger = sactor_logging.get_logger(__name__)
+
+_FORMAT_VERSION = 1
+
+# Environment variables that change the compiler's include search list
+_SEARCH_PATH_ENV = ("CPATH", "C_INCLUDE_PATH", "SDKROOT")
+
+_lock = threading.Lock()
+_which: dict[tuple[str, str], Optional[str]] = {}
+_compiler_probes: dict[tuple, "CompilerProbe"] = {}
+
+
+@dataclass(frozen=True)
+class CompilerProbe:
+    """What `<compiler> -E -P -v -dD` reports for an empty C file."""
+    compiler: str
+    include_paths: tuple[str, ...]
+    # Predefined macros, e.g. `__SIZE_TYPE__` -> `long unsigned int`
+    predefined_macros: dict[str, str]
+
+
+def which(tool: str) -> Optional[str]:
+    """`shutil.which`, memoized for the current PATH."""
+    key = (tool, os.environ.get("PATH", ""))
+    with _lock:
+        if key in _which:
+            return _which[key]
+    path = shutil.which(tool)
+    with _lock:
+        _which[key] = path
+    return path
+
+
+def find_compiler() -> str:
+    """Return the C compiler to use: clang if installed, else gcc."""
+    for compiler in ("clang", "gcc"):
+        if which(compiler):
+            return compiler
+    raise OSError("No C compiler found")
+
+
+def _binary_key(compiler: str) -> Optional[tuple]:
+    path = which(compiler)
+    if path is None:
+        return None
+    real_path = os.path.realpath(path)
+    try:
+        stat = os.stat(real_path)
+    except OSError:
+        return None
+    env = tuple(os.environ.get(name, "") for name in _SEARCH_PATH_ENV)
+    return (compiler, real_path, stat.st_mtime_ns, stat.st_size, env)
+
+
+def parse_include_paths(verbose_output: str) -> list[str]:
+    """Extract the `#include <...>` search list from `-v` compiler output."""
+    search_include_paths = []
+    add_include_path = False
+    for line in verbose_output.split('\n'):
+        if line.startswith('#include <...> search starts here:'):
+            add_include_path = True
+            continue
+        if line.startswith('End of search list.'):
+            break
+        if add_include_path:
+            search_include_paths.append(line.strip())
+    return search_include_paths
+
+
+def parse_predefined_macros(defines: str) -> dict[str, str]:
+    """Map the object-like macros in `-dD` output to their values."""
+    ptn = re.compile(r"^#define +(\w+) +([\w ]+)")
+    res = {}
+    for line in defines.splitlines():
+        match = ptn.match(line)
+        if match:
+            res[match.group(1)] = match.group(2)
+    return res
+
+
+def _run_probe(compiler: str) -> CompilerProbe:
+    result = utils.run_command(
+        [compiler, "-E", "-P", "-v", "-dD", "-x", "c", os.devnull], check=True)
+    return CompilerProbe(
+        compiler=compiler,
+        include_paths=tuple(parse_include_paths(result.stderr or "")),
+        predefined_macros=parse_predefined_macros(result.stdout or ""),
+    )
+
+
+def _load(store: utils.JsonEntryStore, key: str) -> Optional[CompilerProbe]:
+    entry = store.load(key)
+    try:
+        return CompilerProbe(
+            compiler=entry["compiler"],
+            include_paths=tuple(entry["include_paths"]),
+            predefined_macros=dict(entry["predefined_macros"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def compiler_probe(compiler: Optional[str] = None) -> CompilerProbe:
+    """Probe `compiler` (default: `find_compiler()`), at most once per binary."""
+    compiler = compiler or find_compiler()
+    binary_key = _binary_key(compiler)
+    if binary_key is None:
+        # Not on PATH (or not stat-able): let the compiler call report it
+        return _run_probe(compiler)
+    with _lock:
+        probe = _compiler_probes.get(binary_key)
+        if probe is not None:
+            return probe
+        store = utils.JsonEntryStore(utils.get_cache_dir("toolchain"), _FORMAT_VERSION)
+        key = store.key(*binary_key)
+        probe = _load(store, key)
+        if probe is None:
+            logger.debug("Probing toolchain: %s", binary_key[1])
+            probe = _run_probe(compiler)
+            store.store(key, asdict(probe))
+        _compiler_probes[binary_key] = probe
+        return probe
+
+
+def clear_cache() -> None:
+    """Forget the in-process probes (on-disk entries are left in place)."""
+    with _lock:
+        _which.clear()
+        _compiler_probes.clear()
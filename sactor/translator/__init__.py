@@ -1,4 +1,5 @@
 from .idiomatic_translator import IdiomaticTranslator
+from .scheduler import PipelinedScheduler, TranslationScheduler
 from .translator import Translator
 from .translator_types import TranslateBatchResult, TranslateResult
 from .unidiomatic_translator import UnidiomaticTranslator
@@ -9,6 +10,8 @@ __all__ = [
     "IdiomaticTranslator",
     "TranslateResult",
     "TranslateBatchResult",
+    "TranslationScheduler",
+    "PipelinedScheduler",
 ]
 
 RESERVED_KEYWORDS = [
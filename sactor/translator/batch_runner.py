@@ -1,10 +1,14 @@
 import json
 import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from typing import Optional
 
 from sactor import logging as sactor_logging, utils
+from sactor.c_parser.parse_cache import ParseCache
 from sactor.c_parser.project_index import (
+    ProjectIndex,
     build_project_usr_owner_maps,
+    build_translation_unit_dependencies,
     order_translation_units_by_dependencies,
 )
 from sactor.combiner import ProjectCombiner, TuArtifact
@@ -13,6 +17,27 @@ from sactor.translator.translator_types import TranslateBatchResult
 logger = sactor_logging.get_logger(__name__)
 
 
+def _run_translation_unit(
+    runner_cls, runner_kwargs: dict, stage: str,
+) -> tuple[Optional[str], Optional[dict[str, bool]]]:
+    """Translate one TU; return the error message (None on success) and the
+    per-stage outcomes the runner reported, if it reports any.
+
+    Kept at module level so it can run in a worker process.
+    """
+    runner = None
+    error = None
+    try:
+        runner = runner_cls(**runner_kwargs)
+        runner.run()
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.error("%s translation failed for %s: %s", stage.capitalize(),
+                     runner_kwargs["input_file"], exc, exc_info=True)
+        error = str(exc)
+    stage_outcomes = getattr(runner, "stage_outcomes", None)
+    return error, dict(stage_outcomes) if stage_outcomes is not None else None
+
+
 def run_translate_batch(
     *,
     runner_cls,
@@ -33,10 +58,27 @@ def run_translate_batch(
     link_args: str,
     llm_stat: str | None,
 ) -> TranslateBatchResult:
+    utils.configure_cargo(config)
     translation_units = utils.list_c_files_from_compile_commands(compile_commands_file)
+    # Parse every TU once; ordering, ownership maps, the per-TU runners and the
+    # project combiner all query this index.
+    project_index = None
+    if compile_commands_file:
+        project_index = ProjectIndex.build(
+            compile_commands_file,
+            translation_units,
+            cache=ParseCache.from_config(config),
+            max_workers=config.get('parse_cache', {}).get('max_workers', 1),
+        )
+    tu_dependencies = build_translation_unit_dependencies(
+        translation_units,
+        compile_commands_file,
+        index=project_index,
+    )
     translation_units = order_translation_units_by_dependencies(
         translation_units,
         compile_commands_file,
+        tu_dependencies=tu_dependencies,
     )
     if not translation_units:
         raise ValueError("No C translation units found in compile_commands.json")
@@ -74,7 +116,7 @@ def run_translate_batch(
             struct_usr_owner,
             enum_usr_owner,
             global_usr_owner,
-        ) = build_project_usr_owner_maps(translation_units, compile_commands_file)
+        ) = build_project_usr_owner_maps(translation_units, compile_commands_file, index=project_index)
 
         for usr, tu in func_usr_owner.items():
             meta = per_tu.get(tu)
@@ -93,9 +135,9 @@ def run_translate_batch(
             if meta:
                 project_global_usr_to_result_dir[usr] = str(meta["result_dir"])  # type: ignore[index]
 
-    # Helper to build per-TU runner
-    def _make_runner(tu_path: str, unit_build_dir: str | None, unit_llm_stat: str | None, *, uni: bool, ido: bool):
-        return runner_cls(
+    # Helper to build per-TU runner arguments
+    def _runner_kwargs(tu_path: str, unit_build_dir: str | None, unit_llm_stat: str | None, *, uni: bool, ido: bool) -> dict:
+        return dict(
             input_file=tu_path,
             test_cmd_path=test_cmd_path,
             build_dir=unit_build_dir,
@@ -116,8 +158,106 @@ def run_translate_batch(
             project_struct_usr_to_result_dir=project_struct_usr_to_result_dir,
             project_enum_usr_to_result_dir=project_enum_usr_to_result_dir,
             project_global_usr_to_result_dir=project_global_usr_to_result_dir,
+            project_index=project_index,
         )
 
+    def _prepare_unit(tu_path: str, *, stage: str, uni: bool, ido: bool) -> dict:
+        meta = per_tu[tu_path]
+        slug = meta["slug"]  # type: ignore[index]
+        unit_result_dir = meta["result_dir"]  # type: ignore[index]
+        unit_build_dir = os.path.join(build_dir, slug) if build_dir else None
+        if unit_build_dir:
+            os.makedirs(unit_build_dir, exist_ok=True)
+        unit_llm_stat = None
+        if llm_stat:
+            unit_llm_stat = utils._derive_llm_stat_path(llm_stat, slug=slug)
+            llm_stat_dir = os.path.dirname(unit_llm_stat)
+            if llm_stat_dir:
+                os.makedirs(llm_stat_dir, exist_ok=True)
+
+        logger.info("Translating (%s) %s (result dir: %s)", stage, tu_path, unit_result_dir)
+        return _runner_kwargs(tu_path, unit_build_dir, unit_llm_stat, uni=uni, ido=ido)
+
+    max_workers = max(1, int(config['general'].get('max_parallel_translation_units', 1)))
+
+    def _run_phase(units: list[str], *, stage: str, ok_flags: dict[str, str], uni: bool, ido: bool) -> None:
+        """Translate `units` for one phase, recording the outcome in `per_tu`.
+
+        `ok_flags` maps each stage the runner performs to the `per_tu` flag
+        set when that stage succeeds. A runner that reports `stage_outcomes`
+        is taken at its word, and a stage it reports as failed fails the unit
+        even if the run raised no error; otherwise every stage counts as
+        successful iff the run raised no error.
+
+        With one worker the units run in order in this process. Otherwise a
+        unit is submitted to a process pool once every unit it depends on
+        (within this phase) has finished, so independent units of the
+        dependency DAG translate concurrently. Outcomes are recorded per unit,
+        so the summary does not depend on completion order.
+        """
+        nonlocal any_failed
+
+        def _record(tu_path: str, error: Optional[str], stage_outcomes: Optional[dict[str, bool]]) -> None:
+            nonlocal any_failed
+            meta = per_tu[tu_path]
+            failed_stages = []
+            for flag_stage, ok_flag in ok_flags.items():
+                if stage_outcomes is None:
+                    meta[ok_flag] = error is None
+                else:
+                    meta[ok_flag] = stage_outcomes.get(flag_stage, False)
+                    if not meta[ok_flag]:
+                        failed_stages.append(flag_stage)
+            if error is None and failed_stages:
+                # The runner logged the stage error and carried on
+                # (continue_run_when_incomplete); the unit still failed
+                error = f"{', '.join(failed_stages).capitalize()} translation did not succeed"
+            if error is not None:
+                meta["status"] = "failed"
+                meta["error"] = error
+                any_failed = True
+
+        if max_workers == 1 or len(units) <= 1:
+            for tu_path in units:
+                kwargs = _prepare_unit(tu_path, stage=stage, uni=uni, ido=ido)
+                _record(tu_path, *_run_translation_unit(runner_cls, kwargs, stage))
+            return
+
+        phase_units = set(units)
+        pending = list(units)
+        finished: set[str] = set()
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            running = {}
+            while pending or running:
+                for tu_path in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    deps = tu_dependencies.get(tu_path, set()) & phase_units
+                    if deps <= finished:
+                        pending.remove(tu_path)
+                        kwargs = _prepare_unit(tu_path, stage=stage, uni=uni, ido=ido)
+                        running[pool.submit(_run_translation_unit, runner_cls, kwargs, stage)] = tu_path
+                if not running:
+                    # Only units in a dependency cycle are left; break it in
+                    # the serial order, as order_translation_units_by_dependencies does.
+                    tu_path = pending.pop(0)
+                    kwargs = _prepare_unit(tu_path, stage=stage, uni=uni, ido=ido)
+                    running[pool.submit(_run_translation_unit, runner_cls, kwargs, stage)] = tu_path
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: units.index(running[f])):
+                    tu_path = running.pop(future)
+                    try:
+                        error, stage_outcomes = future.result()
+                    except Exception as exc:  # pylint: disable=broad-except
+                        logger.error("%s translation worker failed for %s: %s",
+                                     stage.capitalize(), tu_path, exc, exc_info=True)
+                        error, stage_outcomes = str(exc), None
+                    _record(tu_path, error, stage_outcomes)
+                    finished.add(tu_path)
+                    logger.info("[%d/%d] %s translation of %s %s",
+                                len(finished), len(units), stage.capitalize(), tu_path,
+                                "succeeded" if error is None else "failed")
+
     # Detect stubbed runner in tests (e.g., tests/test_translate_batch.py)
     is_stub_mode = hasattr(runner_cls, "instances") and isinstance(getattr(runner_cls, "instances"), list)
 
@@ -149,38 +289,36 @@ def run_translate_batch(
             entry_tu_file=entry_tu_file,
             tu_artifacts=tu_artifacts,
             variant=variant,
+            project_index=project_index,
         )
         ok, crate_dir, _bin_path = pc.combine_and_build()
         if not ok:
             any_failed = True
         return crate_dir
 
-    # Phase 1: unidiomatic for all TUs (unless idiomatic_only)
-    if run_unidiomatic_phase:
-        for tu_path in translation_units:
-            meta = per_tu[tu_path]
-            slug = meta["slug"]  # type: ignore[index]
-            unit_result_dir = meta["result_dir"]  # type: ignore[index]
-            unit_build_dir = os.path.join(build_dir, slug) if build_dir else None
-            if unit_build_dir:
-                os.makedirs(unit_build_dir, exist_ok=True)
-            unit_llm_stat = None
-            if llm_stat:
-                unit_llm_stat = utils._derive_llm_stat_path(llm_stat, slug=slug)
-                llm_stat_dir = os.path.dirname(unit_llm_stat)
-                if llm_stat_dir:
-                    os.makedirs(llm_stat_dir, exist_ok=True)
-
-            logger.info("Translating (unidiomatic) %s (result dir: %s)", tu_path, unit_result_dir)
+    pipeline_phases = (
+        run_unidiomatic_phase
+        and run_idiomatic_phase
+        and bool(config['general'].get('pipeline_translation_phases', False))
+    )
+    if pipeline_phases:
+        # Each TU runs both phases back to back (pipelined inside Sactor.run),
+        # so a TU's idiomatic work does not wait for every other TU's
+        # unidiomatic phase. The project-level crates are combined at the end.
+        _run_phase(translation_units, stage="pipelined",
+                   ok_flags={"unidiomatic": "_uni_success", "idiomatic": "_ido_success"},
+                   uni=False, ido=False)
+        for variant, tu_ok_flag in (("unidiomatic", "_uni_success"), ("idiomatic", "_ido_success")):
             try:
-                runner = _make_runner(tu_path, unit_build_dir, unit_llm_stat, uni=True, ido=False)
-                runner.run()
-                meta["_uni_success"] = True
+                _run_project_combiner(variant=variant, tu_ok_flag=tu_ok_flag)
             except Exception as exc:  # pylint: disable=broad-except
-                meta["status"] = "failed"
-                meta["error"] = str(exc)
                 any_failed = True
-                logger.error("Unidiomatic translation failed for %s: %s", tu_path, exc, exc_info=True)
+                logger.error("%s ProjectCombiner failed: %s", variant.capitalize(), exc, exc_info=True)
+        run_unidiomatic_phase = run_idiomatic_phase = False
+
+    # Phase 1: unidiomatic for all TUs (unless idiomatic_only)
+    if run_unidiomatic_phase:
+        _run_phase(translation_units, stage="unidiomatic", ok_flags={"unidiomatic": "_uni_success"}, uni=True, ido=False)
 
         try:
             _run_project_combiner(variant="unidiomatic", tu_ok_flag="_uni_success")
@@ -212,30 +350,7 @@ def run_translate_batch(
         if run_unidiomatic_phase:
             eligible_units = [tu for tu in translation_units if per_tu[tu].get("_uni_success")]
 
-        for tu_path in eligible_units:
-            meta = per_tu[tu_path]
-            slug = meta["slug"]  # type: ignore[index]
-            unit_result_dir = meta["result_dir"]  # type: ignore[index]
-            unit_build_dir = os.path.join(build_dir, slug) if build_dir else None
-            if unit_build_dir:
-                os.makedirs(unit_build_dir, exist_ok=True)
-            unit_llm_stat = None
-            if llm_stat:
-                unit_llm_stat = utils._derive_llm_stat_path(llm_stat, slug=slug)
-                llm_stat_dir = os.path.dirname(unit_llm_stat)
-                if llm_stat_dir:
-                    os.makedirs(llm_stat_dir, exist_ok=True)
-
-            logger.info("Translating (idiomatic) %s (result dir: %s)", tu_path, unit_result_dir)
-            try:
-                runner = _make_runner(tu_path, unit_build_dir, unit_llm_stat, uni=False, ido=True)
-                runner.run()
-                meta["_ido_success"] = True
-            except Exception as exc:  # pylint: disable=broad-except
-                meta["status"] = "failed"
-                meta["error"] = str(exc)
-                any_failed = True
-                logger.error("Idiomatic translation failed for %s: %s", tu_path, exc, exc_info=True)
+        _run_phase(eligible_units, stage="idiomatic", ok_flags={"idiomatic": "_ido_success"}, uni=False, ido=True)
 
         try:
             _run_project_combiner(variant="idiomatic", tu_ok_flag="_ido_success")
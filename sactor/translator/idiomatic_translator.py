@@ -118,6 +118,14 @@ class IdiomaticTranslator(Translator):
         self._struct_name_map_cache: Optional[dict[str, str]] = None
         self._spec_schema_text: Optional[str] = None
 
+    @override
+    def fork(self, build_path: str) -> Translator:
+        # Load the name maps first so every worker shares (and updates) the
+        # same dictionaries instead of caching its own copy.
+        self._load_function_name_map()
+        self._load_struct_name_map()
+        return super().fork(build_path)
+
     def _get_spec_schema_text(self) -> str:
         """Return the cached JSON schema text for SPEC generation."""
         if self._spec_schema_text is None:
@@ -401,7 +409,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
 
             rust_enum_codes: list[str] = []
             for enum_def in [enum_defs_map[name] for name in sorted(enum_defs_map.keys())]:
-                enum_translation_res = self._translate_enum_impl(enum_def)
+                enum_translation_res = self._translate_enum(enum_def)
                 if enum_translation_res != TranslateResult.SUCCESS:
                     return enum_translation_res
                 enum_code_path = os.path.join(
@@ -636,7 +644,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
         enum_dependency_code: dict[str, str] = {}
         if enum_dependency_defs:
             for enum_def in enum_dependency_defs.values():
-                self._translate_enum_impl(enum_def)
+                self._translate_enum(enum_def)
                 enum_path = os.path.join(
                     self.translated_enum_path, enum_def.name + ".rs")
                 enum_dependency_code[enum_def.name] = read_file(enum_path)
@@ -1086,23 +1094,24 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
 
         # Update idiomatic name mapping
         if idiomatic_struct_name:
-            try:
-                mapping_dir = os.path.join(final_spec_base, "specs")
-                os.makedirs(mapping_dir, exist_ok=True)
-                mapping_path = self._struct_name_map_path
-                mapping_data = {}
-                if os.path.exists(mapping_path):
-                    with open(mapping_path, "r") as _mf:
-                        try:
-                            mapping_data = json.load(_mf)
-                        except Exception:
-                            mapping_data = {}
-                mapping_data[struct_union.name] = idiomatic_struct_name
-                with open(mapping_path, "w") as _mf:
-                    json.dump(mapping_data, _mf, indent=2)
-                self._struct_name_map_cache = mapping_data
-            except Exception as e:
-                logger.warning("Struct name mapping update skipped: %s", e)
+            with self._state_lock:
+                try:
+                    mapping_dir = os.path.join(final_spec_base, "specs")
+                    os.makedirs(mapping_dir, exist_ok=True)
+                    mapping_path = self._struct_name_map_path
+                    mapping_data = {}
+                    if os.path.exists(mapping_path):
+                        with open(mapping_path, "r") as _mf:
+                            try:
+                                mapping_data = json.load(_mf)
+                            except Exception:
+                                mapping_data = {}
+                    mapping_data[struct_union.name] = idiomatic_struct_name
+                    with open(mapping_path, "w") as _mf:
+                        json.dump(mapping_data, _mf, indent=2)
+                    self._load_struct_name_map().update(mapping_data)
+                except Exception as e:
+                    logger.warning("Struct name mapping update skipped: %s", e)
 
         # Save the results
         self.mark_translation_success("struct", struct_union.name)
@@ -1194,7 +1203,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
         for global_var in used_global_var_nodes:
             if global_var.node.location is not None and global_var.node.location.file.name != function.node.location.file.name:
                 continue
-            global_var_res = self._translate_global_vars_impl(global_var)
+            global_var_res = self._translate_global_var(global_var)
             if global_var_res != TranslateResult.SUCCESS:
                 return global_var_res
             with open(os.path.join(self.translated_global_var_path, global_var.name + ".rs"), "r") as file:
@@ -1348,7 +1357,7 @@ The function uses the following const global variables, whose types and names ar
                 enum_definitions.add(enum_def)
 
             for enum_def in enum_definitions:
-                self._translate_enum_impl(enum_def)
+                self._translate_enum(enum_def)
                 enum_path = os.path.join(
                     self.translated_enum_path, enum_def.name + ".rs")
                 if not os.path.exists(enum_path):
@@ -1948,24 +1957,25 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
 
         # Update idiomatic name mapping (best-effort)
         if idiomatic_func_name:
-            try:
-                mapping_dir = os.path.join(final_spec_base, "specs")
-                os.makedirs(mapping_dir, exist_ok=True)
-                mapping_path = os.path.join(
-                    mapping_dir, "function_name_map.json")
-                mapping_data = {}
-                if os.path.exists(mapping_path):
-                    with open(mapping_path, "r") as _mf:
-                        try:
-                            mapping_data = json.load(_mf)
-                        except Exception:
-                            mapping_data = {}
-                mapping_data[function.name] = idiomatic_func_name
-                with open(mapping_path, "w") as _mf:
-                    json.dump(mapping_data, _mf, indent=2)
-                self._function_name_map_cache = mapping_data
-            except Exception as e:
-                logger.warning("Function name mapping update skipped: %s", e)
+            with self._state_lock:
+                try:
+                    mapping_dir = os.path.join(final_spec_base, "specs")
+                    os.makedirs(mapping_dir, exist_ok=True)
+                    mapping_path = os.path.join(
+                        mapping_dir, "function_name_map.json")
+                    mapping_data = {}
+                    if os.path.exists(mapping_path):
+                        with open(mapping_path, "r") as _mf:
+                            try:
+                                mapping_data = json.load(_mf)
+                            except Exception:
+                                mapping_data = {}
+                    mapping_data[function.name] = idiomatic_func_name
+                    with open(mapping_path, "w") as _mf:
+                        json.dump(mapping_data, _mf, indent=2)
+                    self._load_function_name_map().update(mapping_data)
+                except Exception as e:
+                    logger.warning("Function name mapping update skipped: %s", e)
 
         # save code
         self.mark_translation_success("function", function.name)
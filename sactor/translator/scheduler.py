@@ -0,0 +1,368 @@
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from sactor import logging as sactor_logging
+from sactor.c_parser import FunctionInfo, StructInfo
+
+from .translator import Translator
+from .translator_types import TranslateResult
+
+logger = sactor_logging.get_logger(__name__)
+
+
+@dataclass
+class _Task:
+    kind: str  # "struct" or "function"
+    item: StructInfo | FunctionInfo
+    index: int  # position in the serial (Divider) order
+    deps: set[int] = field(default_factory=set)
+    dependents: list[int] = field(default_factory=list)
+    stage: int = 0  # which translator handles the task
+
+
+class TranslationScheduler:
+    """Translate the structs and functions of one TU as a dependency-driven ready queue.
+
+    The Divider orders are turned into a DAG: an item waits for the
+    structs/functions of the same TU it depends on, and the members of a
+    circular group are chained in their listed order. Whenever an item's
+    inputs are settled it is checked with `Translator.check_dependencies`
+    exactly like the serial loop (blocked items are recorded with
+    `mark_dependency_block` and never translated), then handed to a worker.
+
+    Each worker uses a `Translator.fork` with its own build directory, so
+    verifications never share scratch space. Among ready items the one that
+    comes first in the serial order is dispatched first; with a single worker
+    this reproduces the serial order exactly.
+    """
+
+    def __init__(
+        self,
+        translator: Translator,
+        struct_order: list[list[StructInfo]],
+        function_order: list[list[FunctionInfo]],
+        max_workers: int = 1,
+    ) -> None:
+        self.translator = translator
+        self.max_workers = max(1, int(max_workers))
+        self.tasks: list[_Task] = []
+        self._build_graph(struct_order, function_order)
+
+    def _build_graph(self, struct_order, function_order) -> None:
+        struct_groups: dict[str, int] = {}
+        function_groups: dict[str, int] = {}
+        struct_tasks: dict[str, int] = {}
+        function_tasks: dict[str, int] = {}
+
+        for kind, order, groups, by_name in (
+            ("struct", struct_order, struct_groups, struct_tasks),
+            ("function", function_order, function_groups, function_tasks),
+        ):
+            for group_id, group in enumerate(order):
+                previous: Optional[int] = None
+                for item in group:
+                    task = _Task(kind, item, len(self.tasks))
+                    if previous is not None:
+                        # Keep members of a circular group in their listed order
+                        task.deps.add(previous)
+                    self.tasks.append(task)
+                    groups[item.name] = group_id
+                    by_name[item.name] = task.index
+                    previous = task.index
+
+        def _earlier(dep_name, groups, by_name, own_group):
+            # Only edges that point to an earlier group are real ordering
+            # constraints; references inside a cycle are chained above.
+            index = by_name.get(dep_name)
+            if index is None or (own_group is not None and groups[dep_name] >= own_group):
+                return None
+            return index
+
+        for task in self.tasks:
+            name = task.item.name
+            if task.kind == "struct":
+                own = struct_groups[name]
+                for dep in getattr(task.item, "dependencies", []) or []:
+                    index = _earlier(getattr(dep, "name", None), struct_groups, struct_tasks, own)
+                    if index is not None:
+                        task.deps.add(index)
+                continue
+            own = function_groups[name]
+            for dep in getattr(task.item, "struct_dependencies", []) or []:
+                index = struct_tasks.get(getattr(dep, "name", None))
+                if index is not None:
+                    task.deps.add(index)
+            for ref in getattr(task.item, "function_dependencies", []) or []:
+                target = getattr(ref, "target", None)
+                dep_name = getattr(target, "name", None) or getattr(ref, "name", None)
+                index = _earlier(dep_name, function_groups, function_tasks, own)
+                if index is not None:
+                    task.deps.add(index)
+
+        for task in self.tasks:
+            for dep in task.deps:
+                self.tasks[dep].dependents.append(task.index)
+
+    def _stage_translator(self, stage: int) -> Future:
+        """Return a future resolving to the translator of `stage`."""
+        future: Future = Future()
+        future.set_result(self.translator)
+        return future
+
+    def _worker_dir(self, base_build_path: str, stage: int, worker_id: int) -> str:
+        return os.path.join(base_build_path, "workers", f"worker_{worker_id}")
+
+    def _should_skip(self, task: _Task) -> bool:
+        """Whether `task` must not be translated at all (not a dependency block)."""
+        return False
+
+    def _task_finished(self, task: _Task, result: TranslateResult) -> None:
+        """Hook called with the result of every translated task."""
+
+    def _is_ready(self, translator: Translator, task: _Task) -> bool:
+        if task.kind == "struct":
+            ready, blockers = translator.check_dependencies(
+                task.item, lambda s: s.dependencies)
+            if not ready and blockers:
+                translator.mark_dependency_block("struct", task.item.name, blockers)
+            return ready
+
+        struct_ready, struct_blockers = translator.check_dependencies(
+            task.item, lambda s: s.struct_dependencies)
+        logger.debug("Checking function %s: struct_ready=%s, struct_blockers=%s",
+                     task.item.name, struct_ready, struct_blockers)
+        func_ready, func_blockers = translator.check_dependencies(
+            task.item, lambda s: s.function_dependencies)
+        if not struct_ready or not func_ready:
+            blockers = []
+            if struct_blockers:
+                blockers.extend(struct_blockers)
+            if func_blockers:
+                blockers.extend(func_blockers)
+            translator.mark_dependency_block("function", task.item.name, blockers)
+            return False
+        return True
+
+    @staticmethod
+    def _translate(translator: Translator, task: _Task) -> TranslateResult:
+        if task.kind == "struct":
+            return translator.translate_struct(task.item)
+        return translator.translate_function(task.item)
+
+    def run(self) -> TranslateResult:
+        return self._final_result(self._run_tasks())
+
+    def _run_tasks(self) -> dict[int, TranslateResult]:
+        results: dict[int, TranslateResult] = {}
+        remaining = {task.index: len(task.deps) for task in self.tasks}
+        ready = sorted(index for index, count in remaining.items() if count == 0)
+        stages = sorted({task.stage for task in self.tasks})
+        translators = {stage: self._stage_translator(stage) for stage in stages}
+
+        def _settle(index: int) -> None:
+            for dependent in self.tasks[index].dependents:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+            ready.sort()
+
+        def _check(task: _Task) -> Optional[Translator]:
+            # The translator to run `task` with, or None if it is skipped/blocked
+            if self._should_skip(task):
+                return None
+            translator = translators[task.stage].result()
+            return translator if self._is_ready(translator, task) else None
+
+        if self.max_workers == 1:
+            while ready:
+                task = self.tasks[ready.pop(0)]
+                translator = _check(task)
+                if translator is not None:
+                    results[task.index] = self._translate(translator, task)
+                    self._task_finished(task, results[task.index])
+                _settle(task.index)
+            return results
+
+        base_build_path = self.translator.verifier.build_path
+        workers: dict[int, queue.SimpleQueue[Translator]] = {}
+        forks: list[Translator] = []
+
+        def _workers_for(stage: int) -> queue.SimpleQueue[Translator]:
+            if stage not in workers:
+                translator = translators[stage].result()
+                pool: queue.SimpleQueue[Translator] = queue.SimpleQueue()
+                for worker_id in range(self.max_workers):
+                    fork = translator.fork(
+                        self._worker_dir(base_build_path, stage, worker_id))
+                    forks.append(fork)
+                    pool.put(fork)
+                workers[stage] = pool
+            return workers[stage]
+
+        def _run_on_worker(pool: queue.SimpleQueue[Translator], task: _Task) -> TranslateResult:
+            translator = pool.get()
+            try:
+                return self._translate(translator, task)
+            finally:
+                pool.put(translator)
+
+        running: dict[Future, int] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while ready or running:
+                    for index in list(ready):
+                        if len(running) >= self.max_workers:
+                            break
+                        task = self.tasks[index]
+                        if not translators[task.stage].done():
+                            # Its stage is still being set up (e.g. Crown analysis)
+                            continue
+                        ready.remove(index)
+                        if _check(task) is None:
+                            _settle(task.index)
+                            continue
+                        logger.debug("Scheduling %s %s", task.kind, task.item.name)
+                        running[executor.submit(
+                            _run_on_worker, _workers_for(task.stage), task)] = task.index
+                    pending_stages = {future for future in translators.values()
+                                      if not future.done()}
+                    if not running and not pending_stages:
+                        continue
+                    done, _ = wait(set(running) | pending_stages,
+                                   return_when=FIRST_COMPLETED)
+                    for future in sorted((f for f in done if f in running),
+                                         key=lambda f: running[f]):
+                        index = running.pop(future)
+                        results[index] = future.result()
+                        self._task_finished(self.tasks[index], results[index])
+                        _settle(index)
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+        self._log_workspace_statistics(forks)
+        return results
+
+    @staticmethod
+    def _log_workspace_statistics(forks: list[Translator]) -> None:
+        for fork in forks:
+            workspace_pool = getattr(fork.verifier, "workspace_pool", None)
+            if workspace_pool is None:
+                continue
+            stats = workspace_pool.statistics()
+            logger.info(
+                "Verifier workspaces in %s: %d leases, %.2fs waited (max %.2fs), "
+                "peak %d of %d in use, utilisation %.0f%%",
+                workspace_pool.build_path,
+                stats["leases"],
+                stats["total_wait_time"],
+                stats["max_wait_time"],
+                stats["peak_in_use"],
+                stats["size"],
+                stats["utilisation"] * 100,
+            )
+
+    @staticmethod
+    def _final_result(results: dict[int, TranslateResult]) -> TranslateResult:
+        # Like the serial loop: the last failing item (in serial order) wins
+        final_result = TranslateResult.SUCCESS
+        for index in sorted(results):
+            if results[index] != TranslateResult.SUCCESS:
+                final_result = results[index]
+        return final_result
+
+
+class PipelinedScheduler(TranslationScheduler):
+    """Run the unidiomatic and idiomatic translation of one TU as a single pipeline.
+
+    Every item gets a second, idiomatic task that waits for the item's own
+    unidiomatic task and for the idiomatic tasks of its dependencies, so it
+    starts as soon as its unidiomatic inputs are on disk instead of after the
+    whole unidiomatic phase. The idiomatic translator (which needs the Crown
+    analysis) is built by `idiomatic_factory` on a background thread while
+    the unidiomatic items are being translated.
+
+    With a single worker all unidiomatic items still come first, in serial
+    order. With `stop_on_unidiomatic_failure` no idiomatic item is started
+    once an unidiomatic item has failed, like the serial run which stops
+    before the idiomatic phase.
+    """
+
+    def __init__(
+        self,
+        translator: Translator,
+        idiomatic_factory: Callable[[], Translator],
+        struct_order: list[list[StructInfo]],
+        function_order: list[list[FunctionInfo]],
+        max_workers: int = 1,
+        stop_on_unidiomatic_failure: bool = False,
+    ) -> None:
+        super().__init__(translator, struct_order, function_order, max_workers)
+        self.idiomatic_factory = idiomatic_factory
+        self.idiomatic_translator: Optional[Translator] = None
+        self.stop_on_unidiomatic_failure = stop_on_unidiomatic_failure
+        self._idiomatic_future: Optional[Future] = None
+        self._unidiomatic_failed = False
+        self._stage_size = len(self.tasks)
+        for task in self.tasks[:self._stage_size]:
+            self.tasks.append(_Task(
+                task.kind,
+                task.item,
+                self._stage_size + task.index,
+                deps={self._stage_size + dep for dep in task.deps} | {task.index},
+                stage=1,
+            ))
+        for task in self.tasks[self._stage_size:]:
+            for dep in task.deps:
+                self.tasks[dep].dependents.append(task.index)
+
+    def _stage_translator(self, stage: int) -> Future:
+        if stage == 0:
+            return super()._stage_translator(stage)
+        if self._idiomatic_future is None:
+            future: Future = Future()
+
+            def _build() -> None:
+                try:
+                    self.idiomatic_translator = self.idiomatic_factory()
+                except BaseException as exc:  # pylint: disable=broad-except
+                    future.set_exception(exc)
+                else:
+                    future.set_result(self.idiomatic_translator)
+
+            threading.Thread(target=_build, name="idiomatic-setup", daemon=True).start()
+            self._idiomatic_future = future
+        return self._idiomatic_future
+
+    def _worker_dir(self, base_build_path: str, stage: int, worker_id: int) -> str:
+        if stage == 0:
+            return super()._worker_dir(base_build_path, stage, worker_id)
+        return os.path.join(base_build_path, "workers", f"idiomatic_worker_{worker_id}")
+
+    def _should_skip(self, task: _Task) -> bool:
+        if task.stage == 0:
+            return False
+        if self._stage_translator(1).exception() is not None:
+            return True
+        return self.stop_on_unidiomatic_failure and self._unidiomatic_failed
+
+    def _task_finished(self, task: _Task, result: TranslateResult) -> None:
+        if task.stage == 0 and result != TranslateResult.SUCCESS:
+            self._unidiomatic_failed = True
+
+    def run(self) -> tuple[TranslateResult, TranslateResult]:  # type: ignore[override]
+        """Return the (unidiomatic, idiomatic) results.
+
+        A failure to set up the idiomatic translator is re-raised once the
+        unidiomatic items are done.
+        """
+        results = self._run_tasks()
+        # Re-raises a setup failure; also builds the translator for empty TUs
+        self._stage_translator(1).result()
+        unidiomatic = {i: r for i, r in results.items() if i < self._stage_size}
+        idiomatic = {i: r for i, r in results.items() if i >= self._stage_size}
+        return self._final_result(unidiomatic), self._final_result(idiomatic)
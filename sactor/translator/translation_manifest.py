@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+from sactor import logging as sactor_logging
+from sactor.c_parser import CParser
+
+logger = sactor_logging.get_logger(__name__)
+
+# Item kind -> sub-directory of translated_code_<stage>
+_ITEM_DIRS = {
+    "function": "functions",
+    "struct": "structs",
+    "enum": "enums",
+    "global_var": "global_vars",
+}
+
+# Item kind -> map of C name to idiomatic name, in translated_code_<stage>/specs
+_NAME_MAPS = {
+    "function": "function_name_map.json",
+    "struct": "struct_name_map.json",
+}
+
+
+class TranslationManifest:
+    """Records which C inputs every translated item was produced from.
+
+    Each item is keyed by a hash of its extracted C code combined with the
+    hashes of everything it depends on, so editing a struct also changes
+    the hash of every function (transitively) using it. Before a stage
+    runs, `invalidate` removes the saved translations whose hash no longer
+    matches; the translators then redo exactly those items, since they only
+    skip items whose result file exists. Changing the model or system
+    message invalidates the whole stage.
+
+    Dependencies on other translation units are hashed by name/USR only.
+    """
+
+    FILE_NAME = "translation_manifest.json"
+
+    def __init__(self, c_parser: CParser, config: dict, result_dir: str) -> None:
+        self.c_parser = c_parser
+        self.result_dir = result_dir
+        self.path = os.path.join(result_dir, self.FILE_NAME)
+        self.config_hash = self._config_hash(config)
+        self._hashes: Optional[dict[str, str]] = None
+
+    @staticmethod
+    def _config_hash(config: dict) -> str:
+        general = config.get('general', {})
+        model = general.get('model')
+        backend_model = None
+        for entry in config.get('litellm', {}).get('model_list', []) or []:
+            if entry.get('model_name') == model:
+                backend_model = entry.get('litellm_params', {}).get('model')
+                break
+        payload = json.dumps([model, backend_model, general.get('system_message')])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _extract_code(self, kind: str, name: str) -> str:
+        extractors = {
+            "function": self.c_parser.extract_function_code,
+            "struct": self.c_parser.extract_struct_union_definition_code,
+            "enum": self.c_parser.extract_enum_definition_code,
+            "global_var": self.c_parser.extract_global_var_definition_code,
+        }
+        try:
+            return extractors[kind](name)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.debug("Cannot extract C code of %s %s: %s", kind, name, exc)
+            return ""
+
+    @staticmethod
+    def _dependencies(kind: str, item) -> list[tuple[str, object]]:
+        deps: list[tuple[str, object]] = []
+        if kind == "function":
+            deps.extend(("struct", s) for s in item.struct_dependencies)
+            deps.extend(("global_var", g) for g in item.global_vars_dependencies)
+            deps.extend(("enum", e) for e in item.enum_dependencies)
+            deps.extend(("enum", v.definition) for v in item.enum_values_dependencies)
+            for ref in item.function_dependencies:
+                target = getattr(ref, "target", None)
+                # Functions of other TUs are only known by reference
+                deps.append(("function", target) if target is not None
+                            else ("extern", getattr(ref, "usr", None) or ref.name))
+        elif kind == "struct":
+            deps.extend(("struct", s) for s in item.dependencies)
+            deps.extend(("enum", e) for e in item.enum_dependencies)
+        elif kind == "global_var":
+            deps.extend(("enum", e) for e in item.enum_dependencies)
+        return deps
+
+    def item_hashes(self) -> dict[str, str]:
+        """Return `{"<kind>:<name>": hash}` for every item of the TU."""
+        if self._hashes is not None:
+            return self._hashes
+        own: dict[str, str] = {}
+        deep: dict[str, str] = {}
+
+        def _own_hash(kind: str, item) -> str:
+            key = f"{kind}:{item.name}"
+            if key not in own:
+                code = self._extract_code(kind, item.name)
+                aliases = getattr(item, "type_alias_dependencies", None) or getattr(item, "type_aliases", None) or {}
+                payload = json.dumps([code, sorted(aliases.items())])
+                own[key] = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+            return own[key]
+
+        def _deep_hash(kind: str, item, visiting: set[str]) -> str:
+            if kind == "extern":
+                return f"extern:{item}"
+            key = f"{kind}:{item.name}"
+            if key in deep:
+                return deep[key]
+            if key in visiting:
+                # Recursive types/functions: the cycle contributes its own hashes only
+                return _own_hash(kind, item)
+            visiting.add(key)
+            dep_hashes = sorted(
+                _deep_hash(dep_kind, dep, visiting)
+                for dep_kind, dep in self._dependencies(kind, item)
+                if dep is not None
+            )
+            visiting.discard(key)
+            payload = json.dumps([_own_hash(kind, item), dep_hashes])
+            deep[key] = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+            return deep[key]
+
+        items = [
+            *(("function", f) for f in self.c_parser.get_functions()),
+            *(("struct", s) for s in self.c_parser.get_structs()),
+            *(("enum", e) for e in self.c_parser.get_enums()),
+            *(("global_var", g) for g in self.c_parser.get_global_vars()),
+        ]
+        for kind, item in items:
+            _deep_hash(kind, item, set())
+        self._hashes = deep
+        return deep
+
+    def _load(self) -> dict:
+        if not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable translation manifest %s: %s", self.path, exc)
+            return {}
+
+    def _artifact_paths(self, stage: str, key: str) -> list[str]:
+        kind, name = key.split(":", 1)
+        stage_dir = os.path.join(self.result_dir, f"translated_code_{stage}")
+        paths = [os.path.join(stage_dir, _ITEM_DIRS[kind], f"{name}.rs")]
+        if kind in _NAME_MAPS:
+            # Idiomatic SPEC saved alongside the translation
+            paths.append(os.path.join(stage_dir, "specs", _ITEM_DIRS[kind], f"{name}.json"))
+            if stage == "idiomatic":
+                # Verified test harness, restored for dependents by the idiomatic verifier
+                paths.append(os.path.join(self.result_dir, "test_harness", _ITEM_DIRS[kind], f"{name}.rs"))
+        return paths
+
+    def _forget_names(self, stage: str, keys: list[str]) -> None:
+        """Drop the idiomatic names recorded for `keys` from the stage's name maps."""
+        for kind, file_name in _NAME_MAPS.items():
+            names = {key.split(":", 1)[1] for key in keys if key.startswith(f"{kind}:")}
+            path = os.path.join(self.result_dir, f"translated_code_{stage}", "specs", file_name)
+            if not names or not os.path.isfile(path):
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    mapping = json.load(f)
+            except (OSError, ValueError) as exc:
+                logger.warning("Ignoring unreadable name map %s: %s", path, exc)
+                continue
+            if not isinstance(mapping, dict) or not names & mapping.keys():
+                continue
+            for name in names:
+                mapping.pop(name, None)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(mapping, f, indent=2)
+
+    def invalidate(self, stage: str) -> list[str]:
+        """Delete the `stage` translations whose inputs changed; return their keys.
+
+        Items without a recorded hash (e.g. results of a run predating the
+        manifest) are kept as they are.
+        """
+        recorded = self._load().get(stage)
+        if not recorded:
+            return []
+        current = self.item_hashes()
+        config_changed = recorded.get("config") != self.config_hash
+        stale = sorted(
+            key for key, digest in recorded.get("items", {}).items()
+            if config_changed or current.get(key) != digest
+        )
+        for key in stale:
+            for path in self._artifact_paths(stage, key):
+                if os.path.isfile(path):
+                    os.remove(path)
+        self._forget_names(stage, stale)
+        added = set(current) - set(recorded.get("items", {}))
+        if stale or added:
+            combined = os.path.join(self.result_dir, f"translated_code_{stage}", "combined.rs")
+            if os.path.isfile(combined):
+                os.remove(combined)
+        if stale:
+            logger.info("Retranslating %d %s item(s) whose C code or dependencies changed: %s",
+                        len(stale), stage, ", ".join(stale))
+        return stale
+
+    def record(self, stage: str) -> None:
+        """Record the hashes of every `stage` item that has a saved translation."""
+        items = {
+            key: digest for key, digest in self.item_hashes().items()
+            if os.path.isfile(self._artifact_paths(stage, key)[0])
+        }
+        manifest = self._load()
+        manifest[stage] = {"config": self.config_hash, "items": items}
+        os.makedirs(self.result_dir, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
@@ -1,8 +1,11 @@
+import copy
 import json
 import os
+import threading
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from sactor import logging as sactor_logging
 from sactor import utils
@@ -31,6 +34,10 @@ class Translator(ABC):
         self.const_global_max_translation_len = int(
             config['general'].get('const_global_max_translation_len', 2048)
         )
+        # Number of candidates sampled per attempt; values above 1 enable
+        # speculative translation with concurrent verification.
+        self.speculative_candidates = max(
+            1, int(config['general'].get('speculative_candidates', 1)))
         self.c_parser = c_parser
         self.failure_info = {}
         if result_path:
@@ -43,6 +50,39 @@ class Translator(ABC):
         self._failure_info_backup_prepared = False
         self.translation_status: Dict[str, Dict[str, TranslationOutcome]] = defaultdict(dict)
         self._dependency_cache: Dict[Tuple[str, str], bool] = {}
+        # Shared by forks (see `fork`) so bookkeeping stays consistent when
+        # several items are translated concurrently.
+        self._state_lock = threading.RLock()
+        self._item_locks: Dict[Tuple[str, str], threading.RLock] = {}
+
+    def fork(self, build_path: str) -> "Translator":
+        """Return a worker copy of this translator that verifies under `build_path`.
+
+        The copy shares failure info, translation status and the LLM with the
+        original; only the verifier's scratch directories are private.
+        """
+        clone = copy.copy(self)
+        item_verifier = getattr(self, "verifier", None)
+        if item_verifier is not None:
+            clone.verifier = item_verifier.with_build_path(build_path)
+        return clone
+
+    def _item_lock(self, item_type: str, item_name: str) -> threading.RLock:
+        with self._state_lock:
+            key = (item_type, item_name)
+            lock = self._item_locks.get(key)
+            if lock is None:
+                lock = self._item_locks[key] = threading.RLock()
+            return lock
+
+    def _translate_enum(self, enum: EnumInfo) -> TranslateResult:
+        # Enums are translated on demand by whichever item needs them first
+        with self._item_lock("enum", enum.name):
+            return self._translate_enum_impl(enum)
+
+    def _translate_global_var(self, global_var: GlobalVarInfo) -> TranslateResult:
+        with self._item_lock("global_var", global_var.name):
+            return self._translate_global_vars_impl(global_var)
 
     def translate_struct(self, struct_union: StructInfo) -> TranslateResult:
         res = self._translate_struct_impl(struct_union)
@@ -98,7 +138,47 @@ class Translator(ABC):
     ) -> TranslateResult:
         pass
 
+    def _verify_candidates(
+        self,
+        candidates: Sequence[Any],
+        verify: Callable[[int, Any, threading.Event], tuple[VerifyResult, Optional[str]]],
+    ) -> tuple[Optional[int], Dict[int, tuple[VerifyResult, Optional[str]]]]:
+        """Verify candidates concurrently and stop at the first success.
+
+        `verify(position, candidate, cancel)` must only touch state private to
+        that candidate (e.g. a verifier from `Verifier.workspace`). Returns
+        the position of the winning candidate (or None) together with the
+        results collected so far. Once a winner is found `cancel` is set:
+        `verify` should then stop early (the verifier kills its running
+        tests), and its result is discarded.
+        """
+        results: Dict[int, tuple[VerifyResult, Optional[str]]] = {}
+        if not candidates:
+            return None, results
+        cancel = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        futures = {
+            executor.submit(verify, position, candidate, cancel): position
+            for position, candidate in enumerate(candidates)
+        }
+        winner = None
+        try:
+            for future in as_completed(futures):
+                position = futures[future]
+                results[position] = future.result()
+                if results[position][0] == VerifyResult.SUCCESS:
+                    winner = position
+                    break
+        finally:
+            cancel.set()
+            executor.shutdown(wait=False)
+        return winner, results
+
     def append_failure_info(self, item, error_type, error_message, error_translation):
+        with self._state_lock:
+            self._append_failure_info(item, error_type, error_message, error_translation)
+
+    def _append_failure_info(self, item, error_type, error_message, error_translation):
         self.failure_info[item]["errors"].append({
             "type": error_type,
             "message": error_message,
@@ -110,6 +190,10 @@ class Translator(ABC):
         self.save_failure_info(self.failure_info_path)
 
     def init_failure_info(self, type, item):
+        with self._state_lock:
+            self._init_failure_info(type, item)
+
+    def _init_failure_info(self, type, item):
         if item not in self.failure_info:
             # TODO: fix failure_info keys to be unique
             # Currently we use item name as key,
@@ -129,6 +213,10 @@ class Translator(ABC):
         # Status is recorded only when we reach a terminal outcome.
 
     def failure_info_set_attempts(self, item, attempts):
+        with self._state_lock:
+            self._failure_info_set_attempts(item, attempts)
+
+    def _failure_info_set_attempts(self, item, attempts):
         info = self.failure_info.get(item)
         if info is None:
             raise KeyError(f"Attempting to update attempts for unknown item: {item}")
@@ -138,12 +226,13 @@ class Translator(ABC):
         self.save_failure_info(self.failure_info_path)
 
     def save_failure_info(self, path):
-        if self.failure_info == {}:
-            return
-        # write into json format
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'w') as f:
-            json.dump(self.failure_info, f, indent=4)
+        with self._state_lock:
+            if self.failure_info == {}:
+                return
+            # write into json format
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(self.failure_info, f, indent=4)
 
     def prepare_failure_info_backup(self):
         if self._failure_info_backup_prepared:
@@ -247,6 +336,10 @@ class Translator(ABC):
         return len(blockers) == 0, blockers
 
     def mark_dependency_block(self, item_type: str, item_name: str, blockers: Sequence[dict]):
+        with self._state_lock:
+            self._mark_dependency_block(item_type, item_name, blockers)
+
+    def _mark_dependency_block(self, item_type: str, item_name: str, blockers: Sequence[dict]):
         if not blockers:
             return
         self.init_failure_info(item_type, item_name)
@@ -273,9 +366,10 @@ class Translator(ABC):
         self._set_translation_status(item_type, item_name, outcome)
 
     def mark_translation_success(self, item_type: str, item_name: str):
-        self._record_outcome(item_type, item_name, TranslationOutcome.SUCCESS)
-        key = (item_type, item_name)
-        self._dependency_cache[key] = True
+        with self._state_lock:
+            self._record_outcome(item_type, item_name, TranslationOutcome.SUCCESS)
+            key = (item_type, item_name)
+            self._dependency_cache[key] = True
 
     def _resolve_dependency_type(self, dep) -> str:
         if isinstance(dep, StructInfo):
@@ -304,14 +398,16 @@ class Translator(ABC):
         return "unknown"
 
     def _record_outcome(self, item_type: str, item_name: str, outcome: TranslationOutcome):
-        self._set_translation_status(item_type, item_name, outcome)
-        if item_name in self.failure_info:
-            self.failure_info[item_name]['status'] = outcome.value
+        with self._state_lock:
+            self._set_translation_status(item_type, item_name, outcome)
+            if item_name in self.failure_info:
+                self.failure_info[item_name]['status'] = outcome.value
 
     def _set_translation_status(self, item_type: str, item_name: str, status: TranslationOutcome):
         if not item_type:
             return
-        self.translation_status[item_type][item_name] = status
+        with self._state_lock:
+            self.translation_status[item_type][item_name] = status
 
     def _get_translation_status(self, item_type: str, item_name: str) -> Optional[TranslationOutcome]:
         if not item_type:
@@ -392,7 +392,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
             rust_enum_codes: list[str] = []
             c_enum_codes: list[str] = []
             for enum_def in enum_defs_in_order:
-                enum_translation_res = self._translate_enum_impl(enum_def)
+                enum_translation_res = self._translate_enum(enum_def)
                 if enum_translation_res != TranslateResult.SUCCESS:
                     return enum_translation_res
                 enum_code_path = os.path.join(
@@ -578,7 +578,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
         for enum_def in getattr(struct_union, "enum_dependencies", []):
             enum_dependencies[enum_def.name] = enum_def
         for enum_def in enum_dependencies.values():
-            self._translate_enum_impl(enum_def)
+            self._translate_enum(enum_def)
 
         match struct_union.data_type:
             case DataType.STRUCT:
@@ -716,7 +716,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
 
                 for enum_def in collected_enum_defs:
                     if enum_def not in code_of_enum:
-                        self._translate_enum_impl(enum_def)
+                        self._translate_enum(enum_def)
                         code_path = os.path.join(
                             self.translated_enum_path, enum_def.name + ".rs")
                         code_of_enum[enum_def] = read_file(code_path)
@@ -733,7 +733,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
                 != function.node.location.file.name
             ):
                 continue
-            global_var_res = self._translate_global_vars_impl(global_var)
+            global_var_res = self._translate_global_var(global_var)
             if global_var_res != TranslateResult.SUCCESS:
                 return global_var_res, None
             code_path = os.path.join(
@@ -776,7 +776,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
 
             for enum_def in enum_definitions:
                 if enum_def not in code_of_enum:
-                    self._translate_enum_impl(enum_def)
+                    self._translate_enum(enum_def)
                     code_path = os.path.join(
                         self.translated_enum_path, enum_def.name + ".rs")
                     code_of_enum[enum_def] = read_file(code_path)
@@ -1155,8 +1155,163 @@ Analyze the error messages, think about the possible reasons, and try to avoid t
             raise NotImplementedError(
                 f'error type {verify_result[0]} not implemented')
 
+        data_type_code = code_of_structs_full | used_global_vars | code_of_enum | {
+            "stdio": used_stdio_code}
+
+        def verify_translation(
+            function_verifier: verifier.UnidiomaticVerifier,
+            function_result: str,
+            prefix: bool,
+        ) -> tuple[VerifyResult, Optional[str]]:
+            # add error handling because here can raise exceptions
+            return function_verifier.verify_function(
+                function,
+                function_code=function_result,
+                data_type_code=data_type_code,
+                function_dependency_signatures=function_depedency_signatures,
+                function_dependency_uses=function_dependency_uses,
+                has_prefix=prefix
+            )
+
+        if self.speculative_candidates > 1:
+            return self._translate_function_speculative(
+                function, prompt, verify_translation, attempts)
+
         # result = query_llm(prompt, False, f"test.rs")
         result = self.llm.query(prompt)
+        function_result, prefix, precheck_error = self._precheck_function_candidate(
+            function, result)
+        if precheck_error is not None:
+            error_message, error_translation = precheck_error
+            self.append_failure_info(
+                function.name, "COMPILE_ERROR", error_message, error_translation
+            )
+            return self._translate_function_impl(
+                function,
+                verify_result=(VerifyResult.COMPILE_ERROR, error_message),
+                error_translation=error_translation,
+                attempts=attempts+1
+            )
+
+        logger.debug("Translated function %s:", function.name)
+        logger.debug("%s", function_result)
+
+        result = verify_translation(self.verifier, function_result, prefix)
+        if result[0] != VerifyResult.SUCCESS:
+            # Try to translate the function again, with the error message
+            self._append_verify_failure(function, result, function_result)
+            return self._translate_function_impl(
+                function,
+                result,
+                error_translation=function_result,
+                attempts=attempts+1
+            )
+        return self._save_function_translation(function, function_result)
+
+    def _translate_function_speculative(
+        self,
+        function: FunctionInfo,
+        prompt: str,
+        verify_translation,
+        attempts: int,
+    ) -> TranslateResult:
+        """Sample several candidates for one attempt and keep the first that verifies.
+
+        Each candidate is verified in a workspace leased from the verifier's
+        pool, so at most `verifier.workspace_pool_size` run at once. When every candidate fails, all failures
+        are recorded and the lowest-numbered one drives the next attempt, so
+        the retry prompt does not depend on verification timing.
+        """
+        responses = self.llm.query_candidates(
+            prompt, self.speculative_candidates)
+        failures: dict[int, tuple[tuple[VerifyResult, Optional[str]], str]] = {}
+        candidates: list[tuple[int, str, bool]] = []
+        for index, response in enumerate(responses):
+            function_result, prefix, precheck_error = self._precheck_function_candidate(
+                function, response)
+            if precheck_error is not None:
+                error_message, error_translation = precheck_error
+                failures[index] = (
+                    (VerifyResult.COMPILE_ERROR, error_message), error_translation)
+            else:
+                candidates.append((index, function_result, prefix))
+
+        def verify_candidate(_position, candidate, cancel):
+            _index, function_result, prefix = candidate
+            with self.verifier.workspace(cancel=cancel) as candidate_verifier:
+                if cancel.is_set():
+                    # Another candidate won while this one waited for a workspace
+                    return (VerifyResult.TEST_ERROR, "Verification cancelled")
+                return verify_translation(candidate_verifier, function_result, prefix)
+
+        logger.info(
+            "Verifying %d of %d speculative candidates for function %s",
+            len(candidates),
+            len(responses),
+            function.name,
+        )
+        winner, results = self._verify_candidates(candidates, verify_candidate)
+        if winner is not None:
+            index, function_result, _ = candidates[winner]
+            logger.info(
+                "Speculative candidate %d passed for function %s", index, function.name)
+            return self._save_function_translation(function, function_result)
+
+        for position, (index, function_result, _) in enumerate(candidates):
+            if position in results:
+                failures[index] = (results[position], function_result)
+        for index in sorted(failures):
+            verify_result, error_translation = failures[index]
+            self._append_verify_failure(function, verify_result, error_translation)
+        verify_result, error_translation = failures[min(failures)]
+        return self._translate_function_impl(
+            function,
+            verify_result,
+            error_translation=error_translation,
+            attempts=attempts+1
+        )
+
+    def _append_verify_failure(
+        self,
+        function: FunctionInfo,
+        result: tuple[VerifyResult, Optional[str]],
+        function_result: str,
+    ) -> None:
+        if result[0] == VerifyResult.COMPILE_ERROR:
+            compile_error = result[1]
+            self.append_failure_info(
+                function.name, "COMPILE_ERROR", compile_error, function_result)
+
+        elif result[0] == VerifyResult.TEST_ERROR or result[0] == VerifyResult.FEEDBACK or result[0] == VerifyResult.TEST_TIMEOUT:
+            # TODO: maybe simply retry the translation here
+            test_error = result[1]
+            self.append_failure_info(
+                function.name, "TEST_ERROR", test_error, function_result)
+
+        else:
+            raise NotImplementedError(
+                f'error type {result[0]} not implemented')
+
+    def _save_function_translation(self, function: FunctionInfo, function_result: str) -> TranslateResult:
+        function_save_path = os.path.join(
+            self.translated_function_path, function.name + ".rs")
+        function_result = rust_ast_parser.unidiomatic_function_cleanup(
+            function_result)
+        self.mark_translation_success("function", function.name)
+        utils.save_code(function_save_path, function_result)
+        return TranslateResult.SUCCESS
+
+    def _precheck_function_candidate(
+        self,
+        function: FunctionInfo,
+        result: str,
+    ) -> tuple[str, bool, Optional[tuple[str, str]]]:
+        """Parse and sanity-check one raw LLM answer before verification.
+
+        Returns (function_result, has_prefix, error). `error` is None when the
+        candidate can be verified, otherwise the (message, translation) pair
+        to record and feed back into the next attempt.
+        """
         try:
             llm_result = utils.parse_llm_result(result, "function")
         except:
@@ -1169,15 +1324,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
 ----END FUNCTION----
 '''
             logger.error("%s", error_message)
-            self.append_failure_info(
-                function.name, "COMPILE_ERROR", error_message, result
-            )
-            return self._translate_function_impl(
-                function,
-                verify_result=(VerifyResult.COMPILE_ERROR, error_message),
-                error_translation=result,
-                attempts=attempts+1
-            )
+            return result, False, (error_message, result)
         function_result = llm_result["function"]
 
         # TODO: check function signature, must use pointers, not Box, etc.
@@ -1187,37 +1334,12 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
         except Exception as e:
             error_message = f"Error: Syntax error in the translated code: {e}"
             logger.error("%s", error_message)
-            # retry the translation
-            self.append_failure_info(
-                function.name,
-                "COMPILE_ERROR",
-                error_message,
-                function_result
-            )
-            return self._translate_function_impl(
-                function,
-                verify_result=(VerifyResult.COMPILE_ERROR,
-                               error_message),
-                error_translation=function_result,
-                attempts=attempts+1
-            )
+            return function_result, False, (error_message, function_result)
 
         # detect whether there are too many functions which many causing multi-definition problem after combining
         if len(function_result_sigs) > 1:
             error_message = f"Error: {len(function_result_sigs)} functions are generated, expect **only one** function. If you need to define help function please generate it as a subfuncion in the translated function."
-            self.append_failure_info(
-                function.name,
-                "COMPILE_ERROR",
-                error_message,
-                function_result
-            )
-            return self._translate_function_impl(
-                function,
-                verify_result=(
-                    VerifyResult.COMPILE_ERROR, error_message),
-                error_translation=function_result,
-                attempts=attempts+1
-            )
+            return function_result, False, (error_message, function_result)
 
         prefix = False
         if function.name not in function_result_sigs:
@@ -1228,31 +1350,13 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
                     prefix = True
                 else:
                     error_message = f"Function {name_prefix} not found in the translated code"
-                    self.append_failure_info(
-                        function.name, "COMPILE_ERROR", error_message, function_result
-                    )
-                    return self._translate_function_impl(
-                        function,
-                        verify_result=(
-                            VerifyResult.COMPILE_ERROR, error_message),
-                        error_translation=function_result,
-                        attempts=attempts+1
-                    )
+                    return function_result, False, (error_message, function_result)
             else:
                 error_message = f"Error: Function signature not found in the translated code for function `{function.name}`. Got functions: {list(
                     function_result_sigs.keys()
                 )}, check if you have the correct function name., you should **NOT** change the camel case to snake case and vice versa."
                 logger.error("%s", error_message)
-                self.append_failure_info(
-                    function.name, "COMPILE_ERROR", error_message, function_result
-                )
-                return self._translate_function_impl(
-                    function,
-                    verify_result=(
-                        VerifyResult.COMPILE_ERROR, error_message),
-                    error_translation=function_result,
-                    attempts=attempts+1
-                )
+                return function_result, False, (error_message, function_result)
         else:
             function_result_sig = function_result_sigs[function.name]
         pointers_count = function_result_sig.count('*')
@@ -1263,16 +1367,7 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
 
         if len(function_result.strip()) == 0:
             error_message = "Translated code doesn't wrap by the tags as instructed"
-            self.append_failure_info(
-                function.name, "COMPILE_ERROR", error_message, result
-            )
-            return self._translate_function_impl(
-                function,
-                verify_result=(
-                    VerifyResult.COMPILE_ERROR, error_message),
-                error_translation=result,
-                attempts=attempts+1
-            )
+            return function_result, prefix, (error_message, result)
         try:
         # process the function result
         # there may be an Error, so put it in a try block
@@ -1280,59 +1375,6 @@ Error: Failed to parse the result from LLM, result is not wrapped by the tags as
         except SyntaxError as e:
             error_message = f"Error: Syntax error in the translated code when processing use statements: {e}"
             logger.error("%s", error_message)
-            # retry the translation
-            self.append_failure_info(
-                function.name,
-                "COMPILE_ERROR",
-                error_message,
-                function_result
-            )
-            return self._translate_function_impl(
-                function,
-                verify_result=(VerifyResult.COMPILE_ERROR,
-                               error_message),
-                error_translation=function_result,
-                attempts=attempts+1
-            )
+            return function_result, prefix, (error_message, function_result)
 
-        logger.debug("Translated function %s:", function.name)
-        logger.debug("%s", function_result)
-
-        data_type_code = code_of_structs_full | used_global_vars | code_of_enum | {
-            "stdio": used_stdio_code}
-        # add error handling because here can raise exceptions
-        result = self.verifier.verify_function(
-            function,
-            function_code=function_result,
-            data_type_code=data_type_code,
-            function_dependency_signatures=function_depedency_signatures,
-            function_dependency_uses=function_dependency_uses,
-            has_prefix=prefix
-        )
-        if result[0] != VerifyResult.SUCCESS:
-            if result[0] == VerifyResult.COMPILE_ERROR:
-                compile_error = result[1]
-                self.append_failure_info(
-                    function.name, "COMPILE_ERROR", compile_error, function_result)
-                # Try to translate the function again, with the error message
-
-            elif result[0] == VerifyResult.TEST_ERROR or result[0] == VerifyResult.FEEDBACK or result[0] == VerifyResult.TEST_TIMEOUT:
-                # TODO: maybe simply retry the translation here
-                test_error = result[1]
-                self.append_failure_info(
-                    function.name, "TEST_ERROR", test_error, function_result)
-
-            else:
-                raise NotImplementedError(
-                    f'error type {result[0]} not implemented')
-            return self._translate_function_impl(
-                function,
-                result,
-                error_translation=function_result,
-                attempts=attempts+1
-            )
-        function_result = rust_ast_parser.unidiomatic_function_cleanup(
-            function_result)
-        self.mark_translation_success("function", function.name)
-        utils.save_code(function_save_path, function_result)
-        return TranslateResult.SUCCESS
+        return function_result, prefix, None
@@ -1,9 +1,10 @@
 import os, copy
 import hashlib
+import json
 import shutil
 import tempfile
 import subprocess
-from typing import List, Tuple, Optional, Sequence
+from typing import Callable, List, Tuple, Optional, Sequence, TypeVar
 from pathlib import Path
 from importlib import resources
 import re, shlex
@@ -11,20 +12,19 @@ import tomli as toml
 import sys
 import time
 import select
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING
 from sactor import logging as sactor_logging
-from sactor import rust_ast_parser
 from sactor.data_types import DataType
-from sactor.thirdparty.rustfmt import RustFmt
 from collections import namedtuple
 from dataclasses import dataclass
 
-from clang.cindex import (
-    Cursor,
-    SourceLocation,
-    SourceRange,
-    CompilationDatabase,
-    CompilationDatabaseError,
-)
+# libclang, the Rust AST parser and the third-party tool wrappers are imported
+# where they are used, so light CLI paths (e.g. `sactor run-tests`) start fast
+if TYPE_CHECKING:
+    from clang.cindex import Cursor
 
 logger = sactor_logging.get_logger(__name__)
 
@@ -125,28 +125,125 @@ def _derive_llm_stat_path(
         return f"{root}_{suffix}{ext}"
     return f"{base_path}_{suffix}"
 
+def _write_if_changed(path, content) -> bool:
+    """Write `content` to `path` unless it already holds exactly that.
+
+    Cargo fingerprints path sources by mtime, so leaving unchanged files
+    untouched keeps their build artifacts fresh. Returns True if written.
+    """
+    mode = "wb" if isinstance(content, bytes) else "w"
+    try:
+        with open(path, "rb" if mode == "wb" else "r") as f:
+            if f.read() == content:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    with open(path, mode) as f:
+        f.write(content)
+    return True
+
+
 def _copy_resource_tree(resource_root, destination: Path) -> None:
-    """Recursively copy a Traversable resource tree into the destination path."""
+    """Mirror a Traversable resource tree into the destination path.
+
+    Files whose content is already up to date are left untouched and files
+    that are not part of the resource tree are removed.
+    """
     def _copy(node, target: Path) -> None:
         if node.is_dir():
+            if target.is_file():
+                target.unlink()
             target.mkdir(parents=True, exist_ok=True)
-            for child in node.iterdir():
-                _copy(child, target / child.name)
+            children = {child.name: child for child in node.iterdir()}
+            for existing in list(target.iterdir()):
+                if existing.name not in children:
+                    if existing.is_dir():
+                        shutil.rmtree(existing)
+                    else:
+                        existing.unlink()
+            for name, child in children.items():
+                _copy(child, target / name)
         else:
+            if target.is_dir():
+                shutil.rmtree(target)
             target.parent.mkdir(parents=True, exist_ok=True)
-            with node.open("rb") as src, open(target, "wb") as dst:
-                dst.write(src.read())
+            with node.open("rb") as src:
+                _write_if_changed(target, src.read())
+
+    _copy(resource_root, Path(destination))
+
+
+LIBC_CRATE_VERSION = "0.2.159"
+CARGO_VENDOR_DIR_ENV = "SACTOR_CARGO_VENDOR_DIR"
+
+
+def configure_cargo(config: dict) -> None:
+    """Export `[cargo] vendor_dir` so every generated project builds offline.
+
+    An explicit `SACTOR_CARGO_VENDOR_DIR` in the environment takes precedence.
+    The setting lives in the environment so worker processes inherit it.
+    """
+    vendor_dir = config.get('cargo', {}).get('vendor_dir', '')
+    if vendor_dir and not os.environ.get(CARGO_VENDOR_DIR_ENV):
+        os.environ[CARGO_VENDOR_DIR_ENV] = os.path.abspath(os.path.expanduser(vendor_dir))
+
+
+def get_cargo_vendor_dir() -> Optional[str]:
+    vendor_dir = os.environ.get(CARGO_VENDOR_DIR_ENV)
+    return os.path.abspath(os.path.expanduser(vendor_dir)) if vendor_dir else None
+
+
+def write_cargo_offline_config(project_dir: str) -> None:
+    """Point crates.io at the vendored sources, if configured, and go offline.
+
+    Writes `.cargo/config.toml` below `project_dir`; without a vendor directory
+    a config left behind by an earlier offline build is removed.
+    """
+    config_path = os.path.join(project_dir, ".cargo", "config.toml")
+    vendor_dir = get_cargo_vendor_dir()
+    if vendor_dir is None:
+        if os.path.exists(config_path):
+            os.remove(config_path)
+        return
+    content = f'''[source.crates-io]
+replace-with = "sactor-vendored"
+
+[source.sactor-vendored]
+directory = {json.dumps(vendor_dir)}
+
+[net]
+offline = true
+'''
+    os.makedirs(os.path.dirname(config_path), exist_ok=True)
+    _write_if_changed(config_path, content)
+
+
+def vendor_crates(vendor_dir: str) -> None:
+    """Download the crates generated projects depend on into `vendor_dir`.
+
+    Run once on a machine with registry access; the directory can then be
+    copied to offline workers and selected with `[cargo] vendor_dir`.
+    """
+    vendor_dir = os.path.abspath(os.path.expanduser(vendor_dir))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        create_rust_proj("", "sactor_vendor", tmpdir, is_lib=True)
+        # Fetching must reach the registry even if offline builds are configured
+        shutil.rmtree(os.path.join(tmpdir, ".cargo"), ignore_errors=True)
+        cmd = ["cargo", "vendor", "--versioned-dirs", "--manifest-path",
+               os.path.join(tmpdir, "Cargo.toml"), vendor_dir]
+        result = run_command(cmd)
+        if result.returncode != 0:
+            raise RuntimeError(f"Failed to vendor crates into {vendor_dir}: {result.stderr}")
 
-    destination_path = Path(destination)
-    if destination_path.exists():
-        shutil.rmtree(destination_path)
-    destination_path.mkdir(parents=True, exist_ok=True)
-    for child in resource_root.iterdir():
-        _copy(child, destination_path / child.name)
 
 def create_rust_proj(rust_code, proj_name, path, is_lib: bool, proc_macro=False):
-    if os.path.exists(path):
-        shutil.rmtree(path)
+    """Create or refresh the cargo project at `path`.
+
+    The project is updated in place: `target/` and `Cargo.lock` survive
+    between calls, and `Cargo.toml` and the crate root are only rewritten when
+    their content changes, so repeated builds in the same workspace reuse
+    compiled dependencies and incremental compilation state.
+    """
     os.makedirs(os.path.join(path, "src"), exist_ok=True)
 
     manifest = f'''
@@ -156,7 +253,7 @@ version = "0.1.0"
 edition = "2021"
 
 [dependencies]
-libc = "0.2.159"'''
+libc = "{LIBC_CRATE_VERSION}"'''
     if proc_macro:
         manifest += '''
 sactor_proc_macros = { path = "./sactor_proc_macros" }'''
@@ -167,15 +264,15 @@ sactor_proc_macros = { path = "./sactor_proc_macros" }'''
 name = "{proj_name}"
 crate-type = ["cdylib"]'''
 
-    with open(f"{path}/Cargo.toml", "w") as f:
-        f.write(manifest)
+    _write_if_changed(f"{path}/Cargo.toml", manifest)
+    write_cargo_offline_config(path)
 
-    if is_lib:
-        with open(f"{path}/src/lib.rs", "w") as f:
-            f.write(rust_code)
-    else:
-        with open(f"{path}/src/main.rs", "w") as f:
-            f.write(rust_code)
+    # Only one crate root may exist, otherwise cargo also builds the other target
+    crate_root, stale_root = ("lib.rs", "main.rs") if is_lib else ("main.rs", "lib.rs")
+    stale_path = os.path.join(path, "src", stale_root)
+    if os.path.exists(stale_path):
+        os.remove(stale_path)
+    _write_if_changed(os.path.join(path, "src", crate_root), rust_code)
 
     if proc_macro:
         macros_destination = Path(path) / "sactor_proc_macros"
@@ -200,6 +297,76 @@ def get_temp_dir():
     return new_tmp_dir
 
 
+def get_cache_dir(*parts: str) -> str:
+    """Return (and create) a persistent cache directory shared across runs.
+
+    Resolution order: `SACTOR_CACHE_DIR`, `$XDG_CACHE_HOME/sactor`, then
+    `~/.cache/sactor`. Extra `parts` are joined below the root.
+    """
+    root = os.environ.get("SACTOR_CACHE_DIR")
+    if not root:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache")
+        root = os.path.join(xdg, "sactor")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class JsonEntryStore:
+    """Directory of JSON cache entries, one file per entry.
+
+    An entry is addressed by the SHA-256 of its key parts, prefixed with the
+    caller's format version (bumping it orphans old entries), and lives at
+    `path/<key[:2]>/<key>.json`. Entries are written to a temporary file and
+    renamed into place, so concurrent runs may share `path` and a reader
+    never sees a half-written entry.
+    """
+
+    def __init__(self, path: str, format_version: int) -> None:
+        self.path = path
+        self.format_version = format_version
+        os.makedirs(path, exist_ok=True)
+
+    def key(self, *parts) -> str:
+        payload = json.dumps([self.format_version, *parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def load(self, key: str):
+        """Return the entry stored under `key`, or None when it is missing or unreadable."""
+        try:
+            with open(self.entry_path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, entry) -> None:
+        """Write `entry` under `key`; a failed write only loses the entry."""
+        entry_path = self.entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, entry_path)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.debug("Failed to write cache entry %s: %s", entry_path, exc)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 of the file at `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def parse_llm_result(llm_result, *args):
     '''
     Parse the result from LLM.
@@ -265,6 +432,8 @@ def save_code(path, code):
     os.makedirs(path_dir, exist_ok=True)
     with open(path, "w") as f:
         f.write(code)
+    from sactor.thirdparty.rustfmt import RustFmt
+
     rustfmt = RustFmt(path)
     try:
         rustfmt.format()
@@ -400,6 +569,8 @@ def rename_rust_function_signature(signature: str, old_name: str, new_name: str,
         signature = signature.replace(";", "")
         has_tail_comma = True
 
+    from sactor import rust_ast_parser
+
     signature = signature + "{}"
     match data_type:
         case DataType.FUNCTION:
@@ -424,35 +595,16 @@ def rename_rust_function_signature(signature: str, old_name: str, new_name: str,
 
 
 def get_compiler() -> str:
-    if shutil.which("clang"):
-        compiler = "clang"
-    elif shutil.which("gcc"):
-        compiler = "gcc"
-    else:
-        raise OSError("No C compiler found")
+    from sactor import toolchain
 
-    return compiler
+    return toolchain.find_compiler()
 
 
 def get_compiler_include_paths() -> list[str]:
-    compiler = get_compiler()
-    cmd = [compiler, '-v', '-E', '-x', 'c', '/dev/null']
-    result = run_command(cmd)
-    compile_output = result.stderr
-    search_include_paths = []
-
-    add_include_path = False
-    for line in compile_output.split('\n'):
-        if line.startswith('#include <...> search starts here:'):
-            add_include_path = True
-            continue
-        if line.startswith('End of search list.'):
-            break
+    """Include search paths of the C compiler, from the cached toolchain probe."""
+    from sactor import toolchain
 
-        if add_include_path:
-            search_include_paths.append(line.strip())
-
-    return search_include_paths
+    return list(toolchain.compiler_probe().include_paths)
 
 def is_compile_command(command: List[str]) -> bool:
     """Return True if the command invokes a C compiler (gcc/clang/cc variants)."""
@@ -470,6 +622,8 @@ def is_compile_command(command: List[str]) -> bool:
 
 def load_compile_commands_from_file(path: str, to_translate_file: str) -> List[List[str]]:
     """Load compile commands for the target C file using libclang's compilation database."""
+    from clang.cindex import CompilationDatabase, CompilationDatabaseError
+
     if not path:
         return []
     if not os.path.exists(path):
@@ -538,6 +692,8 @@ def load_compile_commands_from_file(path: str, to_translate_file: str) -> List[L
 
 def list_c_files_from_compile_commands(path: str) -> list[str]:
     """Return all distinct .c translation units described by compile_commands.json."""
+    from clang.cindex import CompilationDatabase, CompilationDatabaseError
+
     if not path:
         return []
     if not os.path.exists(path):
@@ -699,7 +855,9 @@ def compile_c_code(
 # Workaround for bug in clang.cindex: cursor.get_tokens() return empty list if macro is used
 # https://github.com/llvm/llvm-project/issues/43451
 # https://github.com/llvm/llvm-project/issues/68340
-def cursor_get_tokens(cursor: Cursor):
+def cursor_get_tokens(cursor: "Cursor"):
+    from clang.cindex import SourceLocation, SourceRange
+
     tu = cursor.translation_unit
 
     start = cursor.extent.start
@@ -883,6 +1041,14 @@ def _extend_with_limit(buffer: bytearray, chunk: bytes, limit: int) -> bool:
     return len(chunk) > remaining
 
 
+def _terminate_process_group(process: subprocess.Popen) -> None:
+    """Terminate `process` and everything it spawned (e.g. the program behind `sh -c`)."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        process.terminate()
+
+
 def _run_command_streaming(
     cmd: Sequence[str | os.PathLike[str]],
     *,
@@ -891,6 +1057,8 @@ def _run_command_streaming(
     env: dict[str, str] | None,
     cwd: str | os.PathLike[str] | None,
     text: bool,
+    cancel: threading.Event | None = None,
+    input_data: str | bytes | None = None,
 ) -> ProcessResult:
     if limit_bytes is None or limit_bytes <= 0:
         raise ValueError("limit_bytes must be a positive integer")
@@ -898,13 +1066,36 @@ def _run_command_streaming(
     configured_time_limit = time_limit_sec
     process = subprocess.Popen(
         cmd,
+        stdin=subprocess.PIPE if input_data is not None else None,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         bufsize=0,
         env=env,
         cwd=cwd,
         text=False,
+        # Own process group, so a timeout also stops the children of a wrapper
+        # script instead of leaving them holding our pipes open
+        start_new_session=True,
     )
+    if input_data is not None:
+        if isinstance(input_data, str):
+            input_data = input_data.encode()
+
+        def _feed_stdin(stdin, data: bytes) -> None:
+            # Written from a thread so a child that does not read stdin
+            # cannot block the output loop
+            try:
+                stdin.write(data)
+            except (BrokenPipeError, OSError):
+                pass
+            finally:
+                try:
+                    stdin.close()
+                except OSError:
+                    pass
+
+        threading.Thread(
+            target=_feed_stdin, args=(process.stdin, input_data), daemon=True).start()
 
     stdout_buf = bytearray()
     stderr_buf = bytearray()
@@ -916,64 +1107,75 @@ def _run_command_streaming(
     if process.stderr is not None:
         streams.append(process.stderr)
 
-    while streams:
-        now = time.monotonic()
-        if time_limit_sec is not None and now - start_time >= time_limit_sec:
-            timed_out = True
-            logger.warning(
-                "Time limit reached (%.2fs); terminating process",
-                configured_time_limit,
-            )
-            process.terminate()
-            time_limit_sec = None  # avoid repeated termination attempts
-
-        timeout = None
-        if time_limit_sec is not None:
-            timeout = max(0.0, min(0.2, time_limit_sec - (now - start_time)))
-
-        readable, _, _ = select.select(streams, [], [], timeout)
-        if not readable:
-            if process.poll() is not None:
-                # Drain any remaining data after process exit.
-                for stream in list(streams):
-                    chunk = stream.read()
-                    if chunk:
-                        truncated = _extend_with_limit(
-                            stdout_buf if stream is process.stdout else stderr_buf,
-                            chunk,
-                            limit_bytes,
-                        )
-                        if truncated:
-                            logger.warning(
-                                "%s byte limit reached (%d bytes); terminating process",
-                                "Stdout" if stream is process.stdout else "Stderr",
+    try:
+        while streams:
+            now = time.monotonic()
+            if time_limit_sec is not None and now - start_time >= time_limit_sec:
+                timed_out = True
+                logger.warning(
+                    "Time limit reached (%.2fs); terminating process",
+                    configured_time_limit,
+                )
+                _terminate_process_group(process)
+                time_limit_sec = None  # avoid repeated termination attempts
+            if cancel is not None and cancel.is_set() and process.poll() is None:
+                logger.debug("Command cancelled; terminating process")
+                _terminate_process_group(process)
+                cancel = None
+
+            timeout = None
+            if time_limit_sec is not None:
+                timeout = max(0.0, min(0.2, time_limit_sec - (now - start_time)))
+            elif cancel is not None:
+                timeout = 0.2
+
+            readable, _, _ = select.select(streams, [], [], timeout)
+            if not readable:
+                if process.poll() is not None:
+                    # Drain any remaining data after process exit.
+                    for stream in list(streams):
+                        chunk = stream.read()
+                        if chunk:
+                            truncated = _extend_with_limit(
+                                stdout_buf if stream is process.stdout else stderr_buf,
+                                chunk,
                                 limit_bytes,
                             )
-                            if process.poll() is None:
-                                process.terminate()
-                    else:
-                        streams.remove(stream)
-            continue
-
-        for stream in readable:
-            chunk = stream.read(4096)
-            if not chunk:
-                streams.remove(stream)
+                            if truncated:
+                                logger.warning(
+                                    "%s byte limit reached (%d bytes); terminating process",
+                                    "Stdout" if stream is process.stdout else "Stderr",
+                                    limit_bytes,
+                                )
+                                if process.poll() is None:
+                                    _terminate_process_group(process)
+                        else:
+                            streams.remove(stream)
                 continue
-            buffer = stdout_buf if stream is process.stdout else stderr_buf
-            truncated = _extend_with_limit(buffer, chunk, limit_bytes)
-            if truncated:
-                logger.warning(
-                    "%s byte limit reached (%d bytes); terminating process",
-                    "Stdout" if stream is process.stdout else "Stderr",
-                    limit_bytes,
-                )
-                if process.poll() is None:
-                    process.terminate()
 
-        if process.poll() is not None:
-            # Allow loop to drain remaining buffered data on next iteration.
-            continue
+            for stream in readable:
+                chunk = stream.read(4096)
+                if not chunk:
+                    streams.remove(stream)
+                    continue
+                buffer = stdout_buf if stream is process.stdout else stderr_buf
+                truncated = _extend_with_limit(buffer, chunk, limit_bytes)
+                if truncated:
+                    logger.warning(
+                        "%s byte limit reached (%d bytes); terminating process",
+                        "Stdout" if stream is process.stdout else "Stderr",
+                        limit_bytes,
+                    )
+                    if process.poll() is None:
+                        _terminate_process_group(process)
+
+            if process.poll() is not None:
+                # Allow loop to drain remaining buffered data on next iteration.
+                continue
+    except BaseException:
+        # Do not leave the command running if we are interrupted
+        _terminate_process_group(process)
+        raise
 
     try:
         process.wait(timeout=5)
@@ -1014,18 +1216,18 @@ def run_command(
     cwd: str | os.PathLike[str] | None = None,
     check: bool = False,
     input_data: str | bytes | None = None,
+    cancel: threading.Event | None = None,
 ) -> ProcessResult:
     """
     Unified command execution helper.
 
-    Streams output when ``limit_bytes`` is provided, enforcing byte/time limits.
+    Streams output when ``limit_bytes`` is provided, enforcing byte/time limits;
+    only then is the process terminated once ``cancel`` is set.
     Otherwise delegates to ``subprocess.run`` with consistent return semantics.
     """
     if limit_bytes is not None:
         if not capture_output:
             raise ValueError("capture_output must be True when enforcing byte limits")
-        if input_data is not None:
-            raise ValueError("stdin input is not supported when limit_bytes is set")
         time_limit = timeout if timeout is not None else 300
         result = _run_command_streaming(
             cmd,
@@ -1034,6 +1236,8 @@ def run_command(
             env=env,
             cwd=cwd,
             text=text,
+            cancel=cancel,
+            input_data=input_data,
         )
         if check and result.returncode != 0:
             raise subprocess.CalledProcessError(
@@ -1058,3 +1262,75 @@ def run_command(
     if check and result.returncode != 0:
         raise subprocess.CalledProcessError(result.returncode, cmd, stdout, stderr)
     return result
+
+
+def adaptive_timeout(
+    runtime: Optional[float],
+    multiple: float,
+    floor: float,
+    ceiling: float,
+) -> float:
+    """Deadline for a test whose reference run took `runtime` seconds.
+
+    `multiple` times the reference runtime, but never below `floor` nor above
+    `ceiling`; without a reference runtime the deadline is `ceiling`.
+    """
+    if runtime is None or multiple <= 0:
+        return ceiling
+    return min(ceiling, max(floor, multiple * runtime))
+
+
+_T = TypeVar("_T")
+
+
+class _ChildEvent(threading.Event):
+    """An event that also reads as set once its `parent` is set."""
+
+    def __init__(self, parent: threading.Event | None) -> None:
+        super().__init__()
+        self._parent = parent
+
+    def is_set(self) -> bool:
+        return super().is_set() or (self._parent is not None and self._parent.is_set())
+
+
+def run_fail_fast(
+    count: int,
+    run_one: Callable[[int, threading.Event], Optional[_T]],
+    max_workers: int = 1,
+    cancel: threading.Event | None = None,
+) -> Optional[tuple[int, _T]]:
+    """Run `run_one(i, cancel)` for every i in `range(count)` and return the first failure.
+
+    `run_one` returns None on success and a failure value otherwise. With
+    several workers the calls run concurrently; once call i fails, calls with
+    a higher index are cancelled (dropped if not started, their `cancel`
+    event set otherwise) while lower ones are awaited. The result is
+    therefore the `(index, failure)` of the lowest failing index, exactly as
+    if the calls had run in order up to the first failure. Setting `cancel`
+    sets the event of every call.
+    """
+    cancels = [_ChildEvent(cancel) for _ in range(count)]
+    if max_workers <= 1 or count <= 1:
+        for i in range(count):
+            failure = run_one(i, cancels[i])
+            if failure is not None:
+                return i, failure
+        return None
+
+    lowest: Optional[tuple[int, _T]] = None
+    with ThreadPoolExecutor(max_workers=min(max_workers, count)) as executor:
+        futures = {executor.submit(run_one, i, cancels[i]): i for i in range(count)}
+        for future in as_completed(futures):
+            i = futures[future]
+            if future.cancelled() or (lowest is not None and i > lowest[0]):
+                continue
+            failure = future.result()
+            if failure is None:
+                continue
+            lowest = (i, failure)
+            for other, j in futures.items():
+                if j > i:
+                    other.cancel()
+                    cancels[j].set()
+    return lowest
@@ -5,7 +5,7 @@ from typing import override, Optional
 from sactor import logging as sactor_logging
 from sactor import utils
 
-from .verifier import Verifier
+from .verifier import Verifier, leases_workspace
 from .verifier_types import VerifyResult
 
 
@@ -13,6 +13,9 @@ logger = sactor_logging.get_logger(__name__)
 
 
 class E2EVerifier(Verifier):
+    # e2e_verify runs the built program or links the built library
+    compile_emits_artifact = True
+
     def __init__(
         self,
         test_cmd_path: str,
@@ -42,6 +45,7 @@ class E2EVerifier(Verifier):
     def verify_function(self):
         raise NotImplementedError("Can not verify function in E2EVerifier")
 
+    @leases_workspace
     def e2e_verify(self, code: str) -> tuple[VerifyResult, Optional[str]]:
         # try compile the code
         compile_result = self.try_compile_rust_code(code, self.is_executable)
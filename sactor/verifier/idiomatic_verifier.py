@@ -7,7 +7,7 @@ from sactor.c_parser import FunctionInfo, StructInfo
 from sactor.combiner.partial_combiner import CombineResult, PartialCombiner
 from sactor.data_types import DataType
 from sactor.llm import LLM
-from .verifier import Verifier
+from .verifier import Verifier, leases_workspace
 from .verifier_types import VerifyResult
 from .selftest.struct_roundtrip import StructRoundTripTester
 from sactor.verifier.spec.harness_codegen import generate_struct_harness_from_spec_file, generate_function_harness_from_spec_file
@@ -46,10 +46,6 @@ class IdiomaticVerifier(Verifier):
             entry_tu_file=entry_tu_file,
             link_closure=link_closure,
         )
-        self.function_test_harness_dir = os.path.join(
-            self.build_path, "function_test_harness")
-        self.struct_test_harness_dir = os.path.join(
-            self.build_path, "struct_test_harness")
         self.llm = llm
         self.max_attempts = self.config['general']['max_verifier_harness_attempts']
         if result_path is not None:
@@ -65,6 +61,14 @@ class IdiomaticVerifier(Verifier):
             self.unidiomatic_result_path = self.result_path
         self._idiomatic_struct_name_cache: dict[str, str] = {}
 
+    @override
+    def _set_build_path(self, build_path: str) -> None:
+        super()._set_build_path(build_path)
+        self.function_test_harness_dir = os.path.join(
+            self.build_path, "function_test_harness")
+        self.struct_test_harness_dir = os.path.join(
+            self.build_path, "struct_test_harness")
+
     def _coach_struct_compile_error(
         self,
         struct_name: str,
@@ -1046,6 +1050,7 @@ Output only the two functions in this format:
         return (VerifyResult.SUCCESS, None)
 
     @override
+    @leases_workspace
     def verify_function(
         self,
         function: FunctionInfo,
@@ -1225,6 +1230,7 @@ Output only the two functions in this format:
         return (VerifyResult.SUCCESS, None)
 
     @override
+    @leases_workspace
     def verify_struct(
         self,
         struct: StructInfo,
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from sactor import logging as sactor_logging
+from sactor import utils
+from sactor.c_parser.parse_cache import ParseCache
+from sactor.c_parser.project_index import ProjectIndex
+from sactor.utils import is_compile_command, process_commands_to_compile
+
+if TYPE_CHECKING:
+    from .verifier import Verifier
+
+logger = sactor_logging.get_logger(__name__)
+
+
+@dataclass
+class LinkPlan:
+    """Everything the project-level relink needs that does not change per attempt."""
+    # Raw compile commands of every TU in the link closure, in closure order
+    compile_commands: dict[str, list[list[str]]]
+    cmake_libs: list[str]
+    # `cmake_libs` followed by the user link args not already present
+    libs: list[str]
+    # Every file each closure TU includes, TU itself first
+    includes: dict[str, list[str]]
+
+
+def compile_object(c_path: str, commands: list[list[str]], source_path: str, obj_out: str) -> None:
+    """Compile `source_path` with the compile commands of `c_path` into `obj_out`."""
+    for command in process_commands_to_compile(commands, obj_out, source_path):
+        to_check = is_compile_command(command)
+        logger.debug("Running compile command: %s", command)
+        res = utils.run_command(command, capture_output=False)
+        if to_check and res.returncode != 0:
+            raise RuntimeError(f"Error: Failed to compile object for {c_path}")
+
+
+class ProjectRelink:
+    """Link plan and object cache shared by a verifier and all of its copies.
+
+    The plan (closure compile commands, CMake libs, link args) is computed
+    on first use and then reused for every attempt. Objects of closure TUs
+    that are linked unmodified are cached under `cache_dir`, keyed by the
+    content hashes of the TU and every header it includes and by the TU's
+    compile commands, so each is compiled once per runner; only the TU
+    holding the function under test is recompiled per attempt.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._plan: Optional[LinkPlan] = None
+        self.hits = 0
+        self.misses = 0
+
+    def plan(self, verifier: "Verifier") -> LinkPlan:
+        with self._lock:
+            if self._plan is None:
+                compile_commands = {
+                    c_path: utils.load_compile_commands_from_file(
+                        verifier.compile_commands_file, c_path)
+                    for c_path in verifier.link_closure
+                }
+                cmake_libs = verifier._discover_cmake_libs()
+                # Preserve cmake order; append user-specified args if not present
+                libs = list(cmake_libs)
+                for arg in verifier.link_args:
+                    if arg not in libs:
+                        libs.append(arg)
+                # The runner already built this index; reuse it for the
+                # include lists that key the object cache
+                index = ProjectIndex.for_compile_commands(
+                    verifier.compile_commands_file,
+                    cache=ParseCache.from_config(verifier.config))
+                includes = {
+                    c_path: index.unit(c_path).includes or [c_path]
+                    for c_path in verifier.link_closure
+                }
+                self._plan = LinkPlan(compile_commands, cmake_libs, libs, includes)
+            return self._plan
+
+    def cached_object(self, c_path: str, commands: list[list[str]], includes: list[str]) -> str:
+        """Return the object of the unmodified `c_path`, compiling it on a miss.
+
+        `includes` lists every file the TU includes, so editing a header
+        invalidates the objects of the TUs including it.
+        """
+        input_hashes = [[path, utils.file_sha256(path)] for path in dict.fromkeys([c_path, *includes])]
+        payload = json.dumps([input_hashes, commands])
+        key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        obj_path = os.path.join(
+            self.cache_dir, key[:2], f"{os.path.basename(c_path)}.{key[:16]}.o")
+        if os.path.exists(obj_path):
+            self.hits += 1
+            return obj_path
+        self.misses += 1
+        os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+        # Compile next to the final path and rename, so concurrent
+        # verifications never link a half-written object
+        fd, tmp_path = tempfile.mkstemp(suffix=".o", dir=os.path.dirname(obj_path))
+        os.close(fd)
+        try:
+            compile_object(c_path, commands, c_path, tmp_path)
+            os.replace(tmp_path, obj_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return obj_path
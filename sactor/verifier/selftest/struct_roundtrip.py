@@ -66,7 +66,7 @@ class StructRoundTripTester:
             os.makedirs(os.path.join(td, "src"), exist_ok=True)
 
             cargo_toml = textwrap.dedent(
-                """
+                f"""
                 [package]
                 name = "sactor_selftest_rt"
                 version = "0.1.0"
@@ -76,11 +76,13 @@ class StructRoundTripTester:
                 crate-type = ["lib"]
 
                 [dependencies]
-                libc = "0.2"
+                libc = "{utils.LIBC_CRATE_VERSION}"
                 """
             )
             with open(os.path.join(td, "Cargo.toml"), "w") as f:
                 f.write(cargo_toml)
+            # Build against the vendored crates, if configured, like every generated project
+            utils.write_cargo_offline_config(td)
 
             attempts: List[Tuple[str, bool, str]] = []
 
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Optional
+
+from sactor import logging as sactor_logging
+from sactor import utils
+
+logger = sactor_logging.get_logger(__name__)
+
+_FORMAT_VERSION = 1
+
+
+class TestBaseline:
+    """Runtime of every test on the original C program, shared by a verifier and its copies.
+
+    The C program is built and timed once, on first use. The runtimes are
+    also stored under `path`, keyed by what the program and its tests are
+    built from, so later runs skip both the build and the timing. Tests the
+    C program does not pass get no runtime and keep the general timeout.
+    """
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self._store = utils.JsonEntryStore(path, _FORMAT_VERSION) if path else None
+        self._lock = threading.Lock()
+        self._runtimes: Optional[dict[str, float]] = None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "TestBaseline":
+        """Return a baseline stored under `[test_baseline] path`; it is kept in memory
+        only when that section is disabled or `verifier.test_timeout_multiple` is 0."""
+        baseline_config = config.get('test_baseline', {})
+        if (not config.get('verifier', {}).get('test_timeout_multiple', 0)
+                or not baseline_config.get('enabled', False)):
+            return cls(None)
+        path = baseline_config.get('path') or utils.get_cache_dir("test_baselines")
+        return cls(os.path.expanduser(path))
+
+    @property
+    def measured(self) -> bool:
+        return self._runtimes is not None
+
+    @staticmethod
+    def test_key(description: list) -> str:
+        payload = json.dumps([_FORMAT_VERSION, description], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def runtime(self, description: list) -> Optional[float]:
+        if self._runtimes is None:
+            return None
+        return self._runtimes.get(self.test_key(description))
+
+    def measure(
+        self,
+        program_id: str,
+        build: Callable[[], str],
+        run: Callable[[str], dict[str, float]],
+    ) -> None:
+        """Set the runtimes once.
+
+        `program_id` identifies the C program and the tests (their inputs,
+        not build paths); on a cache miss `build()` returns the path of the
+        C program and `run(program)` times each test on it.
+        """
+        with self._lock:
+            if self._runtimes is not None:
+                return
+            key = None
+            if self._store is not None:
+                key = self._store.key(program_id)
+                stored = self._store.load(key)
+                if stored is not None:
+                    self._runtimes = stored
+                    return
+            try:
+                runtimes = run(build())
+            except Exception as exc:
+                # Without a baseline every test keeps the general timeout
+                logger.warning("Could not measure the C baseline of the tests: %s", exc)
+                self._runtimes = {}
+                return
+            logger.info("Measured the C baseline of %d tests", len(runtimes))
+            self._runtimes = runtimes
+            if key is not None:
+                self._store.store(key, runtimes)
@@ -0,0 +1,169 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+from sactor import logging as sactor_logging
+from sactor import utils
+from sactor.test_runner import ExecutableTestRunner
+
+from .verifier_types import VerifyResult
+
+logger = sactor_logging.get_logger(__name__)
+
+_FORMAT_VERSION = 2
+
+# Outcome of one test: None when it passed, `(VerifyResult, message)` otherwise
+TestOutcome = Optional[tuple[VerifyResult, str]]
+
+
+def describe_test(test: list[str] | tuple[ExecutableTestRunner, int], target: str) -> list:
+    """Describe a test independently of where `target` lives, for use in cache keys."""
+    target = os.path.abspath(target)
+    if isinstance(test, tuple):
+        runner, sample = test
+        return [
+            "sample",
+            runner.test_samples_output[sample],
+            runner.feed_as_arguments,
+            "%t" if os.path.abspath(runner.target) == target else runner.target,
+        ]
+    return ["command", ["%t" if arg == target else arg for arg in test]]
+
+
+class TestResultCache:
+    """Outcomes of single test commands, keyed by what was actually run.
+
+    A key combines the content hash of the target executable, the hashes of
+    the shared libraries it picks up from the directories the verifier put
+    on `LD_LIBRARY_PATH`, the rest of the environment the verifier changed,
+    the test itself (with the target path abstracted, so the same binary
+    tested from another workspace hits), the content of the test command
+    file and of every file the test's argv names, and the run limits.
+    Editing the tests invalidates their outcomes. Rebuilding an identical
+    binary reuses its earlier outcomes instead of running the tests again.
+    Entries are kept in memory and, when `path` is set, as single JSON files
+    written atomically, so they survive across runs and may be shared by
+    concurrent ones. Timeouts depend on machine load, so they are only
+    remembered for the current run.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._store = utils.JsonEntryStore(path, _FORMAT_VERSION) if path else None
+        self._lock = threading.Lock()
+        self._memory: dict[str, TestOutcome] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["TestResultCache"]:
+        cache_config = config.get('test_result_cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        if not cache_config.get('persistent', True):
+            return cls()
+        path = cache_config.get('path') or utils.get_cache_dir("test_results")
+        return cls(os.path.expanduser(path))
+
+    @staticmethod
+    def _linked_libraries(env: dict[str, str]) -> dict[str, str]:
+        """Hash the shared libraries in the library dirs added on top of our own environment."""
+        inherited = set(os.environ.get("LD_LIBRARY_PATH", "").split(os.pathsep))
+        libraries = {}
+        for directory in env.get("LD_LIBRARY_PATH", "").split(os.pathsep):
+            if not directory or directory in inherited:
+                continue
+            for library in sorted(glob.glob(os.path.join(directory, "*.so*"))):
+                if os.path.isfile(library):
+                    libraries[os.path.basename(library)] = utils.file_sha256(library)
+        return libraries
+
+    def fingerprint(self, target: str, env: dict[str, str]) -> Optional[str]:
+        """Identify the program under test: `target`, its libraries and environment.
+
+        Returns None when `target` is not a readable file, so nothing is cached.
+        """
+        try:
+            target_hash = utils.file_sha256(target)
+            libraries = self._linked_libraries(env)
+        except OSError:
+            return None
+        changed_env = {
+            name: value for name, value in env.items()
+            if name != "LD_LIBRARY_PATH" and os.environ.get(name) != value
+        }
+        return json.dumps([target_hash, libraries, changed_env], sort_keys=True)
+
+    @staticmethod
+    def _test_inputs(
+        test: list[str] | tuple[ExecutableTestRunner, int],
+        target: str,
+        test_cmd_path: Optional[str],
+        cwd: Optional[str],
+    ) -> dict[str, str]:
+        """Hash the test command file and the existing files named in the test's argv (besides `target`)."""
+        paths = [test_cmd_path] if test_cmd_path else []
+        if not isinstance(test, tuple):
+            paths.extend(os.path.join(cwd or os.getcwd(), arg) for arg in test if arg)
+        target = os.path.abspath(target)
+        inputs = {}
+        for path in paths:
+            path = os.path.abspath(path)
+            if path == target or path in inputs or not os.path.isfile(path):
+                continue
+            try:
+                inputs[path] = utils.file_sha256(path)
+            except OSError:
+                continue
+        return inputs
+
+    def key(
+        self,
+        fingerprint: str,
+        target: str,
+        test: list[str] | tuple[ExecutableTestRunner, int],
+        test_cmd_path: Optional[str] = None,
+        cwd: Optional[str] = None,
+        **limits,
+    ) -> str:
+        """Return the cache key of running `test` (from `test_cmd_path`, in `cwd`) against the program `fingerprint` identifies."""
+        payload = json.dumps([
+            _FORMAT_VERSION,
+            fingerprint,
+            describe_test(test, target),
+            self._test_inputs(test, target, test_cmd_path, cwd),
+            cwd,
+            limits,
+        ], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> tuple[bool, TestOutcome]:
+        """Return `(found, outcome)` for `key`."""
+        with self._lock:
+            if key in self._memory:
+                self.hits += 1
+                return True, self._memory[key]
+        entry = self._store.load(key) if self._store is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            outcome = None if entry["result"] is None else (
+                VerifyResult[entry["result"]], entry["message"])
+            self._memory[key] = outcome
+            return True, outcome
+
+    def put(self, key: str, outcome: TestOutcome) -> None:
+        with self._lock:
+            self._memory[key] = outcome
+        if self._store is None or (outcome is not None and outcome[0] == VerifyResult.TEST_TIMEOUT):
+            return
+        entry = {
+            "result": None if outcome is None else outcome[0].name,
+            "message": None if outcome is None else outcome[1],
+        }
+        self._store.store(key, entry)
@@ -5,7 +5,7 @@ from sactor import rust_ast_parser
 from sactor.c_parser import FunctionInfo
 from sactor.combiner.combiner import RustCode, merge_uses
 from sactor.combiner.partial_combiner import CombineResult, PartialCombiner
-from .verifier import Verifier
+from .verifier import Verifier, leases_workspace
 from .verifier_types import VerifyResult
 
 from ..combiner.rust_code import RustCode
@@ -44,6 +44,7 @@ class UnidiomaticVerifier(Verifier):
         )
 
     @override
+    @leases_workspace
     def verify_function(
         self,
         function: FunctionInfo,
@@ -92,6 +93,7 @@ class UnidiomaticVerifier(Verifier):
         return (VerifyResult.SUCCESS, None)
 
     @override
+    @leases_workspace
     def try_compile_rust_code(
         self,
         rust_code,
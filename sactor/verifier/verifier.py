@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 
+import copy
+import functools
 import json, tempfile
 import os, shlex
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import contextmanager
+from typing import Iterator, Optional
 import glob
 import hashlib
+import threading
+import time
 
 from sactor import logging as sactor_logging
 from sactor import rust_ast_parser, utils
@@ -14,12 +19,36 @@ from sactor.utils import is_compile_command, process_commands_to_compile, read_f
 from sactor.c_parser import FunctionInfo, StructInfo, c_parser_utils, CParser
 from sactor.combiner.combiner import RustCode, merge_uses
 from sactor.combiner.partial_combiner import CombineResult, PartialCombiner
+from sactor.test_runner import ExecutableTestRunner, TestRunnerResult
+from sactor.test_runner.run_tests_command import parse_run_tests_command
 
+from .project_relink import ProjectRelink, compile_object
+from .test_baseline import TestBaseline
+from .test_result_cache import TestResultCache, describe_test
 from .verifier_types import VerifyResult
+from .workspace_pool import WorkspacePool
 
 logger = sactor_logging.get_logger(__name__)
 
+
+def leases_workspace(method):
+    """Run a verifier method on a copy bound to a workspace leased from its pool.
+
+    Calls made while a workspace is already leased (e.g. `verify_struct`
+    calling `try_compile_rust_code`) reuse it instead of leasing another.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.workspace() as verifier:
+            return method(verifier, *args, **kwargs)
+    return wrapper
+
+
 class Verifier(ABC):
+    # Whether try_compile_rust_code must leave the built program or library in
+    # build_attempt/target/debug; otherwise a metadata-only check suffices
+    compile_emits_artifact = False
+
     def __init__(
         self,
         test_cmd_path: str,
@@ -35,16 +64,10 @@ class Verifier(ABC):
         link_closure: list[str] | None = None,
     ):
         self.config = config
-        if build_path:
-            self.build_path = build_path
-        else:
+        if not build_path:
             tmpdir = utils.get_temp_dir()
-            self.build_path = os.path.join(tmpdir, 'build')
-        self.build_attempt_path = os.path.join(
-            self.build_path, "build_attempt")
-        self.embed_test_rust_dir = os.path.join(
-            self.build_path, "embed_test_rust")
-        self.embed_test_c_dir = os.path.join(self.build_path, "embed_test_c")
+            build_path = os.path.join(tmpdir, 'build')
+        self._set_build_path(build_path)
         self.test_cmd_path = test_cmd_path
         self.no_feedback = no_feedback
         self.extra_compile_command = extra_compile_command
@@ -55,6 +78,56 @@ class Verifier(ABC):
         self.compile_commands_file = compile_commands_file
         self.entry_tu_file = entry_tu_file
         self.link_closure = link_closure or []
+        # Set to abandon this verification; running tests are killed
+        self.cancel: Optional[threading.Event] = None
+        # Shared with every copy, so leased workspaces reuse one plan and object cache
+        self.project_relink = ProjectRelink(os.path.join(build_path, "object_cache"))
+        self.test_result_cache = TestResultCache.from_config(config)
+        self.test_baseline = TestBaseline.from_config(config)
+
+    def _set_build_path(self, build_path: str) -> None:
+        """Point every scratch directory of this verifier below `build_path`."""
+        self.build_path = build_path
+        self.workspace_pool: Optional[WorkspacePool] = WorkspacePool(
+            build_path, self.config.get('verifier', {}).get('workspace_pool_size', 1))
+        self.build_attempt_path = os.path.join(
+            self.build_path, "build_attempt")
+        self.embed_test_rust_dir = os.path.join(
+            self.build_path, "embed_test_rust")
+        self.embed_test_c_dir = os.path.join(self.build_path, "embed_test_c")
+
+    def with_build_path(self, build_path: str) -> "Verifier":
+        """Return a shallow copy of this verifier that builds under `build_path`.
+
+        The copy shares configuration and test commands but none of the
+        scratch directories, so it can verify concurrently with the original.
+        """
+        clone = copy.copy(self)
+        clone._set_build_path(build_path)
+        return clone
+
+    @contextmanager
+    def workspace(self, cancel: Optional[threading.Event] = None) -> Iterator["Verifier"]:
+        """Lease a workspace and yield a copy of this verifier that builds in it.
+
+        The copy holds no pool of its own, so everything it does stays in the
+        leased workspace. A verifier without a pool yields itself, or a plain
+        copy when `cancel` is given; the copy's tests stop once `cancel` is set.
+        """
+        if self.workspace_pool is None:
+            if cancel is None:
+                yield self
+                return
+            clone = copy.copy(self)
+            clone.cancel = cancel
+            yield clone
+            return
+        with self.workspace_pool.lease() as build_path:
+            leased = self.with_build_path(build_path)
+            leased.workspace_pool = None
+            if cancel is not None:
+                leased.cancel = cancel
+            yield leased
 
     def _discover_cmake_libs(self) -> list[str]:
         """Discover library flags from CMake link.txt for the entry target, if present.
@@ -238,6 +311,7 @@ class Verifier(ABC):
     ) -> tuple[VerifyResult, Optional[str]]:
         pass
 
+    @leases_workspace
     def verify_struct(
         self,
         struct: StructInfo,
@@ -260,21 +334,30 @@ class Verifier(ABC):
         return (VerifyResult.SUCCESS, None)
 
     def _try_compile_rust_code_impl(self, rust_code, executable=False) -> tuple[VerifyResult, Optional[str]]:
+        """Compile `rust_code` in the build attempt workspace.
+
+        Unless the verifier needs the built artifact (`compile_emits_artifact`)
+        or `verifier.compile_check_only` is disabled, only `cargo check` runs:
+        type and borrow checking without codegen, which is all a "does it
+        compile" question needs. Formatting is optional and off by default
+        since rustc reports syntax errors itself.
+        """
         utils.create_rust_proj(rust_code, "build_attempt",
                                self.build_attempt_path, is_lib=(not executable))
-
-        # Try format the Rust code
-        cmd = ["cargo", "fmt", "--manifest-path",
-               f"{self.build_attempt_path}/Cargo.toml"]
-        result = utils.run_command(cmd)
-        if result.returncode != 0:
-            # Rust code failed to format, unable to compile
-            logger.error("Rust code failed to format")
-            return (VerifyResult.COMPILE_ERROR, result.stderr)
-
-        # Try to compile the Rust code
-        cmd = ["cargo", "build", "--manifest-path",
-               f"{self.build_attempt_path}/Cargo.toml"]
+        manifest_path = f"{self.build_attempt_path}/Cargo.toml"
+        verifier_config = self.config.get('verifier', {})
+
+        if verifier_config.get('format_before_compile', False):
+            cmd = ["cargo", "fmt", "--manifest-path", manifest_path]
+            result = utils.run_command(cmd)
+            if result.returncode != 0:
+                # Rust code failed to format, unable to compile
+                logger.error("Rust code failed to format")
+                return (VerifyResult.COMPILE_ERROR, result.stderr)
+
+        check_only = (not self.compile_emits_artifact
+                      and verifier_config.get('compile_check_only', True))
+        cmd = ["cargo", "check" if check_only else "build", "--manifest-path", manifest_path]
         logger.debug("Compiling Rust project: %s", ' '.join(cmd))
         result = utils.run_command(cmd)
         if result.returncode != 0:
@@ -286,6 +369,7 @@ class Verifier(ABC):
             logger.info("Rust code compiled successfully")
             return (VerifyResult.SUCCESS, None)
 
+    @leases_workspace
     def try_compile_rust_code(self, rust_code, executable=False) -> tuple[VerifyResult, Optional[str]]:
         return self._try_compile_rust_code_impl(rust_code, executable)
 
@@ -317,7 +401,7 @@ class Verifier(ABC):
 
         return feedback
 
-    def _run_tests(self, target, env=None, test_number=None, valgrind=False) -> tuple[VerifyResult, Optional[str], Optional[int]]:
+    def _test_env(self, env=None) -> dict[str, str]:
         if env is None:
             env = os.environ.copy()
         # Ensure deterministic locale and avoid shell locale warnings leaking into test output.
@@ -325,6 +409,35 @@ class Verifier(ABC):
         # /bin/sh or bash to emit warnings that break output-based tests.
         env["LC_ALL"] = "C"
         env["LANG"] = "C"
+        return env
+
+    def _test_timeout(self, test, target) -> float:
+        """Deadline of one test: a multiple of its runtime on the C program, else the general timeout.
+
+        The runtime comes from the measured C baseline or, for `sactor
+        run-tests` samples, from the runtime recorded when they were generated.
+        """
+        timeout = self.config.get('general', {}).get('timeout_seconds', 60)
+        verifier_config = self.config.get('verifier', {})
+        runtime = self.test_baseline.runtime(describe_test(test, target))
+        if runtime is None and isinstance(test, tuple):
+            runner, sample = test
+            runtime = runner.test_samples_output[sample].get('runtime')
+        return utils.adaptive_timeout(
+            runtime,
+            verifier_config.get('test_timeout_multiple', 0),
+            verifier_config.get('min_test_timeout_seconds', 0),
+            timeout,
+        )
+
+    def _run_tests(self, target, env=None, test_number=None, valgrind=False, use_cache=True) -> tuple[VerifyResult, Optional[str], Optional[int]]:
+        """Run the test commands against `target`; return the first failure and its test number.
+
+        Outcomes are memoized per test in `test_result_cache`, so testing a
+        binary identical to an earlier one does not run anything again.
+        `use_cache=False` bypasses the cache for this call.
+        """
+        env = self._test_env(env)
         test_cmds = self._load_test_cmd(target)
         valgrind_cmd = [
             'valgrind',
@@ -335,50 +448,178 @@ class Verifier(ABC):
         ]
 
         general_config = self.config.get('general', {})
-        timeout = general_config.get('timeout_seconds', 60)
+        general_timeout = general_config.get('timeout_seconds', 60)
         byte_limit = general_config.get('command_output_byte_limit', 40000)
+        cwd = os.path.dirname(os.path.abspath(self.test_cmd_path))
+        selected = [
+            (i, test) for i, test in enumerate(self._expand_test_cmds(test_cmds, cwd))
+            if test_number is None or i == test_number
+        ]
 
-        for i, cmd in enumerate(test_cmds):
-            if test_number is not None and i != test_number:
-                continue
-            logger.debug("Running test command: %s", cmd)
-            if valgrind:
-                cmd = valgrind_cmd + cmd
-            try:
-                res = utils.run_command(
-                    cmd,
-                    limit_bytes=byte_limit,
-                    timeout=timeout,
-                    cwd=os.path.dirname(os.path.abspath(self.test_cmd_path)),
-                    env=env,
-                )
-            except TimeoutError as e:
-                return (VerifyResult.TEST_TIMEOUT, f'Failed to run test due to timeout: {e}', i)
-            stdout = res.stdout
-            stderr = res.stderr
-            if stdout:
-                logger.debug("Test stdout: %s", stdout)
-            if stderr:
-                logger.debug("Test stderr: %s", stderr)
-            if res.returncode != 0:
-
-                feedback = self._collect_feedback(stdout + stderr)
-                if feedback != "":
-                    return (VerifyResult.FEEDBACK, feedback, i)
-                if stderr == "":
-                    if stdout != "":
-                        return (VerifyResult.TEST_ERROR, stdout, i)
-                    else:
-                        return (VerifyResult.TEST_ERROR, "No output", i)
-                return (VerifyResult.TEST_ERROR, stderr, i)
+        cache = self.test_result_cache if use_cache else None
+        fingerprint = cache.fingerprint(target, env) if cache is not None else None
+
+        def run_one(position, cancel) -> Optional[tuple[VerifyResult, str]]:
+            test = selected[position][1]
+            # valgrind slows the program down far beyond the usual margin
+            timeout = general_timeout if valgrind else self._test_timeout(test, target)
+            run_kwargs = dict(limit_bytes=byte_limit, timeout=timeout, cwd=cwd, env=env, cancel=cancel)
+            wrapper = valgrind_cmd if valgrind else None
+            if fingerprint is None:
+                return self._run_test(test, wrapper, run_kwargs)
+            key = cache.key(fingerprint, target, test, test_cmd_path=self.test_cmd_path, cwd=cwd,
+                            valgrind=valgrind, timeout=timeout, byte_limit=byte_limit)
+            found, outcome = cache.get(key)
+            if found:
+                logger.debug("Reusing cached outcome of test %d", selected[position][0])
+                return outcome
+            outcome = self._run_test(test, wrapper, run_kwargs)
+            # A cancelled test was killed half-way; its outcome means nothing
+            if not cancel.is_set():
+                cache.put(key, outcome)
+            return outcome
+
+        failure = utils.run_fail_fast(
+            len(selected), run_one, self.config.get('verifier', {}).get('test_workers', 1),
+            cancel=self.cancel)
+        if failure is not None:
+            position, (verify_result, message) = failure
+            return (verify_result, message, selected[position][0])
 
         return (VerifyResult.SUCCESS, None, None)
 
-    def _run_tests_with_rust(self, target, test_number=None, valgrind=False) -> tuple[VerifyResult, Optional[str], Optional[int]]:
+    def _run_test(self, test, wrapper: Optional[list[str]], run_kwargs: dict) -> Optional[tuple[VerifyResult, str]]:
+        if isinstance(test, tuple):
+            return self._run_test_sample(*test, wrapper, run_kwargs)
+        cmd = test
+        logger.debug("Running test command: %s", cmd)
+        if wrapper:
+            cmd = wrapper + cmd
+        try:
+            res = utils.run_command(cmd, **run_kwargs)
+        except TimeoutError as e:
+            return (VerifyResult.TEST_TIMEOUT, f'Failed to run test due to timeout: {e}')
+        stdout = res.stdout
+        stderr = res.stderr
+        if stdout:
+            logger.debug("Test stdout: %s", stdout)
+        if stderr:
+            logger.debug("Test stderr: %s", stderr)
+        if res.returncode != 0:
+
+            feedback = self._collect_feedback(stdout + stderr)
+            if feedback != "":
+                return (VerifyResult.FEEDBACK, feedback)
+            if stderr == "":
+                if stdout != "":
+                    return (VerifyResult.TEST_ERROR, stdout)
+                else:
+                    return (VerifyResult.TEST_ERROR, "No output")
+            return (VerifyResult.TEST_ERROR, stderr)
+        return None
+
+    def _time_tests(self, program: str) -> dict[str, float]:
+        """Run every test once on `program` and return the runtimes of those it passes."""
+        env = self._test_env()
+        general_config = self.config.get('general', {})
+        cwd = os.path.dirname(os.path.abspath(self.test_cmd_path))
+        run_kwargs = dict(
+            limit_bytes=general_config.get('command_output_byte_limit', 40000),
+            timeout=general_config.get('timeout_seconds', 60),
+            cwd=cwd,
+            env=env,
+        )
+        runtimes = {}
+        for test in self._expand_test_cmds(self._load_test_cmd(program), cwd):
+            started = time.monotonic()
+            if self._run_test(test, None, run_kwargs) is None:
+                key = TestBaseline.test_key(describe_test(test, program))
+                runtimes[key] = time.monotonic() - started
+        return runtimes
+
+    def _measure_test_baseline(self, name: str, filename: str, executable_objects: list[str]) -> None:
+        """Time the tests on the original C program once, for the adaptive test deadlines."""
+        if self.test_baseline.measured or not self.config.get('verifier', {}).get('test_timeout_multiple', 0):
+            return
+        inputs = [filename, *self.link_closure, *executable_objects]
+        program_id = json.dumps([
+            [utils.file_sha256(path) if os.path.isfile(path) else path for path in inputs],
+            utils.file_sha256(self.test_cmd_path),
+            self.processed_compile_commands,
+            self.link_args,
+            self.extra_compile_command,
+        ])
+        output_path = os.path.join(self.embed_test_c_dir, f"{name}_c_baseline")
+
+        def build() -> str:
+            os.makedirs(self.embed_test_c_dir, exist_ok=True)
+            self._build_c_program(name, filename, None, output_path, executable_objects, ['-lm'])
+            return output_path
+
+        self.test_baseline.measure(program_id, build, self._time_tests)
+
+    def _expand_test_cmds(self, test_cmds, cwd) -> list[list[str] | tuple[ExecutableTestRunner, int]]:
+        """Resolve `sactor run-tests` commands into test samples run in this process.
+
+        A per-sample command becomes one `(runner, sample)` test and a
+        `--all` command one test per sample, so test numbers always refer to
+        single samples. Other commands are kept and run as subprocesses.
+        """
+        runners: dict[tuple[str, str, bool], ExecutableTestRunner] = {}
+        tests: list[list[str] | tuple[ExecutableTestRunner, int]] = []
+        for cmd in test_cmds:
+            command = parse_run_tests_command(cmd, cwd)
+            if command is None:
+                tests.append(cmd)
+                continue
+            key = (command.test_samples_path, command.target, command.feed_as_arguments)
+            if key not in runners:
+                try:
+                    runners[key] = ExecutableTestRunner(
+                        command.test_samples_path,
+                        command.target,
+                        feed_as_arguments=command.feed_as_arguments,
+                    )
+                except (OSError, ValueError):
+                    # Let the subprocess report the broken task
+                    tests.append(cmd)
+                    continue
+            runner = runners[key]
+            if command.test_sample_number is None:
+                tests.extend((runner, i) for i in range(len(runner.test_samples_output)))
+            else:
+                tests.append((runner, command.test_sample_number))
+        return tests
+
+    def _run_test_sample(
+        self,
+        runner: ExecutableTestRunner,
+        sample: int,
+        wrapper: Optional[list[str]],
+        run_kwargs: dict,
+    ) -> Optional[tuple[VerifyResult, str]]:
+        logger.debug("Running test sample %d of %s", sample, runner.target)
+        try:
+            res = runner.execute(sample, wrapper, **run_kwargs)
+        except TimeoutError as e:
+            return (VerifyResult.TEST_TIMEOUT, f'Failed to run test due to timeout: {e}')
+        except ValueError as e:
+            return (VerifyResult.TEST_ERROR, str(e))
+        # Like `sactor run-tests`, only the output decides the outcome
+        compare_result, diff = runner.check(sample, res)
+        if compare_result == TestRunnerResult.PASSED:
+            return None
+        feedback = self._collect_feedback(res.stdout + res.stderr)
+        if feedback != "":
+            return (VerifyResult.FEEDBACK, feedback)
+        return (VerifyResult.TEST_ERROR,
+                f'❌ Test {sample} failed!\nDiff (-actual +expected):\n{diff or ""}\n')
+
+    def _run_tests_with_rust(self, target, test_number=None, valgrind=False, use_cache=True) -> tuple[VerifyResult, Optional[str], Optional[int]]:
         # get absolute path of the target
         target = os.path.abspath(target)
         env = utils.patched_env("LD_LIBRARY_PATH", f"{self.embed_test_rust_dir}/target/debug")
-        return self._run_tests(target, env, test_number, valgrind)
+        return self._run_tests(target, env, test_number, valgrind, use_cache)
 
     def _mutate_c_code(self, c_function: FunctionInfo, filename, prefix=False) -> str:
         # remove the c code of the function, but keep the function signature
@@ -500,6 +741,142 @@ class Verifier(ABC):
 
         return "\n".join(lines)
 
+    def _build_c_program(
+        self,
+        name: str,
+        filename: str,
+        source_path: Optional[str],
+        output_path: str,
+        executable_objects: list[str],
+        link_flags: list[str],
+    ) -> None:
+        """Build the program under test into `output_path`.
+
+        `source_path` replaces the TU `filename` (the mutated C code); with
+        None the original program is built.
+        """
+        compiler = utils.get_compiler()
+        extra_compile_args = shlex.split(self.extra_compile_command) if self.extra_compile_command else []
+        # Branch A: project-level relink when a compile database and link closure are available
+        if self.compile_commands_file and self.link_closure:
+            objs_dir = os.path.join(self.embed_test_c_dir, 'objs')
+            os.makedirs(objs_dir, exist_ok=True)
+
+            def obj_path_for(c_path: str) -> str:
+                h = hashlib.sha1(os.path.realpath(c_path).encode('utf-8')).hexdigest()[:16]
+                base = os.path.basename(c_path)
+                return os.path.join(objs_dir, f"{base}.{h}.o")
+
+            link_plan = self.project_relink.plan(self)
+            object_paths: list[str] = []
+            for c_path, commands in link_plan.compile_commands.items():
+                try:
+                    mutated = os.path.samefile(c_path, filename)
+                except FileNotFoundError:
+                    mutated = False
+                if not mutated or source_path is None:
+                    # Unchanged TU: reuse its object across attempts
+                    object_paths.append(
+                        self.project_relink.cached_object(
+                            c_path, commands, link_plan.includes[c_path]))
+                    continue
+                # Use mutated source for the TU that contains the target function
+                obj_out = obj_path_for(c_path)
+                if os.path.exists(obj_out):
+                    os.remove(obj_out)
+                compile_object(c_path, commands, source_path, obj_out)
+                object_paths.append(obj_out)
+
+            cmake_libs = link_plan.cmake_libs
+            merged_libs = link_plan.libs
+
+            link_cmd = [
+                compiler,
+                *object_paths,
+                *executable_objects,
+                '-o', output_path,
+                *merged_libs,
+                *link_flags,
+                *extra_compile_args,
+            ]
+            logger.debug("Project-level objects: %s", [os.path.relpath(p) for p in object_paths])
+            logger.debug("Project-level cmake libs: %s", cmake_libs)
+            logger.debug("Linking project-level harness: %s", link_cmd)
+            res = utils.run_command(link_cmd, capture_output=True)
+            if res.returncode != 0:
+                # Diagnostics artifact
+                try:
+                    attempt = {
+                        'objects': [os.path.relpath(p) for p in object_paths],
+                        'cmake_libs': cmake_libs,
+                        'link_args': self.link_args,
+                        'final_cmd': link_cmd,
+                        'stderr': (res.stderr or '')[-4000:],
+                    }
+                    with open(os.path.join(self.embed_test_c_dir, 'link_attempt.json'), 'w', encoding='utf-8') as fh:
+                        json.dump(attempt, fh, indent=2)
+                except Exception:
+                    logger.debug("Failed to write link_attempt.json", exc_info=True)
+                raise RuntimeError(
+                    f"Error: Failed to link project-level harness for function {name}")
+
+        # Branch B: legacy single-file harness
+        else:
+            object_path = output_path + ".o"
+            source_path = source_path or filename
+
+            if os.path.exists(object_path):
+                os.remove(object_path)
+
+            if self.processed_compile_commands:
+                commands = process_commands_to_compile(
+                    self.processed_compile_commands,
+                    object_path,
+                    source_path,
+                )
+                for command in commands:
+                    to_check = False
+                    if is_compile_command(command):
+                        to_check = True
+                    logger.debug("Running compile command: %s", command)
+                    res = utils.run_command(command, capture_output=False)
+                    if to_check and res.returncode != 0:
+                        raise RuntimeError(
+                            f"Error: Failed to compile C code for function {name}")
+
+                link_cmd = [
+                    compiler,
+                    object_path,
+                    *executable_objects,
+                    '-o', output_path,
+                    *self.link_args,
+                    *link_flags,
+                    *extra_compile_args,
+                ]
+                logger.debug("Linking C harness: %s", link_cmd)
+                res = utils.run_command(link_cmd, capture_output=False)
+                if res.returncode != 0:
+                    raise RuntimeError(
+                        f"Error: Failed to link C code for function {name}")
+
+            else:
+                c_compile_cmd = [
+                    compiler,
+                    '-o', output_path,
+                    source_path,
+                    *executable_objects,
+                    *self.link_args,
+                    *link_flags,
+                    *extra_compile_args,
+                ]
+
+                # compile C code
+                logger.debug("Compiling C harness: %s", c_compile_cmd)
+                res = utils.run_command(c_compile_cmd, capture_output=False)
+                if res.returncode != 0:
+                    raise RuntimeError(
+                        f"Error: Failed to compile C code for function {name}")
+
     def _embed_test_rust(
         self,
         c_function: FunctionInfo,
@@ -577,10 +954,8 @@ extern "C" {{
         with open(f"{self.embed_test_c_dir}/{name}.c", "w") as f:
             f.write(c_code_removed)
 
-        compiler = utils.get_compiler()
         source_path = os.path.join(self.embed_test_c_dir, f'{name}.c')
 
-        extra_compile_args = shlex.split(self.extra_compile_command) if self.extra_compile_command else []
         executable_variants = self._iter_executable_variants()
         if not executable_variants:
             executable_variants = [[]]
@@ -592,145 +967,15 @@ extern "C" {{
             f'-l{name}',
         ]
 
+        self._measure_test_baseline(name, filename, executable_variants[0])
+
         for index, executable_objects in enumerate(executable_variants):
             variant_suffix = f"_{index}" if multi_variant else ""
             output_path = os.path.join(self.embed_test_c_dir, f"{name}{variant_suffix}")
 
-            # Branch A: project-level relink when a compile database and link closure are available
-            if self.compile_commands_file and self.link_closure:
-                objs_dir = os.path.join(self.embed_test_c_dir, 'objs')
-                os.makedirs(objs_dir, exist_ok=True)
-
-                def obj_path_for(c_path: str) -> str:
-                    h = hashlib.sha1(os.path.realpath(c_path).encode('utf-8')).hexdigest()[:16]
-                    base = os.path.basename(c_path)
-                    return os.path.join(objs_dir, f"{base}.{h}.o")
-
-                object_paths: list[str] = []
-                for c_path in self.link_closure:
-                    # Use mutated source for the TU that contains the target function
-                    use_path = source_path
-                    try:
-                        if not os.path.samefile(c_path, filename):
-                            use_path = c_path
-                    except FileNotFoundError:
-                        use_path = c_path
-                    obj_out = obj_path_for(c_path)
-                    if os.path.exists(obj_out):
-                        os.remove(obj_out)
-
-                    commands = utils.load_compile_commands_from_file(
-                        self.compile_commands_file,
-                        c_path,
-                    )
-                    commands = process_commands_to_compile(
-                        commands,
-                        obj_out,
-                        use_path,
-                    )
-                    for command in commands:
-                        to_check = False
-                        if is_compile_command(command):
-                            to_check = True
-                        logger.debug("Running compile command: %s", command)
-                        res = utils.run_command(command, capture_output=False)
-                        if to_check and res.returncode != 0:
-                            raise RuntimeError(
-                                f"Error: Failed to compile object for {c_path}")
-                    object_paths.append(obj_out)
-
-                cmake_libs = self._discover_cmake_libs()
-                # Merge cmake libs + user link_args (preserve cmake order; append user-specified if not present)
-                merged_libs = list(cmake_libs)
-                for arg in self.link_args:
-                    if arg not in merged_libs:
-                        merged_libs.append(arg)
+            self._build_c_program(
+                name, filename, source_path, output_path, executable_objects, link_flags)
 
-                link_cmd = [
-                    compiler,
-                    *object_paths,
-                    *executable_objects,
-                    '-o', output_path,
-                    *merged_libs,
-                    *link_flags,
-                    *extra_compile_args,
-                ]
-                logger.debug("Project-level objects: %s", [os.path.relpath(p) for p in object_paths])
-                logger.debug("Project-level cmake libs: %s", cmake_libs)
-                logger.debug("Linking project-level harness: %s", link_cmd)
-                res = utils.run_command(link_cmd, capture_output=True)
-                if res.returncode != 0:
-                    # Diagnostics artifact
-                    try:
-                        attempt = {
-                            'objects': [os.path.relpath(p) for p in object_paths],
-                            'cmake_libs': cmake_libs,
-                            'link_args': self.link_args,
-                            'final_cmd': link_cmd,
-                            'stderr': (res.stderr or '')[-4000:],
-                        }
-                        with open(os.path.join(self.embed_test_c_dir, 'link_attempt.json'), 'w', encoding='utf-8') as fh:
-                            json.dump(attempt, fh, indent=2)
-                    except Exception:
-                        logger.debug("Failed to write link_attempt.json", exc_info=True)
-                    raise RuntimeError(
-                        f"Error: Failed to link project-level harness for function {name}")
-
-            # Branch B: legacy single-file harness
-            else:
-                object_path = output_path + ".o"
-
-                if os.path.exists(object_path):
-                    os.remove(object_path)
-
-                if self.processed_compile_commands:
-                    commands = process_commands_to_compile(
-                        self.processed_compile_commands,
-                        object_path,
-                        source_path,
-                    )
-                    for command in commands:
-                        to_check = False
-                        if is_compile_command(command):
-                            to_check = True
-                        logger.debug("Running compile command: %s", command)
-                        res = utils.run_command(command, capture_output=False)
-                        if to_check and res.returncode != 0:
-                            raise RuntimeError(
-                                f"Error: Failed to compile C code for function {name}")
-
-                    link_cmd = [
-                        compiler,
-                        object_path,
-                        *executable_objects,
-                        '-o', output_path,
-                        *self.link_args,
-                        *link_flags,
-                        *extra_compile_args,
-                    ]
-                    logger.debug("Linking C harness: %s", link_cmd)
-                    res = utils.run_command(link_cmd, capture_output=False)
-                    if res.returncode != 0:
-                        raise RuntimeError(
-                            f"Error: Failed to link C code for function {name}")
-
-                else:
-                    c_compile_cmd = [
-                        compiler,
-                        '-o', output_path,
-                        source_path,
-                        *executable_objects,
-                        *self.link_args,
-                        *link_flags,
-                        *extra_compile_args,
-                    ]
-
-                    # compile C code
-                    logger.debug("Compiling C harness: %s", c_compile_cmd)
-                    res = utils.run_command(c_compile_cmd, capture_output=False)
-                    if res.returncode != 0:
-                        raise RuntimeError(
-                            f"Error: Failed to compile C code for function {name}")
             # run tests
             result = self._run_tests_with_rust(output_path)
             if result[0] != VerifyResult.SUCCESS:
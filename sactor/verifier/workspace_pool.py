@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from sactor import logging as sactor_logging
+
+logger = sactor_logging.get_logger(__name__)
+
+
+class WorkspacePool:
+    """A bounded pool of isolated verification workspaces below one build path.
+
+    Workspace 0 is `build_path` itself, so a verifier that never verifies
+    concurrently keeps building exactly where it always did. Further
+    workspaces (`build_path/workspaces/ws_<n>`) are created on demand, up to
+    `size`, and are never cleaned up between leases so their cargo target
+    directories stay warm. When every workspace is leased, `lease` blocks
+    until one is returned.
+
+    The pool also records contention: how long leases waited, how many
+    workspaces were in use at once, and how busy the workspaces were.
+    """
+
+    def __init__(self, build_path: str, size: int = 1):
+        self.build_path = build_path
+        self.size = max(1, int(size))
+        self._cond = threading.Condition()
+        self._idle: list[str] = []
+        self._created = 0
+        self._in_use = 0
+        self._created_at = time.monotonic()
+        self.leases = 0
+        self.contended_leases = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.peak_in_use = 0
+        self.busy_time = 0.0
+
+    def _workspace_path(self, index: int) -> str:
+        if index == 0:
+            return self.build_path
+        return os.path.join(self.build_path, "workspaces", f"ws_{index}")
+
+    @contextmanager
+    def lease(self) -> Iterator[str]:
+        """Check out a workspace directory and return it to the pool on exit."""
+        started = time.monotonic()
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                self._cond.wait()
+            if self._idle:
+                # Lowest index first, so the warmest workspaces are reused
+                self._idle.sort(key=self._sort_key)
+                path = self._idle.pop(0)
+            else:
+                path = self._workspace_path(self._created)
+                self._created += 1
+            waited = time.monotonic() - started
+            self.leases += 1
+            self._in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self._in_use)
+            self.total_wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+            if waited > 0.01:
+                self.contended_leases += 1
+                logger.debug("Waited %.2fs for a verifier workspace (%d in use)",
+                             waited, self._in_use)
+        leased_at = time.monotonic()
+        try:
+            yield path
+        finally:
+            with self._cond:
+                self.busy_time += time.monotonic() - leased_at
+                self._in_use -= 1
+                self._idle.append(path)
+                self._cond.notify()
+
+    def _sort_key(self, path: str) -> int:
+        if path == self.build_path:
+            return 0
+        return int(path.rsplit("_", 1)[-1])
+
+    def statistics(self) -> dict:
+        """Return the contention metrics collected so far."""
+        with self._cond:
+            elapsed = time.monotonic() - self._created_at
+            capacity = self.size * elapsed
+            return {
+                "size": self.size,
+                "workspaces_created": self._created,
+                "in_use": self._in_use,
+                "peak_in_use": self.peak_in_use,
+                "leases": self.leases,
+                "contended_leases": self.contended_leases,
+                "total_wait_time": self.total_wait_time,
+                "max_wait_time": self.max_wait_time,
+                "mean_wait_time": self.total_wait_time / self.leases if self.leases else 0.0,
+                "busy_time": self.busy_time,
+                "utilisation": self.busy_time / capacity if capacity > 0 else 0.0,
+            }
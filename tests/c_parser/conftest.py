@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from sactor.c_parser import project_index as project_index_module
+
+
+@pytest.fixture
+def write_project(tmp_path):
+    """Write C sources under tmp_path/src with a compile_commands.json listing them."""
+
+    def write(sources, headers=None):
+        src = tmp_path / "src"
+        src.mkdir()
+        for name, code in (headers or {}).items():
+            (src / name).write_text(code, encoding="utf-8")
+        entries = []
+        for name, code in sources.items():
+            path = src / name
+            path.write_text(code, encoding="utf-8")
+            entries.append({
+                "directory": str(src),
+                "file": str(path),
+                "command": f"clang -std=c99 -c {path}",
+            })
+        cc = tmp_path / "compile_commands.json"
+        cc.write_text(json.dumps(entries), encoding="utf-8")
+        return cc, src
+
+    return write
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    """Record the path of every translation unit ProjectIndex hands to CParser."""
+    parsed = []
+    real_parser = project_index_module.CParser
+
+    def counting_parser(path, *args, **kwargs):
+        parsed.append(path)
+        return real_parser(path, *args, **kwargs)
+
+    monkeypatch.setattr(project_index_module, "CParser", counting_parser)
+    return parsed
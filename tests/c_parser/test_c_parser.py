@@ -271,3 +271,51 @@ int main() {
         c_parser = CParser(file_path)
         main = c_parser.get_function_info('main')
         assert set(main.stdio_list) == {'stdin', 'stderr'}
+
+
+def test_include_prefix_trie():
+    from sactor.c_parser.c_parser import _IncludePrefixTrie
+
+    trie = _IncludePrefixTrie.build(("/usr/include", "/usr/lib/gcc/x86_64/include"))
+    assert trie.matches("/usr/include/stdio.h")
+    assert trie.matches("/usr/lib/gcc/x86_64/include/stddef.h")
+    # Plain string prefixes, like `str.startswith`
+    assert trie.matches("/usr/include2/foo.h")
+    assert not trie.matches("/usr/lib/gcc/x86_64/other.h")
+    assert not trie.matches("/home/user/project/foo.h")
+    assert not _IncludePrefixTrie.build(()).matches("/usr/include/stdio.h")
+
+
+def test_system_headers_classified_once_per_file(tmp_path, monkeypatch):
+    from clang import cindex
+
+    code = '''
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+struct Buffer { char *data; size_t len; };
+int fill(struct Buffer *buf, const char *text) {
+    buf->len = strlen(text);
+    buf->data = malloc(buf->len + 1);
+    memcpy(buf->data, text, buf->len + 1);
+    printf("%s\\n", buf->data);
+    return buf->len > 0 ? EXIT_SUCCESS : EXIT_FAILURE;
+}'''
+    file_path = tmp_path / "buffer.c"
+    file_path.write_text(code)
+
+    lib = cindex.conf.lib
+    real_is_in_system_header = lib.clang_Location_isInSystemHeader
+    checked = []
+
+    def counting_is_in_system_header(location):
+        checked.append(location.file.name)
+        return real_is_in_system_header(location)
+
+    monkeypatch.setattr(lib, "clang_Location_isInSystemHeader", counting_is_in_system_header)
+    c_parser = CParser(str(file_path))
+
+    assert len(checked) == len(set(checked))
+    fill = c_parser.get_function_info('fill')
+    assert [struct.name for struct in fill.struct_dependencies] == ['Buffer']
+    assert fill.function_dependencies == []
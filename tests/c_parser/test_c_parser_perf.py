@@ -0,0 +1,106 @@
+import time
+
+from clang import cindex
+
+from sactor.c_parser import CParser
+
+
+def _write_large_tu(tmp_path, functions=300):
+    lines = [
+        "enum Color { RED, GREEN, BLUE };",
+        "struct Point { int x; int y; enum Color color; };",
+        "typedef struct Point Point;",
+        "static int counter = 0;",
+    ]
+    for i in range(functions):
+        callee = f"f{i - 1}(p, n - 1)" if i else "n"
+        lines.append(
+            f"int f{i}(Point *p, int n) {{\n"
+            f"    int total = 0;\n"
+            f"    for (int k = 0; k < n; k++) {{\n"
+            f"        if (p->color == GREEN) {{ total += p->x * k; }}\n"
+            f"        else {{ total -= p->y + counter; }}\n"
+            f"    }}\n"
+            f"    counter += {callee};\n"
+            f"    return total + RED;\n"
+            f"}}"
+        )
+    path = tmp_path / "large.c"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_extraction_sweeps_each_cursor_once(tmp_path, monkeypatch, record_property):
+    path = _write_large_tu(tmp_path)
+    tu = cindex.Index.create().parse(path, args=["-x", "c", "-std=c99"])
+    cursors = sum(1 for _ in tu.cursor.walk_preorder())
+
+    expansions = []
+    real_get_children = cindex.Cursor.get_children
+
+    def counting_get_children(self):
+        expansions.append(self.kind)
+        return real_get_children(self)
+
+    monkeypatch.setattr(cindex.Cursor, "get_children", counting_get_children)
+    started = time.perf_counter()
+    parser = CParser(path, omit_error=True)
+    elapsed = time.perf_counter() - started
+    record_property("cursors", cursors)
+    record_property("child_expansions", len(expansions))
+    record_property("parse_seconds", round(elapsed, 3))
+
+    # One sweep over the TU plus one over each function body / struct, instead of one per collector
+    assert len(expansions) < 3 * cursors
+    f1 = parser.get_function_info("f1")
+    assert [ref.name for ref in f1.function_dependencies] == ["f0", "f0"]
+    assert [struct.name for struct in f1.struct_dependencies] == ["Point"]
+    assert [var.name for var in f1.global_vars_dependencies] == ["counter"]
+    assert {value.name for value in f1.enum_values_dependencies} == {"GREEN", "RED"}
+
+
+def test_deeply_nested_code_does_not_recurse(tmp_path):
+    # A left-deep chain of 3000 additions, well past Python's recursion limit
+    terms = " + ".join(["g"] * 3000)
+    path = tmp_path / "deep.c"
+    path.write_text(f"int g = 1;\nint deep(void) {{ return {terms}; }}\n", encoding="utf-8")
+
+    parser = CParser(str(path), omit_error=True)
+    deep = parser.get_function_info("deep")
+    assert [var.name for var in deep.global_vars_dependencies] == ["g"]
+    assert [ref.name for ref in deep.global_dependency_refs] == ["g"] * 3000
+
+
+def test_macro_lookup_on_macro_heavy_sample(tmp_path, monkeypatch, record_property):
+    functions = 300
+    lines = ["#define SHARED(x) ((x) + 1)"]
+    lines += [f"#define M{i}(x) (SHARED(x) * {i})" for i in range(functions)]
+    for i in range(functions):
+        uses = " + ".join(f"M{i}(n + {k})" for k in range(8))
+        lines.append(f"int f{i}(int n) {{ return {uses}; }}")
+    path = tmp_path / "macros.c"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    parser = CParser(str(path), omit_error=True)
+
+    tu_expansions = []
+    real_get_children = cindex.Cursor.get_children
+
+    def counting_get_children(self):
+        if self.kind == cindex.CursorKind.TRANSLATION_UNIT:
+            tu_expansions.append(self)
+        return real_get_children(self)
+
+    monkeypatch.setattr(cindex.Cursor, "get_children", counting_get_children)
+    started = time.perf_counter()
+    macros = {f"f{i}": parser.get_macro_definitions_for_function(f"f{i}") for i in range(functions)}
+    elapsed = time.perf_counter() - started
+    record_property("macro_expansions", functions * 8)
+    record_property("lookup_seconds", round(elapsed, 3))
+
+    # The raw TU is indexed once, not scanned per function
+    assert len(tu_expansions) == 1
+    for i in (0, 150, functions - 1):
+        text = "\n".join(macros[f"f{i}"])
+        assert f"#define M{i}(x)" in text
+        assert "#define SHARED(x)" in text
+        assert f"#define M{i + 1}(x)" not in text
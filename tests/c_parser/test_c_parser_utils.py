@@ -11,7 +11,7 @@ from clang import cindex
 from sactor.c_parser import c_parser_utils
 from sactor.c_parser.c_parser import CParser, _discover_intrinsic_aliases
 from sactor.utils import read_file
-from sactor import utils as sactor_utils
+from sactor import toolchain, utils as sactor_utils
 from tests import utils as test_utils
 
 
@@ -80,7 +80,9 @@ def test_expand_macro():
         shutil.rmtree(tmpdir)
 
 
-def test_intrinsic_aliases_cached(monkeypatch):
+def test_intrinsic_aliases_cached(monkeypatch, tmp_path):
+    monkeypatch.setenv("SACTOR_CACHE_DIR", str(tmp_path))
+    toolchain.clear_cache()
     _discover_intrinsic_aliases.cache_clear()
 
     calls = {
@@ -90,7 +92,10 @@ def test_intrinsic_aliases_cached(monkeypatch):
     def fake_run_command(cmd, check=True):
         calls["count"] += 1
         assert cmd[:4] == ["clang", "-E", "-P", "-v"]
-        return SimpleNamespace(stdout="#define __SIZE_TYPE__ long unsigned int\n")
+        return SimpleNamespace(
+            stdout="#define __SIZE_TYPE__ long unsigned int\n",
+            stderr="#include <...> search starts here:\n /usr/include\nEnd of search list.\n",
+        )
 
     monkeypatch.setattr("sactor.utils.run_command", fake_run_command)
 
@@ -102,6 +107,14 @@ def test_intrinsic_aliases_cached(monkeypatch):
     assert aliases_again == aliases
     assert calls["count"] == 1
 
+    # A new process reuses the probe stored on disk
+    toolchain.clear_cache()
+    _discover_intrinsic_aliases.cache_clear()
+    assert _discover_intrinsic_aliases() == aliases
+    assert toolchain.compiler_probe("clang").include_paths == ("/usr/include",)
+    assert calls["count"] == 1
+
+    toolchain.clear_cache()
     _discover_intrinsic_aliases.cache_clear()
 
 
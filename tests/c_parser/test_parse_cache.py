@@ -0,0 +1,48 @@
+from sactor.c_parser.parse_cache import ParseCache
+from sactor.c_parser.project_index import ProjectIndex
+
+
+_SOURCES = {
+    "area.c": '#include "shape.h"\n'
+              "int area(struct Shape *s){return s->w * s->h;}\n",
+    "main.c": "int area(void *s);\nint main(void){return area(0);}\n",
+}
+_HEADERS = {"shape.h": "struct Shape { int w; int h; };\n"}
+
+
+def test_parse_cache_reuses_unchanged_units(tmp_path, write_project, count_parses):
+    cc, _src = write_project(_SOURCES, _HEADERS)
+    parsed = count_parses
+    cache_dir = str(tmp_path / "cache")
+
+    first = ProjectIndex.build(str(cc), cache=ParseCache(cache_dir))
+    assert len(parsed) == 2
+
+    cache = ParseCache(cache_dir)
+    second = ProjectIndex.build(str(cc), cache=cache)
+    assert len(parsed) == 2
+    assert cache.hits == 2
+    assert {tu: vars(unit) for tu, unit in second.units.items()} == {
+        tu: vars(unit) for tu, unit in first.units.items()}
+
+
+def test_parse_cache_invalidates_units_including_changed_header(tmp_path, write_project, count_parses):
+    cc, src = write_project(_SOURCES, _HEADERS)
+    parsed = count_parses
+    cache_dir = str(tmp_path / "cache")
+    ProjectIndex.build(str(cc), cache=ParseCache(cache_dir))
+    parsed.clear()
+
+    (src / "shape.h").write_text("struct Shape { long w; long h; };\n", encoding="utf-8")
+    cache = ParseCache(cache_dir)
+    ProjectIndex.build(str(cc), cache=cache)
+
+    assert [p.rsplit("/", 1)[-1] for p in parsed] == ["area.c"]
+    assert cache.hits == 1
+
+
+def test_parse_cache_disabled_by_config(tmp_path):
+    assert ParseCache.from_config({"parse_cache": {"enabled": False}}) is None
+    cache = ParseCache.from_config(
+        {"parse_cache": {"enabled": True, "path": str(tmp_path / "c")}})
+    assert cache is not None and cache.path == str(tmp_path / "c")
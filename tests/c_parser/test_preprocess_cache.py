@@ -0,0 +1,78 @@
+import os
+
+from sactor.c_parser import c_parser_utils
+from sactor.c_parser.preprocess_cache import PreprocessCache
+from sactor.utils import read_file
+
+
+def _write_source(tmp_path):
+    (tmp_path / "shape.h").write_text(
+        "typedef struct { int w; int h; } Shape;\n", encoding="utf-8")
+    source = tmp_path / "area.c"
+    source.write_text(
+        '#include "shape.h"\n'
+        "#define AREA(s) ((s)->w * (s)->h)\n"
+        "static inline int area(Shape *s) { return AREA(s); }\n"
+        "int main(void) { Shape s = {2, 3}; return area(&s) - 6; }\n",
+        encoding="utf-8",
+    )
+    return str(source)
+
+
+def _count_expansions(monkeypatch):
+    expanded = []
+    real_expand = c_parser_utils._expand_all_macros
+
+    def counting_expand(*args, **kwargs):
+        expanded.append(args[0])
+        return real_expand(*args, **kwargs)
+
+    monkeypatch.setattr(c_parser_utils, "_expand_all_macros", counting_expand)
+    return expanded
+
+
+def test_preprocess_cache_reuses_unchanged_source(tmp_path, monkeypatch):
+    source = _write_source(tmp_path)
+    expanded = _count_expansions(monkeypatch)
+    cache_dir = str(tmp_path / "cache")
+
+    first = read_file(c_parser_utils.preprocess_source_code(
+        source, [], cache=PreprocessCache(cache_dir)))
+    assert len(expanded) == 1
+    assert "AREA" not in first
+    assert "inline" not in first
+    assert "struct Shape" in first
+
+    cache = PreprocessCache(cache_dir)
+    output_file = c_parser_utils.preprocess_source_code(source, [], cache=cache)
+    assert len(expanded) == 1
+    assert cache.hits == 1
+    assert os.path.basename(output_file) == "unfolded_typedefs.c"
+    assert read_file(output_file) == first
+
+
+def test_preprocess_cache_invalidates_on_header_change(tmp_path, monkeypatch):
+    source = _write_source(tmp_path)
+    expanded = _count_expansions(monkeypatch)
+    cache_dir = str(tmp_path / "cache")
+
+    c_parser_utils.preprocess_source_code(source, [], cache=PreprocessCache(cache_dir))
+    (tmp_path / "shape.h").write_text(
+        "typedef struct { int w; int h; int d; } Shape;\n", encoding="utf-8")
+
+    cache = PreprocessCache(cache_dir)
+    output = read_file(c_parser_utils.preprocess_source_code(source, [], cache=cache))
+    assert len(expanded) == 2
+    assert cache.misses == 1
+    assert "int d;" in output
+
+
+def test_preprocess_pipeline_matches_separate_stages(tmp_path):
+    source = _write_source(tmp_path)
+
+    fused = read_file(c_parser_utils.preprocess_source_code(source, []))
+
+    expanded_file = c_parser_utils.expand_all_macros(source)
+    unfolded_file = c_parser_utils.unfold_typedefs(expanded_file)
+    staged = read_file(c_parser_utils.remove_inline_specifiers(unfolded_file))
+    assert fused == staged
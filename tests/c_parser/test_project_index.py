@@ -0,0 +1,108 @@
+import os
+import pickle
+
+import pytest
+
+from sactor.c_parser import project_index as project_index_module
+from sactor.c_parser.project_index import (
+    ProjectIndex,
+    build_link_closure,
+    build_nonfunc_def_maps,
+    build_project_usr_owner_maps,
+    order_translation_units_by_dependencies,
+)
+from sactor.combiner import ProjectCombiner
+
+
+_SOURCES = {
+    "util.c": "struct Pair { int a; int b; };\n"
+              "int util(void){struct Pair p; p.a = 42; return p.a;}\n",
+    "helper.c": "int util(void);\nint helper(void){return util();}\n",
+    "main.c": "int helper(void);\nint main(void){return helper();}\n",
+}
+
+
+@pytest.fixture
+def project(write_project):
+    cc, src = write_project(_SOURCES)
+    return cc, {name: str((src / name).resolve()) for name in _SOURCES}
+
+
+def test_project_passes_share_one_parse_per_tu(tmp_path, project, count_parses):
+    cc, paths = project
+    parsed = count_parses
+
+    index = ProjectIndex.for_compile_commands(str(cc))
+    tus = index.translation_units
+    ordered = order_translation_units_by_dependencies(tus, str(cc), index=index)
+    func_owner, struct_owner, _, _ = build_project_usr_owner_maps(tus, str(cc), index=index)
+    closure = build_link_closure(None, str(cc), index=index)
+    struct_defs, _, _ = build_nonfunc_def_maps(str(cc), index=index)
+    combiner = ProjectCombiner(
+        config={},
+        test_cmd_path=str(tmp_path / "test_cmd.json"),
+        output_root=str(tmp_path / "out"),
+        compile_commands_file=str(cc),
+        entry_tu_file=None,
+        tu_artifacts=[],
+        project_index=index,
+    )
+    cross_deps, func_owner_by_name = combiner._build_cross_tu_deps()
+    # Without an explicit index the memoized one is reused
+    assert build_link_closure(None, str(cc)) == closure
+
+    assert sorted(parsed) == sorted(paths.values())
+    assert ordered == [paths["util.c"], paths["helper.c"], paths["main.c"]]
+    assert set(func_owner.values()) == set(paths.values())
+    assert set(struct_owner.values()) == {paths["util.c"]}
+    assert closure == tus
+    assert list(struct_defs.values()) == [paths["util.c"]]
+    assert combiner._find_entry_tu() == os.path.realpath(paths["main.c"])
+    assert cross_deps[os.path.realpath(paths["main.c"])] == {"helper"}
+    assert func_owner_by_name["util"] == os.path.realpath(paths["util.c"])
+
+
+def test_project_index_is_picklable(project):
+    cc, paths = project
+    index = ProjectIndex.build(str(cc))
+
+    clone = pickle.loads(pickle.dumps(index))
+
+    assert clone.translation_units == index.translation_units
+    assert clone.main_translation_units() == [paths["main.c"]]
+
+
+def test_parallel_build_matches_serial_build(project):
+    cc, paths = project
+
+    serial = ProjectIndex.build(str(cc))
+    parallel = ProjectIndex.build(str(cc), max_workers=3)
+
+    assert parallel.translation_units == serial.translation_units
+    assert {tu: vars(unit) for tu, unit in parallel.units.items()} == {
+        tu: vars(unit) for tu, unit in serial.units.items()}
+    tus = serial.translation_units
+    assert parallel.function_owners(tus) == serial.function_owners(tus)
+    assert parallel.symbol_owners("structs", tus) == serial.symbol_owners("structs", tus)
+
+
+def test_build_skips_translation_units_that_fail_to_parse(project, monkeypatch):
+    cc, paths = project
+    real_parser = project_index_module.CParser
+
+    def failing_parser(path, *args, **kwargs):
+        if path == paths["helper.c"]:
+            raise ValueError("Unresolved reference: helper")
+        return real_parser(path, *args, **kwargs)
+
+    monkeypatch.setattr(project_index_module, "CParser", failing_parser)
+    index = ProjectIndex.build(str(cc))
+
+    assert list(index.units) == [paths["util.c"], paths["main.c"]]
+    assert index.translation_units == list(paths.values())
+    # Backfill keeps the definitions of the TUs that did parse
+    struct_defs, _, _ = build_nonfunc_def_maps(str(cc), index=index)
+    assert list(struct_defs.values()) == [paths["util.c"]]
+    # Passes that need every TU still report the parse error
+    with pytest.raises(ValueError, match="Unresolved reference: helper"):
+        order_translation_units_by_dependencies(index.translation_units, str(cc), index=index)
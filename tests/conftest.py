@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep the persistent caches (parse, test results, toolchain, ...) out of the developer's home."""
+    cache_dir = tmp_path / "sactor-cache"
+    monkeypatch.setenv("SACTOR_CACHE_DIR", str(cache_dir))
+    return cache_dir
@@ -1,4 +1,5 @@
 import json
+import time
 from pathlib import Path
 
 from sactor import utils
@@ -98,3 +99,44 @@ def test_project_combiner_creates_standalone_workspace_and_valid_root(tmp_path:
         util_rs = (Path(crate_dir) / "src" / "util.rs").read_text(encoding="utf-8")
         expected = "+ 1" if variant == "unidiomatic" else "+ 2"
         assert expected in util_rs
+
+
+def test_project_tests_cancel_later_tests_after_a_failure(tmp_path: Path) -> None:
+    test_cmd_path = tmp_path / "test_cmd.json"
+    test_cmd_path.write_text(json.dumps([
+        {"command": ["sh", "-c", "echo broken >&2; exit 1"]},
+        {"command": ["sh", "-c", "sleep 30"]},
+    ]), encoding="utf-8")
+    combiner = ProjectCombiner(
+        config={"general": {}, "verifier": {"test_workers": 2}},
+        test_cmd_path=str(test_cmd_path),
+        output_root=str(tmp_path / "out"),
+        compile_commands_file=str(tmp_path / "compile_commands.json"),
+        entry_tu_file=None,
+        tu_artifacts=[],
+    )
+
+    started = time.monotonic()
+    assert combiner._run_project_tests(str(tmp_path / "prog")) == (False, "broken\n")
+    # The sleeping test is killed instead of awaited
+    assert time.monotonic() - started < 10
+
+
+def test_serial_project_tests_are_not_limited(tmp_path: Path) -> None:
+    test_cmd_path = tmp_path / "test_cmd.json"
+    # Outlives the configured timeout and outgrows the output limit, which
+    # only a parallel run applies
+    test_cmd_path.write_text(json.dumps([
+        {"command": ["sh", "-c", "sleep 2; head -c 100000 /dev/zero | tr '\\0' x"]},
+    ]), encoding="utf-8")
+    combiner = ProjectCombiner(
+        config={"general": {"command_output_byte_limit": 100, "timeout_seconds": 1},
+                "verifier": {"test_workers": 1}},
+        test_cmd_path=str(test_cmd_path),
+        output_root=str(tmp_path / "out"),
+        compile_commands_file=str(tmp_path / "compile_commands.json"),
+        entry_tu_file=None,
+        tu_artifacts=[],
+    )
+
+    assert combiner._run_project_tests(str(tmp_path / "prog")) == (True, None)
@@ -91,4 +91,63 @@ def test_litellm_factory(config):
     
     llm = llm_factory(config)
     assert llm.default_model == "gpt-4o"
-    assert hasattr(llm, 'router')
\ No newline at end of file
+    assert hasattr(llm, 'router')
+
+def _async_router(llm, delay=0.05):
+    import asyncio
+
+    state = {"in_flight": 0, "peak": 0}
+
+    async def acompletion(model, messages):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(delay)
+        state["in_flight"] -= 1
+        response = MagicMock()
+        response.choices = [MagicMock(
+            message=MagicMock(content=f"echo:{messages[-1]['content']}"))]
+        return response
+
+    llm.router.acompletion = acompletion
+    return state
+
+
+def test_litellm_aquery(litellm_llm):
+    import asyncio
+
+    _async_router(litellm_llm)
+    assert asyncio.run(litellm_llm.aquery("prompt")) == "echo:prompt"
+    assert len(litellm_llm.costed_time) == 1
+
+
+def test_litellm_query_many_respects_concurrency(litellm_llm):
+    state = _async_router(litellm_llm)
+    prompts = [f"p{i}" for i in range(8)]
+
+    results = litellm_llm.query_many(prompts, max_concurrency=3)
+
+    assert results == [f"echo:{p}" for p in prompts]
+    assert state["peak"] == 3
+    assert len(litellm_llm.costed_input_tokens) == 8
+    assert len(litellm_llm.costed_output_tokens) == 8
+    assert len(litellm_llm.costed_time) == 8
+    # Each query is timed individually, not as the length of the whole batch
+    assert all(t < 0.5 for t in litellm_llm.costed_time)
+
+
+def test_litellm_aquery_override_system_message_is_local(litellm_llm):
+    import asyncio
+
+    seen = []
+
+    async def acompletion(model, messages):
+        seen.append(messages[0]["content"])
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="ok"))]
+        return response
+
+    litellm_llm.router.acompletion = acompletion
+    original = litellm_llm.system_msg
+    asyncio.run(litellm_llm.aquery("prompt", override_system_message="custom"))
+    assert seen == ["custom"]
+    assert litellm_llm.system_msg == original
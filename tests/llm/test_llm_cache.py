@@ -0,0 +1,133 @@
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from sactor.llm import LLMCache, LLMCacheMiss, llm_factory
+
+from tests.utils import config
+
+
+def _mock_router(llm, content="mocked_response"):
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(message=MagicMock(content=content))]
+    llm.router.completion = MagicMock(return_value=mock_response)
+    return llm.router.completion
+
+
+@pytest.fixture
+def cached_config(config, tmp_path):
+    config["llm_cache"] = {
+        "enabled": True,
+        "path": str(tmp_path / "llm_cache.sqlite3"),
+        "max_entries": 0,
+        "max_size_mb": 0,
+        "max_age_days": 0,
+        "replay_only": False,
+    }
+    return config
+
+
+def test_cache_disabled_by_default(config):
+    llm = llm_factory(config)
+    assert llm.cache is None
+
+
+def test_cache_hit_skips_router(cached_config, tmp_path):
+    llm = llm_factory(cached_config)
+    completion = _mock_router(llm)
+
+    assert llm.query("prompt") == "mocked_response"
+    assert llm.query("prompt") == "mocked_response"
+    assert completion.call_count == 1
+
+    # A fresh instance shares the on-disk cache
+    llm2 = llm_factory(cached_config)
+    completion2 = _mock_router(llm2, "other")
+    assert llm2.query("prompt") == "mocked_response"
+    assert completion2.call_count == 0
+
+    llm.statistic(str(tmp_path))
+    with open(tmp_path / "llm_stat.json") as f:
+        stat = json.load(f)
+    assert stat["cache_hits"] == 1
+    assert stat["cache_misses"] == 1
+    assert stat["total_queries"] == 1
+
+
+def test_cache_key_includes_model_and_system_message(cached_config):
+    llm = llm_factory(cached_config)
+    completion = _mock_router(llm)
+
+    llm.query("prompt")
+    llm.query("prompt", override_system_message="another system message")
+    assert completion.call_count == 2
+    assert (LLMCache.make_key("a", "s", "p")
+            != LLMCache.make_key("b", "s", "p"))
+
+
+def test_replay_only_fails_on_miss(cached_config):
+    llm = llm_factory(cached_config)
+    _mock_router(llm)
+    llm.query("recorded")
+
+    cached_config["llm_cache"]["replay_only"] = True
+    replay = llm_factory(cached_config)
+    completion = _mock_router(replay)
+    assert replay.query("recorded") == "mocked_response"
+    with pytest.raises(LLMCacheMiss):
+        replay.query("never seen")
+    assert completion.call_count == 0
+
+
+def test_lru_eviction_by_entries(tmp_path):
+    cache = LLMCache(str(tmp_path / "c.sqlite3"), max_entries=2)
+    cache.put("a", "m", "1")
+    time.sleep(0.01)
+    cache.put("b", "m", "2")
+    time.sleep(0.01)
+    assert cache.get("a") == "1"  # refresh a, b is now least recent
+    time.sleep(0.01)
+    cache.put("c", "m", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert len(cache) == 2
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = LLMCache(str(tmp_path / "c.sqlite3"), max_size_mb=1.5 / 1024)
+    cache.put("a", "m", "x" * 1024)
+    time.sleep(0.01)
+    cache.put("b", "m", "y" * 1024)
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 1024
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LLMCache(str(tmp_path / "c.sqlite3"), max_age_days=1)
+    cache.put("a", "m", "1")
+    with cache._conn:
+        cache._conn.execute(
+            "UPDATE responses SET created_at = ?", (time.time() - 2 * 86400,))
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_query_candidates_are_cached_per_sample(cached_config):
+    llm = llm_factory(cached_config)
+    calls = []
+
+    async def acompletion(model, messages):
+        calls.append(messages[-1]["content"])
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content=f"sample{len(calls)}"))]
+        return response
+
+    llm.router.acompletion = acompletion
+
+    first = llm.query_candidates("prompt", 3)
+    assert sorted(first) == ["sample1", "sample2", "sample3"]
+    assert llm.query_candidates("prompt", 3) == first
+    assert len(calls) == 3
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+
+# Modules that only `sactor translate` needs; lighter subcommands must not load them
+TRANSLATE_ONLY = (
+    "sactor.sactor",
+    "sactor.translator",
+    "sactor.verifier",
+    "sactor.combiner",
+    "sactor.divider",
+)
+HEAVY = ("litellm", "tiktoken", "clang.cindex", "sactor.llm", "sactor.c_parser")
+
+
+def _import_times(*python_args: str) -> dict[str, int]:
+    """Run python with `-X importtime` and return {module: cumulative microseconds}."""
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", *python_args],
+        capture_output=True,
+        text=True,
+        cwd=repo_root,
+    )
+    assert res.returncode == 0, res.stderr
+    times = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def _report(record_property, subcommand: str, times: dict[str, int]) -> None:
+    """Attach the import cost to the test report (e.g. `--junitxml`)."""
+    top = sorted(times.items(), key=lambda item: item[1], reverse=True)[:5]
+    total = sum(us for name, us in times.items() if "." not in name)
+    record_property(f"{subcommand}_import_ms", round(total / 1000, 1))
+    record_property(f"{subcommand}_slowest_imports",
+                    ", ".join(f"{name} {us / 1000:.1f}ms" for name, us in top))
+
+
+def _loaded(times: dict[str, int], prefixes: tuple[str, ...]) -> list[str]:
+    return sorted(name for name in times
+                  if any(name == p or name.startswith(p + ".") for p in prefixes))
+
+
+def test_run_tests_imports_stay_light(record_property):
+    times = _import_times("-m", "sactor", "run-tests", "--help")
+    _report(record_property, "run-tests", times)
+    assert "sactor.test_runner" in times
+    assert _loaded(times, TRANSLATE_ONLY + HEAVY) == []
+
+
+def test_generate_tests_does_not_load_translator(record_property):
+    # The handler imports its implementation lazily, so measure that import too
+    times = _import_times("-c", "import sactor.__main__, sactor.test_generator")
+    _report(record_property, "generate-tests", times)
+    assert "sactor.test_generator" in times
+    assert _loaded(times, TRANSLATE_ONLY) == []
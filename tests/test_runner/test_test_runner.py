@@ -73,3 +73,49 @@ def test_test_runner_e2e_2(c_file_executable_scanf, config):
         verifier = UnidiomaticVerifier(f'{tmpdirname}/test_task.json', config=config)
         result = verifier._run_tests(c_file_executable_scanf[0])
         assert result[0] == VerifyResult.SUCCESS
+
+def test_test_runner_batched_task_runs_in_process(c_file_executable_arguments, config, tmp_path, monkeypatch):
+    test_samples_path = 'tests/c_examples/add/test_task/test_samples.json'
+    (tmp_path / 'test_samples.json').write_text(read_file(test_samples_path))
+    (tmp_path / 'test_task.json').write_text(json.dumps([{
+        "command": "sactor run-tests --type bin ./test_samples.json %t --all --feed-as-args",
+        "test_id": 0,
+    }]))
+
+    spawned = []
+    run_command = utils.run_command
+
+    def recording_run_command(cmd, *args, **kwargs):
+        spawned.append(cmd[0])
+        return run_command(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(utils, "run_command", recording_run_command)
+    verifier = UnidiomaticVerifier(str(tmp_path / 'test_task.json'), config=config)
+    result = verifier._run_tests(c_file_executable_arguments[0])
+    assert result[0] == VerifyResult.SUCCESS
+    # Every sample ran the target directly, without a `sactor` process
+    assert len(spawned) == len(json.loads(read_file(test_samples_path)))
+    assert 'sactor' not in spawned
+
+    # Test numbers refer to single samples of the batched task
+    (tmp_path / 'test_samples.json').write_text(json.dumps([
+        {"input": "1 2", "output": "1 + 2 = 3"},
+        {"input": "1 2", "output": "wrong"},
+    ]))
+    result = verifier._run_tests(c_file_executable_arguments[0])
+    assert result[0] == VerifyResult.TEST_ERROR
+    assert result[2] == 1
+
+
+def test_sample_deadline_follows_recorded_c_runtime(tmp_path):
+    test_samples_path = tmp_path / 'test_samples.json'
+    test_samples_path.write_text(json.dumps([
+        {"input": "1", "output": "1", "runtime": 0.01},
+        {"input": "2", "output": "2", "runtime": 1.0},
+        {"input": "3", "output": "3", "runtime": 100.0},
+        {"input": "4", "output": "4"},
+    ]))
+    runner = ExecutableTestRunner(str(test_samples_path), "prog")
+    runner.timeout_seconds, runner.timeout_multiple, runner.min_timeout_seconds = 60, 20, 5
+    # Floor, multiple, ceiling, and no recorded runtime
+    assert [runner.timeout_for(i) for i in range(4)] == [5, 20, 60, 60]
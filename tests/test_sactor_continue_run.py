@@ -42,6 +42,8 @@ class DummyTranslator:
 
 def make_sactor(tmp_path, continue_flag, idiomatic_result):
     sactor = object.__new__(Sactor)
+    sactor.config = {"general": {}}
+    sactor.manifest = None
     sactor.idiomatic_only = False
     sactor.unidiomatic_only = False
     sactor.continue_run_when_incomplete = continue_flag
@@ -68,6 +70,7 @@ def make_sactor(tmp_path, continue_flag, idiomatic_result):
 
 def make_base_sactor(tmp_path):
     sactor = object.__new__(Sactor)
+    sactor.manifest = None
     sactor.result_dir = str(tmp_path)
     sactor.llm_stat = str(tmp_path / "llm_stat.json")
     sactor.llm = DummyLLM()
@@ -146,3 +149,42 @@ def test_idiomatic_continue_flag_raises_without_flag(tmp_path):
     assert len(sactor.combiner.calls) == 1
     assert sactor.combiner.calls[0][1] is False
     assert idiomatic_translator.summary == ["Idiomatic"]
+
+
+def test_pipelined_run_combines_both_stages(tmp_path):
+    sactor, unidiomatic_translator, idiomatic_translator = make_sactor(
+        tmp_path, False, TranslateResult.SUCCESS
+    )
+    sactor.config = {"general": {"pipeline_translation_phases": True}}
+    sactor._run_unidomatic_translation = lambda: (_ for _ in ()).throw(AssertionError("serial stage should not run"))
+    sactor._run_pipelined_translation = lambda: (
+        TranslateResult.SUCCESS, unidiomatic_translator,
+        TranslateResult.SUCCESS, idiomatic_translator,
+    )
+
+    sactor.run()
+
+    assert sactor.combiner.calls == [
+        (os.path.join(sactor.result_dir, "translated_code_unidiomatic"), False),
+        (os.path.join(sactor.result_dir, "translated_code_idiomatic"), True),
+    ]
+    assert sactor.llm.calls == [str(tmp_path / "llm_stat_pipelined.json")]
+
+
+def test_pipelined_unidiomatic_failure_skips_idiomatic_stage(tmp_path):
+    sactor, unidiomatic_translator, idiomatic_translator = make_sactor(
+        tmp_path, False, TranslateResult.SUCCESS
+    )
+    sactor.config = {"general": {"pipeline_translation_phases": True}}
+    sactor._run_pipelined_translation = lambda: (
+        TranslateResult.MAX_ATTEMPTS_EXCEEDED, unidiomatic_translator,
+        TranslateResult.SUCCESS, idiomatic_translator,
+    )
+
+    with pytest.raises(ValueError):
+        sactor.run()
+
+    assert sactor.combiner.calls == []
+    assert unidiomatic_translator.summary == ["Unidiomatic"]
+    assert idiomatic_translator.saved == []
+    assert sactor.llm.calls == [str(tmp_path / "llm_stat_pipelined.json")]
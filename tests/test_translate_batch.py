@@ -341,3 +341,195 @@ def test_translate_batch_creates_variant_projects_without_flat_rs(tmp_path, monk
 
     variants_seen = [variant for (variant, _root) in combine_calls]
     assert variants_seen == ["unidiomatic", "idiomatic"]
+
+
+class ProcessSafeSactor:
+    """Picklable runner for the process-pool path; `broken.c` always fails."""
+
+    def __init__(self, *args, input_file, result_dir=None, **kwargs):
+        self.input_file = input_file
+        self.result_dir = result_dir
+
+    def run(self):
+        if os.path.basename(self.input_file) == "broken.c":
+            raise RuntimeError("translation failed")
+        for sub in ("translated_code_unidiomatic", "translated_code_idiomatic"):
+            d = os.path.join(self.result_dir, sub)
+            os.makedirs(d, exist_ok=True)
+            with open(os.path.join(d, "combined.rs"), "w", encoding="utf-8") as f:
+                f.write(f"// {sub} {self.input_file}\n")
+
+
+class _NoopProjectCombiner:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    @staticmethod
+    def cleanup_combined_root(_combined_root, _translation_units):
+        return None
+
+    @staticmethod
+    def cleanup_variant_root(_output_root):
+        return None
+
+    def combine_and_build(self):
+        return True, None, None
+
+
+def _write_batch_project(tmp_path):
+    compile_dir = tmp_path / "project"
+    compile_dir.mkdir()
+    sources = {
+        "util.c": "int util(void){return 42;}\n",
+        "helper.c": "int util(void);\nint helper(void){return util();}\n",
+        "other.c": "int other(void){return 1;}\n",
+        "broken.c": "int broken(void){return 2;}\n",
+        "main.c": "int helper(void);\nint other(void);\n"
+                  "int main(void){return helper() + other();}\n",
+    }
+    compile_commands = []
+    for name, code in sources.items():
+        path = compile_dir / name
+        path.write_text(code, encoding="utf-8")
+        compile_commands.append({
+            "directory": str(compile_dir),
+            "file": str(path),
+            "command": f"clang -std=c99 -c {path}",
+        })
+    commands_path = compile_dir / "compile_commands.json"
+    commands_path.write_text(json.dumps(compile_commands), encoding="utf-8")
+    return commands_path
+
+
+def _run_batch(tmp_path, commands_path, name, general):
+    base = tmp_path / f"out_{name}"
+    result = batch_runner_module.run_translate_batch(
+        runner_cls=ProcessSafeSactor,
+        base_result_dir=str(base),
+        config={"general": general},
+        test_cmd_path=str(tmp_path / "test_cmd.json"),
+        compile_commands_file=str(commands_path),
+        entry_tu_file=None,
+        build_dir=str(tmp_path / f"build_{name}"),
+        config_file=None,
+        no_verify=True,
+        unidiomatic_only=False,
+        idiomatic_only=False,
+        continue_run_when_incomplete=True,
+        extra_compile_command=None,
+        is_executable=True,
+        executable_object=None,
+        link_args="",
+        llm_stat=None,
+    )
+    summary = json.loads((base / "batch_summary.json").read_text(encoding="utf-8"))
+    for entry in summary:
+        entry["result_dir"] = os.path.relpath(entry["result_dir"], base)
+    return result, summary
+
+
+def test_translate_batch_parallel_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner_module, "ProjectCombiner", _NoopProjectCombiner)
+    commands_path = _write_batch_project(tmp_path)
+
+    serial_result, serial_summary = _run_batch(
+        tmp_path, commands_path, "serial", {"max_parallel_translation_units": 1})
+    parallel_result, parallel_summary = _run_batch(
+        tmp_path, commands_path, "parallel", {"max_parallel_translation_units": 3})
+
+    assert parallel_summary == serial_summary
+    assert serial_result.any_failed and parallel_result.any_failed
+    statuses = {Path(entry["input"]).name: entry["status"] for entry in parallel_summary}
+    assert statuses["broken.c"] == "failed"
+    assert {name for name, status in statuses.items() if status == "success"} == {
+        "util.c", "helper.c", "other.c", "main.c"}
+    assert (tmp_path / "build_parallel" / Path(parallel_summary[0]["result_dir"]).name).is_dir()
+
+
+def test_translate_batch_pipelined_phases_match_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner_module, "ProjectCombiner", _NoopProjectCombiner)
+    commands_path = _write_batch_project(tmp_path)
+
+    _, phased_summary = _run_batch(tmp_path, commands_path, "phased", {})
+    result, pipelined_summary = _run_batch(
+        tmp_path, commands_path, "pipelined", {"pipeline_translation_phases": True})
+
+    assert pipelined_summary == phased_summary
+    assert result.any_failed
+
+
+
+class ReportingSactor(ProcessSafeSactor):
+    """Reports the outcome of each stage it ran; `other.c` leaves unidiomatic
+    output behind but fails that stage, as Sactor does with continue_run_when_incomplete."""
+
+    def __init__(self, *args, input_file, result_dir=None, unidiomatic_only=False,
+                 idiomatic_only=False, **kwargs):
+        super().__init__(input_file=input_file, result_dir=result_dir)
+        self.stages = [stage for stage, skipped in (
+            ("unidiomatic", idiomatic_only), ("idiomatic", unidiomatic_only)) if not skipped]
+
+    def run(self):
+        super().run()
+        ok = os.path.basename(self.input_file) != "other.c"
+        self.stage_outcomes = {stage: ok for stage in self.stages}
+
+
+def _run_reporting_batch(tmp_path, monkeypatch, general):
+    combined = {}
+
+    class RecordingProjectCombiner(_NoopProjectCombiner):
+        def __init__(self, *args, variant, tu_artifacts, **kwargs):
+            combined[variant] = sorted(Path(a.tu_path).name for a in tu_artifacts)
+
+    monkeypatch.setattr(batch_runner_module, "ProjectCombiner", RecordingProjectCombiner)
+    commands_path = _write_batch_project(tmp_path)
+    (tmp_path / "project" / "broken.c").unlink()
+    commands = json.loads(commands_path.read_text(encoding="utf-8"))
+    commands_path.write_text(json.dumps(
+        [c for c in commands if not c["file"].endswith("broken.c")]), encoding="utf-8")
+
+    result = batch_runner_module.run_translate_batch(
+        runner_cls=ReportingSactor,
+        base_result_dir=str(tmp_path / "out"),
+        config={"general": general},
+        test_cmd_path=str(tmp_path / "test_cmd.json"),
+        compile_commands_file=str(commands_path),
+        entry_tu_file=None,
+        build_dir=str(tmp_path / "build"),
+        config_file=None,
+        no_verify=True,
+        unidiomatic_only=False,
+        idiomatic_only=False,
+        continue_run_when_incomplete=True,
+        extra_compile_command=None,
+        is_executable=True,
+        executable_object=None,
+        link_args="",
+        llm_stat=None,
+    )
+    statuses = {Path(entry["input"]).name: (entry["status"], entry["error"]) for entry in result.entries}
+    return result, statuses, combined
+
+
+def test_translate_batch_pipelined_uses_reported_stage_outcomes(tmp_path, monkeypatch):
+    result, statuses, combined = _run_reporting_batch(
+        tmp_path, monkeypatch, {"pipeline_translation_phases": True})
+
+    # other.c's leftover combined.rs does not count as a unidiomatic success
+    assert combined == {
+        "unidiomatic": ["helper.c", "main.c", "util.c"],
+        "idiomatic": ["helper.c", "main.c", "util.c"],
+    }
+    assert result.any_failed
+    assert statuses["other.c"][0] == "failed"
+
+
+def test_translate_batch_reports_stage_failed_in_continue_mode(tmp_path, monkeypatch):
+    result, statuses, combined = _run_reporting_batch(tmp_path, monkeypatch, {})
+
+    # The unit is left out of the idiomatic phase, and the summary says why
+    assert combined["unidiomatic"] == ["helper.c", "main.c", "util.c"]
+    assert result.any_failed
+    assert statuses["other.c"] == ("failed", "Unidiomatic translation did not succeed")
+    assert statuses["util.c"] == ("success", None)
@@ -0,0 +1,204 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from sactor.translator import PipelinedScheduler, TranslationScheduler, Translator
+from sactor.translator.translator_types import TranslateResult, TranslationOutcome
+
+
+class DummyVerifier:
+    def __init__(self, build_path):
+        self.build_path = build_path
+
+    def with_build_path(self, build_path):
+        return DummyVerifier(build_path)
+
+
+class RecordingTranslator(Translator):
+    """Translator whose items succeed unless listed in `failing`."""
+
+    def __init__(self, tmp_path, failing=(), delay=0.0):
+        config = {"general": {"max_translation_attempts": 1}}
+        super().__init__(llm=None, c_parser=None, config=config,
+                         result_path=str(tmp_path / "result"))
+        self.verifier = DummyVerifier(str(tmp_path / "build"))
+        self.failing = set(failing)
+        self.delay = delay
+        self.events = []
+        self.build_paths = set()
+        self._events_lock = threading.Lock()
+        # Mutated in place so forks of this translator share the counters
+        self.concurrency = {"in_flight": 0, "peak": 0}
+
+    def _resolve_dependency_type(self, dep) -> str:
+        return dep.kind
+
+    def _dependency_artifact_exists(self, item_type, item_name) -> bool:
+        return False
+
+    def _run(self, kind, item):
+        self.init_failure_info(kind, item.name)
+        with self._events_lock:
+            self.events.append(("start", item.name))
+            self.build_paths.add(self.verifier.build_path)
+            self.concurrency["in_flight"] += 1
+            self.concurrency["peak"] = max(
+                self.concurrency["peak"], self.concurrency["in_flight"])
+        time.sleep(self.delay)
+        with self._events_lock:
+            self.concurrency["in_flight"] -= 1
+            self.events.append(("end", item.name))
+        if item.name in self.failing:
+            self.append_failure_info(item.name, "COMPILE_ERROR", "boom", "")
+            return TranslateResult.MAX_ATTEMPTS_EXCEEDED
+        self.mark_translation_success(kind, item.name)
+        return TranslateResult.SUCCESS
+
+    def _translate_struct_impl(self, struct_union, *args, **kwargs):
+        return self._run("struct", struct_union)
+
+    def _translate_function_impl(self, function, *args, **kwargs):
+        return self._run("function", function)
+
+    def _translate_enum_impl(self, enum, *args, **kwargs):
+        raise NotImplementedError
+
+    def _translate_global_vars_impl(self, global_var, *args, **kwargs):
+        raise NotImplementedError
+
+
+def _struct(name, deps=()):
+    return SimpleNamespace(kind="struct", name=name, dependencies=list(deps))
+
+
+def _function(name, structs=(), functions=()):
+    return SimpleNamespace(
+        kind="function",
+        name=name,
+        struct_dependencies=list(structs),
+        function_dependencies=[
+            SimpleNamespace(kind="function", name=f.name, target=f) for f in functions
+        ],
+    )
+
+
+def _project():
+    node = _struct("Node")
+    tree = _struct("Tree", [node])
+    leaf_a = _function("leaf_a", [node])
+    leaf_b = _function("leaf_b")
+    leaf_c = _function("leaf_c")
+    root = _function("root", [tree], [leaf_a, leaf_b, leaf_c])
+    struct_order = [[node], [tree]]
+    function_order = [[leaf_a], [leaf_b], [leaf_c], [root]]
+    return struct_order, function_order
+
+
+def _starts(translator):
+    return [name for event, name in translator.events if event == "start"]
+
+
+def test_single_worker_keeps_serial_order(tmp_path):
+    struct_order, function_order = _project()
+    translator = RecordingTranslator(tmp_path)
+
+    result = TranslationScheduler(translator, struct_order, function_order).run()
+
+    assert result == TranslateResult.SUCCESS
+    assert _starts(translator) == ["Node", "Tree", "leaf_a", "leaf_b", "leaf_c", "root"]
+    assert translator.build_paths == {str(tmp_path / "build")}
+
+
+def test_parallel_workers_respect_dependencies(tmp_path):
+    struct_order, function_order = _project()
+    translator = RecordingTranslator(tmp_path, delay=0.05)
+
+    result = TranslationScheduler(
+        translator, struct_order, function_order, max_workers=3).run()
+
+    assert result == TranslateResult.SUCCESS
+    assert translator.concurrency["peak"] > 1
+    position = {event: i for i, event in enumerate(translator.events)}
+    for dep in ["Tree", "leaf_a", "leaf_b", "leaf_c"]:
+        assert position[("end", dep)] < position[("start", "root")]
+    assert position[("end", "Node")] < position[("start", "Tree")]
+    assert position[("end", "Node")] < position[("start", "leaf_a")]
+    # Workers verify in their own build directories
+    assert str(tmp_path / "build") not in translator.build_paths
+    assert all(status == TranslationOutcome.SUCCESS
+               for status in translator.translation_status["function"].values())
+
+
+def test_failed_dependency_blocks_dependents(tmp_path):
+    struct_order, function_order = _project()
+    translator = RecordingTranslator(tmp_path, failing={"leaf_b"}, delay=0.01)
+
+    result = TranslationScheduler(
+        translator, struct_order, function_order, max_workers=2).run()
+
+    assert result == TranslateResult.MAX_ATTEMPTS_EXCEEDED
+    assert "root" not in _starts(translator)
+    assert translator.translation_status["function"]["root"] == TranslationOutcome.BLOCKED_FAILED
+    blockers = translator.failure_info["root"]["blockers"]
+    assert blockers == [{"type": "function", "name": "leaf_b", "status": "failure"}]
+
+
+def _pipeline(tmp_path, failing=(), delay=0.0, setup_delay=0.0):
+    unidiomatic = RecordingTranslator(tmp_path / "uni", failing=failing, delay=delay)
+    idiomatic = RecordingTranslator(tmp_path / "ido", delay=delay)
+    # Record both stages in one event log
+    idiomatic.events = unidiomatic.events
+    idiomatic._events_lock = unidiomatic._events_lock
+
+    def factory():
+        time.sleep(setup_delay)
+        return idiomatic
+
+    return unidiomatic, idiomatic, factory
+
+
+def test_pipeline_single_worker_runs_phases_in_order(tmp_path):
+    struct_order, function_order = _project()
+    unidiomatic, idiomatic, factory = _pipeline(tmp_path)
+
+    scheduler = PipelinedScheduler(unidiomatic, factory, struct_order, function_order)
+    results = scheduler.run()
+
+    assert results == (TranslateResult.SUCCESS, TranslateResult.SUCCESS)
+    assert scheduler.idiomatic_translator is idiomatic
+    order = ["Node", "Tree", "leaf_a", "leaf_b", "leaf_c", "root"]
+    assert _starts(unidiomatic) == order + order
+
+
+def test_pipeline_overlaps_phases(tmp_path):
+    struct_order, function_order = _project()
+    unidiomatic, idiomatic, factory = _pipeline(tmp_path, delay=0.05, setup_delay=0.01)
+
+    results = PipelinedScheduler(
+        unidiomatic, factory, struct_order, function_order, max_workers=2).run()
+
+    assert results == (TranslateResult.SUCCESS, TranslateResult.SUCCESS)
+    events = unidiomatic.events
+    starts = [i for i, (event, _) in enumerate(events) if event == "start"]
+    # The second "Node" start is its idiomatic translation; it begins before
+    # the unidiomatic "root" has started.
+    node_starts = [i for i in starts if events[i][1] == "Node"]
+    root_start = next(i for i in starts if events[i][1] == "root")
+    assert node_starts[1] < root_start
+    assert all(status == TranslationOutcome.SUCCESS
+               for status in idiomatic.translation_status["function"].values())
+    assert {str(tmp_path / "uni" / "build"), str(tmp_path / "ido" / "build")}.isdisjoint(
+        unidiomatic.build_paths | idiomatic.build_paths)
+
+
+def test_pipeline_stops_idiomatic_after_unidiomatic_failure(tmp_path):
+    struct_order, function_order = _project()
+    unidiomatic, idiomatic, factory = _pipeline(tmp_path, failing={"Node"})
+
+    results = PipelinedScheduler(
+        unidiomatic, factory, struct_order, function_order,
+        stop_on_unidiomatic_failure=True).run()
+
+    assert results == (TranslateResult.MAX_ATTEMPTS_EXCEEDED, TranslateResult.SUCCESS)
+    assert idiomatic.translation_status["struct"] == {}
+    assert _starts(unidiomatic) == ["Node", "leaf_b", "leaf_c"]
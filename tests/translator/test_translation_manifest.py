@@ -0,0 +1,98 @@
+import json
+import os
+
+from sactor.c_parser import CParser
+from sactor.translator.translation_manifest import TranslationManifest
+
+from tests.utils import config
+
+SOURCE = """
+struct Point { int x; int y; };
+
+int norm(struct Point *p) { return p->x * p->x + p->y * p->y; }
+
+int scale(struct Point *p, int k) { return norm(p) * k; }
+
+int answer(void) { return 42; }
+"""
+
+
+def _parse(tmp_path, source):
+    path = tmp_path / "input.c"
+    path.write_text(source, encoding="utf-8")
+    return CParser(str(path))
+
+
+def _save_all(result_dir, stage):
+    stage_dir = result_dir / f"translated_code_{stage}"
+    for sub, name in [("structs", "Point"), ("functions", "norm"),
+                      ("functions", "scale"), ("functions", "answer")]:
+        (stage_dir / sub).mkdir(parents=True, exist_ok=True)
+        (stage_dir / sub / f"{name}.rs").write_text("// translated\n")
+    (stage_dir / "combined.rs").write_text("// combined\n")
+    return stage_dir
+
+
+def test_unchanged_code_keeps_translations(tmp_path, config):
+    result_dir = tmp_path / "result"
+    stage_dir = _save_all(result_dir, "unidiomatic")
+    TranslationManifest(_parse(tmp_path, SOURCE), config, str(result_dir)).record("unidiomatic")
+
+    manifest = TranslationManifest(_parse(tmp_path, SOURCE), config, str(result_dir))
+    assert manifest.invalidate("unidiomatic") == []
+    assert (stage_dir / "combined.rs").exists()
+
+
+def test_changed_struct_invalidates_dependents(tmp_path, config):
+    result_dir = tmp_path / "result"
+    stage_dir = _save_all(result_dir, "unidiomatic")
+    TranslationManifest(_parse(tmp_path, SOURCE), config, str(result_dir)).record("unidiomatic")
+
+    edited = SOURCE.replace("int x; int y;", "long x; long y;")
+    manifest = TranslationManifest(_parse(tmp_path, edited), config, str(result_dir))
+    stale = manifest.invalidate("unidiomatic")
+
+    # scale only reaches Point through norm
+    assert stale == ["function:norm", "function:scale", "struct:Point"]
+    assert not (stage_dir / "structs" / "Point.rs").exists()
+    assert not (stage_dir / "functions" / "scale.rs").exists()
+    assert (stage_dir / "functions" / "answer.rs").exists()
+    assert not (stage_dir / "combined.rs").exists()
+
+
+def test_model_change_invalidates_stage(tmp_path, config):
+    result_dir = tmp_path / "result"
+    _save_all(result_dir, "idiomatic")
+    unidiomatic_dir = _save_all(result_dir, "unidiomatic")
+    manifest = TranslationManifest(_parse(tmp_path, SOURCE), config, str(result_dir))
+    manifest.record("idiomatic")
+    manifest.record("unidiomatic")
+
+    config["general"]["model"] = "another-model"
+    manifest = TranslationManifest(_parse(tmp_path, SOURCE), config, str(result_dir))
+    assert len(manifest.invalidate("idiomatic")) == 4
+    assert os.listdir(unidiomatic_dir / "functions")  # other stage untouched
+
+
+def test_stale_struct_drops_its_spec_harness_and_name(tmp_path, config):
+    result_dir = tmp_path / "result"
+    stage_dir = _save_all(result_dir, "idiomatic")
+    specs = stage_dir / "specs"
+    (specs / "structs").mkdir(parents=True)
+    (specs / "structs" / "Point.json").write_text("{}\n")
+    (specs / "struct_name_map.json").write_text(json.dumps({"Point": "Point2D"}))
+    (specs / "function_name_map.json").write_text(
+        json.dumps({"norm": "norm_sq", "answer": "answer"}))
+    harness = result_dir / "test_harness"
+    (harness / "structs").mkdir(parents=True)
+    (harness / "structs" / "Point.rs").write_text("// harness\n")
+    TranslationManifest(_parse(tmp_path, SOURCE), config, str(result_dir)).record("idiomatic")
+
+    edited = SOURCE.replace("int x; int y;", "long x; long y;")
+    TranslationManifest(_parse(tmp_path, edited), config, str(result_dir)).invalidate("idiomatic")
+
+    # Nothing left for the verifier to restore an outdated harness from
+    assert not (specs / "structs" / "Point.json").exists()
+    assert not (harness / "structs" / "Point.rs").exists()
+    assert json.loads((specs / "struct_name_map.json").read_text()) == {}
+    assert json.loads((specs / "function_name_map.json").read_text()) == {"answer": "answer"}
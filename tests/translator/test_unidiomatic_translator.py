@@ -147,3 +147,84 @@ pub fn main() {
 }
 '''
     assert saved == expected
+
+
+def _speculative_translator(tmp_path, config, llm):
+    c_file = tmp_path / "main_only.c"
+    c_file.write_text("int main(void) {\n    return 0;\n}\n")
+    c_parser = CParser(str(c_file))
+    test_cmd_path = tmp_path / "test_commands.json"
+    test_cmd_path.write_text("[]")
+    translator = UnidiomaticTranslator(
+        llm=llm,
+        c2rust_translation="",
+        c_parser=c_parser,
+        config=config,
+        test_cmd_path=str(test_cmd_path),
+        result_path=str(tmp_path / "result"),
+        build_path=str(tmp_path / "build"),
+    )
+    return translator, c_parser
+
+
+def _function_response(body):
+    return f'''----FUNCTION----
+```rust
+pub fn main() {{
+    println!("{body}");
+}}
+```
+----END FUNCTION----
+'''
+
+
+def test_speculative_candidates_commit_first_passing(monkeypatch, tmp_path, config, llm):
+    from sactor.verifier import UnidiomaticVerifier, VerifyResult
+
+    config['general']['speculative_candidates'] = 3
+    config['general']['max_translation_attempts'] = 1
+    responses = ["no tags here", _function_response("a"), _function_response("b")]
+    monkeypatch.setattr(
+        llm, "query_candidates", lambda prompt, count, **kwargs: responses[:count])
+
+    leased = []
+
+    def fake_verify(self, function, function_code, **kwargs):
+        # A leased copy has no pool of its own
+        leased.append(self.workspace_pool is None)
+        if '"b"' in function_code:
+            return (VerifyResult.SUCCESS, None)
+        return (VerifyResult.TEST_ERROR, "output mismatch")
+
+    monkeypatch.setattr(UnidiomaticVerifier, "verify_function", fake_verify)
+
+    translator, c_parser = _speculative_translator(tmp_path, config, llm)
+    result = translator.translate_function(c_parser.get_function_info('main'))
+
+    assert result == TranslateResult.SUCCESS
+    saved = (tmp_path / 'result' / 'translated_code_unidiomatic' / 'functions' / 'main.rs').read_text()
+    assert '"b"' in saved
+    # Each candidate is verified in a workspace leased from the runner's pool
+    assert leased and all(leased)
+
+
+def test_speculative_candidates_all_failing_record_each(monkeypatch, tmp_path, config, llm):
+    from sactor.verifier import UnidiomaticVerifier, VerifyResult
+
+    config['general']['speculative_candidates'] = 2
+    config['general']['max_translation_attempts'] = 1
+    responses = ["no tags here", _function_response("a")]
+    monkeypatch.setattr(
+        llm, "query_candidates", lambda prompt, count, **kwargs: responses[:count])
+    monkeypatch.setattr(
+        UnidiomaticVerifier,
+        "verify_function",
+        lambda self, function, function_code, **kwargs: (VerifyResult.TEST_ERROR, "output mismatch"),
+    )
+
+    translator, c_parser = _speculative_translator(tmp_path, config, llm)
+    result = translator.translate_function(c_parser.get_function_info('main'))
+
+    assert result == TranslateResult.MAX_ATTEMPTS_EXCEEDED
+    errors = translator.failure_info['main']['errors']
+    assert [e['type'] for e in errors] == ["COMPILE_ERROR", "TEST_ERROR"]
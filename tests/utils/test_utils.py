@@ -310,3 +310,63 @@ def test_list_c_files_from_compile_commands(tmp_path):
 
     files = utils.list_c_files_from_compile_commands(str(commands_path))
     assert sorted(files) == sorted([str(a_c.resolve()), str(b_c.resolve())])
+
+
+def test_create_rust_proj_keeps_workspace_warm(tmp_path):
+    proj = tmp_path / "proj"
+    utils.create_rust_proj("pub fn a() {}\n", "demo", str(proj), is_lib=True)
+    (proj / "target").mkdir()
+    (proj / "target" / "marker").write_text("built", encoding="utf-8")
+    lib_rs = proj / "src" / "lib.rs"
+    manifest = proj / "Cargo.toml"
+    os.utime(lib_rs, (1, 1))
+    os.utime(manifest, (1, 1))
+
+    utils.create_rust_proj("pub fn a() {}\n", "demo", str(proj), is_lib=True)
+    assert (proj / "target" / "marker").exists()
+    assert lib_rs.stat().st_mtime == 1
+    assert manifest.stat().st_mtime == 1
+
+    utils.create_rust_proj("pub fn b() {}\n", "demo", str(proj), is_lib=True)
+    assert lib_rs.read_text(encoding="utf-8") == "pub fn b() {}\n"
+    assert lib_rs.stat().st_mtime != 1
+    assert manifest.stat().st_mtime == 1
+
+    utils.create_rust_proj("fn main() {}\n", "demo", str(proj), is_lib=False)
+    assert not lib_rs.exists()
+    assert (proj / "src" / "main.rs").exists()
+    assert (proj / "target" / "marker").exists()
+
+
+def test_create_rust_proj_writes_offline_cargo_config(tmp_path, monkeypatch):
+    vendor_dir = tmp_path / "vendor"
+    proj = tmp_path / "proj"
+    monkeypatch.delenv(utils.CARGO_VENDOR_DIR_ENV, raising=False)
+    utils.configure_cargo({"cargo": {"vendor_dir": str(vendor_dir)}})
+
+    utils.create_rust_proj("", "demo", str(proj), is_lib=True)
+    cargo_config = (proj / ".cargo" / "config.toml").read_text(encoding="utf-8")
+    assert f'directory = "{vendor_dir}"' in cargo_config
+    assert "offline = true" in cargo_config
+
+    monkeypatch.delenv(utils.CARGO_VENDOR_DIR_ENV)
+    utils.create_rust_proj("", "demo", str(proj), is_lib=True)
+    assert not (proj / ".cargo" / "config.toml").exists()
+
+
+def test_json_entry_store_round_trip(tmp_path):
+    store = utils.JsonEntryStore(str(tmp_path / "cache"), format_version=1)
+    key = store.key("unit.c", ["-O2"])
+    assert store.key("unit.c", ["-O2"]) == key
+    assert store.key("unit.c", ["-O0"]) != key
+    assert utils.JsonEntryStore(str(tmp_path / "cache"), format_version=2).key("unit.c", ["-O2"]) != key
+    assert store.load(key) is None
+
+    store.store(key, {"runtime": 0.5})
+    assert store.load(key) == {"runtime": 0.5}
+    entry_path = tmp_path / "cache" / key[:2] / f"{key}.json"
+    assert store.entry_path(key) == str(entry_path)
+    assert [p.name for p in entry_path.parent.iterdir()] == [entry_path.name]
+
+    entry_path.write_text("{truncated", encoding="utf-8")
+    assert store.load(key) is None
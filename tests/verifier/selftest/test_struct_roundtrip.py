@@ -89,6 +89,29 @@ def test_run_minimal_uses_samples_when_no_llm(monkeypatch):
     assert recorded == [([sample_block], [])]
 
 
+def test_run_minimal_crate_uses_shared_cargo_setup(monkeypatch, tmp_path):
+    from sactor import utils
+
+    vendor_dir = tmp_path / "vendor"
+    monkeypatch.setenv(utils.CARGO_VENDOR_DIR_ENV, str(vendor_dir))
+    tester = StructRoundTripTester()
+    monkeypatch.setattr(tester, "_generate_llm_fill_block", lambda code, name, idiom: (None, False))
+    monkeypatch.setattr(tester, "_render_sample_blocks", lambda name: [])
+    seen = {}
+
+    def fake_run(workdir):
+        seen["manifest"] = Path(workdir, "Cargo.toml").read_text()
+        seen["cargo_config"] = Path(workdir, ".cargo", "config.toml").read_text()
+        return True, "ok"
+
+    monkeypatch.setattr(tester, "_run_cargo", fake_run)
+
+    assert tester.run_minimal("// code", "Foo") == (True, "ok")
+    assert f'libc = "{utils.LIBC_CRATE_VERSION}"' in seen["manifest"]
+    assert json.dumps(str(vendor_dir)) in seen["cargo_config"]
+    assert "offline = true" in seen["cargo_config"]
+
+
 def test_gen_tests_respects_idiomatic_name():
     tester = StructRoundTripTester()
     code = tester._gen_tests("node", "Node", [], [])
@@ -0,0 +1,93 @@
+import subprocess
+
+from sactor import utils
+from sactor.c_parser.project_index import TranslationUnitSummary
+from sactor.verifier import project_relink
+from sactor.verifier.project_relink import ProjectRelink
+
+
+def _fake_compiler(monkeypatch):
+    compiled = []
+
+    def fake_run_command(cmd, *args, **kwargs):
+        output = cmd[cmd.index("-o") + 1]
+        with open(output, "w") as f:
+            f.write("obj")
+        compiled.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(utils, "run_command", fake_run_command)
+    return compiled
+
+
+def test_cached_object_compiled_once_per_content(tmp_path, monkeypatch):
+    compiled = _fake_compiler(monkeypatch)
+    source = tmp_path / "util.c"
+    source.write_text("int one(void) { return 1; }\n")
+    commands = [["gcc", "-O0", utils.TO_TRANSLATE_C_FILE_MARKER]]
+    relink = ProjectRelink(str(tmp_path / "object_cache"))
+
+    first = relink.cached_object(str(source), commands, [str(source)])
+    assert relink.cached_object(str(source), commands, [str(source)]) == first
+    assert len(compiled) == 1
+    assert (relink.hits, relink.misses) == (1, 1)
+
+    # Different flags or different content get their own object
+    other_flags = relink.cached_object(
+        str(source), [["gcc", "-O2", utils.TO_TRANSLATE_C_FILE_MARKER]], [str(source)])
+    source.write_text("int one(void) { return 2; }\n")
+    other_content = relink.cached_object(str(source), commands, [str(source)])
+    assert len({first, other_flags, other_content}) == 3
+    assert len(compiled) == 3
+
+
+def test_cached_object_invalidated_by_included_header(tmp_path, monkeypatch):
+    compiled = _fake_compiler(monkeypatch)
+    header = tmp_path / "util.h"
+    header.write_text("#define ONE 1\n")
+    source = tmp_path / "util.c"
+    source.write_text('#include "util.h"\nint one(void) { return ONE; }\n')
+    includes = [str(source), str(header)]
+    commands = [["gcc", utils.TO_TRANSLATE_C_FILE_MARKER]]
+    relink = ProjectRelink(str(tmp_path / "object_cache"))
+
+    first = relink.cached_object(str(source), commands, includes)
+    header.write_text("#define ONE 2\n")
+    assert relink.cached_object(str(source), commands, includes) != first
+    assert len(compiled) == 2
+    assert (relink.hits, relink.misses) == (0, 2)
+
+
+def test_link_plan_computed_once(tmp_path, monkeypatch):
+    loads = []
+
+    def fake_load(path, c_path):
+        loads.append(c_path)
+        return [["gcc", utils.TO_TRANSLATE_C_FILE_MARKER]]
+
+    monkeypatch.setattr(utils, "load_compile_commands_from_file", fake_load)
+
+    class _Index:
+        def unit(self, c_path):
+            return TranslationUnitSummary(path=c_path, includes=[c_path, "common.h"])
+
+    monkeypatch.setattr(project_relink.ProjectIndex, "for_compile_commands",
+                        classmethod(lambda cls, *args, **kwargs: _Index()))
+
+    class _Verifier:
+        config = {}
+        compile_commands_file = "compile_commands.json"
+        link_closure = ["a.c", "b.c"]
+        link_args = ["-lm", "-lz"]
+
+        def _discover_cmake_libs(self):
+            loads.append("cmake")
+            return ["-lm"]
+
+    relink = ProjectRelink(str(tmp_path / "object_cache"))
+    plan = relink.plan(_Verifier())
+    assert relink.plan(_Verifier()) is plan
+    assert list(plan.compile_commands) == ["a.c", "b.c"]
+    assert plan.libs == ["-lm", "-lz"]
+    assert plan.includes == {"a.c": ["a.c", "common.h"], "b.c": ["b.c", "common.h"]}
+    assert loads == ["a.c", "b.c", "cmake"]
@@ -50,3 +50,174 @@ def test_run_timeout():
     print(result[1])
 
 
+
+
+def test_run_tests_parallel_reports_lowest_failure(tmp_path):
+    import json
+    import time
+
+    test_cmd_path = tmp_path / "test_cmd.json"
+    test_cmd_path.write_text(json.dumps([
+        {"command": ["sh", "-c", "sleep 0.5; echo slow >&2; exit 1"]},
+        {"command": ["sh", "-c", "exit 0"]},
+        {"command": ["sh", "-c", "echo fast >&2; exit 1"]},
+        {"command": ["sh", "-c", "sleep 30"]},
+    ]))
+    verifier = get_unidiomatic_verifier(str(test_cmd_path))
+    verifier.config['verifier']['test_workers'] = 4
+
+    started = time.monotonic()
+    result = verifier._run_tests("")
+    # The later, faster failure does not mask test 0, and test 3 is cancelled
+    assert result == (VerifyResult.TEST_ERROR, "slow\n", 0)
+    assert time.monotonic() - started < 10
+
+
+def test_run_tests_stopped_by_workspace_cancel(tmp_path):
+    import json
+    import threading
+    import time
+
+    test_cmd_path = tmp_path / "test_cmd.json"
+    test_cmd_path.write_text(json.dumps([{"command": ["sh", "-c", "sleep 30"]}]))
+    verifier = get_unidiomatic_verifier(str(test_cmd_path))
+    cancel = threading.Event()
+    threading.Timer(0.5, cancel.set).start()
+
+    started = time.monotonic()
+    with verifier.workspace(cancel=cancel) as candidate_verifier:
+        result = candidate_verifier._run_tests("")
+    # The candidate's running test is killed rather than awaited
+    assert result[0] == VerifyResult.TEST_ERROR
+    assert time.monotonic() - started < 10
+    assert verifier.cancel is None
+
+
+def test_run_tests_memoizes_outcomes_per_binary(tmp_path):
+    import json
+    import os
+
+    runs = tmp_path / "runs"
+    target = tmp_path / "prog"
+    target.write_text(f"#!/bin/sh\necho run >> {runs}\necho broken >&2\nexit 1\n")
+    os.chmod(target, 0o755)
+    test_cmd_path = tmp_path / "test_cmd.json"
+    test_cmd_path.write_text(json.dumps([{"command": ["%t"]}]))
+
+    def make_verifier():
+        config = utils.load_default_config()
+        config['test_result_cache']['persistent'] = True
+        config['test_result_cache']['path'] = str(tmp_path / "cache")
+        return UnidiomaticVerifier(str(test_cmd_path), config=config)
+
+    def run_count():
+        return len(runs.read_text().splitlines())
+
+    verifier = make_verifier()
+    expected = (VerifyResult.TEST_ERROR, "broken\n", 0)
+    assert verifier._run_tests(str(target)) == expected
+    assert verifier._run_tests(str(target)) == expected
+    assert run_count() == 1
+
+    # A fresh verifier (as in a later run) reuses the on-disk outcome
+    verifier = make_verifier()
+    assert verifier._run_tests(str(target)) == expected
+    assert run_count() == 1
+
+    assert verifier._run_tests(str(target), use_cache=False) == expected
+    assert run_count() == 2
+
+    # A rebuilt binary with different content is tested again
+    target.write_text(target.read_text().replace("exit 1", "exit 0"))
+    assert verifier._run_tests(str(target)) == (VerifyResult.SUCCESS, None, None)
+    assert run_count() == 3
+
+
+def test_run_tests_deadline_derived_from_c_baseline(tmp_path):
+    import json
+    import os
+    import time
+
+    from sactor.verifier.test_baseline import TestBaseline
+
+    def script(name, body):
+        path = tmp_path / name
+        path.write_text(f"#!/bin/sh\n{body}\n")
+        os.chmod(path, 0o755)
+        return str(path)
+
+    c_program = script("c_prog", "exit 0")
+    hung_candidate = script("candidate", "sleep 30")
+    test_cmd_path = tmp_path / "test_cmd.json"
+    test_cmd_path.write_text(json.dumps([{"command": ["%t"]}]))
+
+    config = utils.load_default_config()
+    config['verifier']['test_timeout_multiple'] = 20
+    config['verifier']['min_test_timeout_seconds'] = 1
+    config['test_result_cache']['enabled'] = False
+    verifier = UnidiomaticVerifier(str(test_cmd_path), config=config)
+    verifier.test_baseline = TestBaseline(None)
+    verifier.test_baseline.measure("c_prog", lambda: c_program, verifier._time_tests)
+    assert verifier.test_baseline.runtime(["command", ["%t"]]) is not None
+
+    started = time.monotonic()
+    result = verifier._run_tests(hung_candidate)
+    assert result[0] == VerifyResult.TEST_TIMEOUT
+    # The general 60s timeout no longer applies to a test the C program finishes at once
+    assert time.monotonic() - started < 10
+
+
+def test_test_baseline_store_follows_config(tmp_path):
+    from sactor.verifier.test_baseline import TestBaseline
+
+    config = {"verifier": {"test_timeout_multiple": 20},
+              "test_baseline": {"enabled": True, "path": str(tmp_path / "baselines")}}
+    timed = []
+
+    def run(program):
+        timed.append(program)
+        return {"test": 0.1}
+
+    TestBaseline.from_config(config).measure("c_prog", lambda: "prog", run)
+    reused = TestBaseline.from_config(config)
+    reused.measure("c_prog", lambda: "prog", run)
+    assert timed == ["prog"]
+    assert reused.measured
+
+    config["test_baseline"]["enabled"] = False
+    assert TestBaseline.from_config(config).path is None
+    config["test_baseline"]["enabled"] = True
+    config["verifier"]["test_timeout_multiple"] = 0
+    assert TestBaseline.from_config(config).path is None
+
+
+def test_run_tests_cache_follows_test_files(tmp_path):
+    import json
+    import os
+
+    runs = tmp_path / "runs"
+    target = tmp_path / "prog"
+    target.write_text(f"#!/bin/sh\necho run >> {runs}\n")
+    os.chmod(target, 0o755)
+    check = tmp_path / "check.sh"
+    check.write_text('"$1"\n')
+    test_cmd_path = tmp_path / "test_cmd.json"
+    test_cmd_path.write_text(json.dumps([{"command": ["sh", "check.sh", "%t"]}]))
+    verifier = get_unidiomatic_verifier(str(test_cmd_path))
+
+    def run_count():
+        return len(runs.read_text().splitlines())
+
+    assert verifier._run_tests(str(target)) == (VerifyResult.SUCCESS, None, None)
+    assert verifier._run_tests(str(target)) == (VerifyResult.SUCCESS, None, None)
+    assert run_count() == 1
+
+    # The binary is unchanged, but the script the test runs is not
+    check.write_text('"$1" && echo edited >&2 && exit 1\n')
+    assert verifier._run_tests(str(target)) == (VerifyResult.TEST_ERROR, "edited\n", 0)
+    assert run_count() == 2
+
+    # A regenerated test command file is run again too
+    test_cmd_path.write_text(json.dumps([{"command": ["sh", "check.sh", "%t"]}], indent=2))
+    assert verifier._run_tests(str(target)) == (VerifyResult.TEST_ERROR, "edited\n", 0)
+    assert run_count() == 3
@@ -215,3 +215,26 @@ fn my_function() -> i32 {
         function_dependency_uses=dependency_uses,
         has_prefix=False
     )
+
+
+def test_compile_check_skips_codegen_unless_artifact_needed(tmp_path, monkeypatch, config):
+    from sactor import utils
+    from sactor.verifier import E2EVerifier
+
+    commands = []
+
+    def fake_run_command(cmd, *args, **kwargs):
+        commands.append(cmd[:2])
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(utils, "run_command", fake_run_command)
+    test_cmd = 'tests/c_examples/course_manage/course_manage_test.json'
+
+    verifier = UnidiomaticVerifier(test_cmd, config, build_path=str(tmp_path / "uni"))
+    assert verifier._try_compile_rust_code_impl("pub fn f() {}")[0] == VerifyResult.SUCCESS
+    assert commands == [["cargo", "check"]]
+
+    commands.clear()
+    e2e = E2EVerifier(test_cmd, config, build_path=str(tmp_path / "e2e"))
+    assert e2e._try_compile_rust_code_impl("fn main() {}", True)[0] == VerifyResult.SUCCESS
+    assert commands == [["cargo", "build"]]
@@ -0,0 +1,51 @@
+import threading
+
+from sactor.verifier import UnidiomaticVerifier
+from sactor.verifier.workspace_pool import WorkspacePool
+from tests.utils import config
+
+
+def test_pool_reuses_home_workspace_when_serial(tmp_path):
+    pool = WorkspacePool(str(tmp_path), size=3)
+    for _ in range(3):
+        with pool.lease() as path:
+            assert path == str(tmp_path)
+    stats = pool.statistics()
+    assert stats["leases"] == 3
+    assert stats["workspaces_created"] == 1
+    assert stats["peak_in_use"] == 1
+
+
+def test_pool_isolates_concurrent_leases_and_blocks_when_full(tmp_path):
+    pool = WorkspacePool(str(tmp_path), size=2)
+    with pool.lease() as first, pool.lease() as second:
+        assert first != second
+        assert second == str(tmp_path / "workspaces" / "ws_1")
+
+        third = []
+        waiter = threading.Thread(target=lambda: third.append(pool.lease().__enter__()))
+        waiter.start()
+        waiter.join(timeout=0.1)
+        # Both workspaces are leased, so the third lease has to wait
+        assert waiter.is_alive()
+    waiter.join(timeout=5)
+    assert third and third[0] in (first, second)
+    stats = pool.statistics()
+    assert stats["peak_in_use"] == 2
+    assert stats["contended_leases"] == 1
+    assert stats["max_wait_time"] > 0
+
+
+def test_verifier_methods_run_on_a_leased_copy(tmp_path, config):
+    config['verifier']['workspace_pool_size'] = 2
+    verifier = UnidiomaticVerifier(
+        'tests/verifier/test_cmd.json', config, build_path=str(tmp_path))
+
+    with verifier.workspace() as outer:
+        assert outer is not verifier
+        assert outer.workspace_pool is None
+        with verifier.workspace() as inner:
+            assert inner.build_attempt_path != outer.build_attempt_path
+        # A leased copy does not lease again
+        with outer.workspace() as nested:
+            assert nested is outer